@@ -18,6 +18,9 @@ from oxsci_oma_core import OMAContext, IAdapter
 from oxsci_oma_core.models.adapter import ITaskExecutor
 from oxsci_oma_core.models.agent_config import AgentConfig
 
+from app.core.llm import create_llm
+from app.core.tool_pipeline import get_tools
+
 
 @CrewBase
 class AgentTemplate(ITaskExecutor):
@@ -43,7 +46,10 @@ class AgentTemplate(ITaskExecutor):
         self.context = context
         self.adapter = adapter
         # Create LLM instance with appropriate model and temperature
-        self.llm = self.adapter.create_llm(
+        # Routed through the LLM pipeline (provider rate limits shared by all agents)
+        self.llm = create_llm(
+            self.adapter,
+            agent_role=self.agent_role,
             # set model in orchestrator.agents.context or use default
             model=context.get_shared_data("model", "openrouter/openai/gpt-4o-mini"),
             temperature=0.1,  # Adjust based on creativity needs (0.0 = deterministic, 1.0 = creative)
@@ -158,7 +164,7 @@ class AgentTemplate(ITaskExecutor):
             allow_delegation=False,
             llm=self.llm,
             max_iter=30,  # Maximum iterations for the agent
-            tools=self.adapter.get_tools(tool_list) if self.adapter else [],
+            tools=get_tools(self.adapter, tool_list) if self.adapter else [],
         )
 
     def main_task(self) -> Task:
@@ -194,7 +200,7 @@ class AgentTemplate(ITaskExecutor):
             FINAL DELIVERABLE:
             [What should be produced at the end]
             """,
-            tools=self.adapter.get_tools(task_tools) if self.adapter else [],
+            tools=get_tools(self.adapter, task_tools) if self.adapter else [],
             expected_output="[Brief description of expected output]",
         )
 
@@ -5,7 +5,7 @@ Simple Search Crew - 步骤2: 读取section并搜索相关论文
 """
 
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from crewai import Agent, Task, Crew, Process
 from crewai.project import CrewBase
@@ -17,6 +17,11 @@ from oxsci_oma_core.models.agent_config import AgentConfig
 
 from oxsci_shared_core.logging import logger
 
+from app.core.incremental import read_content_sections
+from app.core.llm import create_llm
+from app.core.ranking import ranking_reference
+from app.core.tool_pipeline import get_tools
+
 
 @CrewBase
 class SampleAnalysisCrew(ITaskExecutor):
@@ -28,7 +33,10 @@ class SampleAnalysisCrew(ITaskExecutor):
         """Initialize the crew with context and adapters"""
         self.context = context
         self.adapter = adapter
-        self.llm = self.adapter.create_llm(
+        # Routed through the LLM pipeline (provider rate limits shared by all agents)
+        self.llm = create_llm(
+            self.adapter,
+            agent_role=self.agent_role,
             model=context.get_shared_data("model", "openrouter/openai/gpt-4o-mini"),
             temperature=0.1,
         )
@@ -75,7 +83,9 @@ class SampleAnalysisCrew(ITaskExecutor):
         try:
             self.logger.info(f"Starting {self.agent_role} execution")
             crew_instance = self.crew()
-            result = await crew_instance.kickoff_async()
+            # search_articles results are pre-ranked against the manuscript abstract
+            with ranking_reference(await self._abstract()):
+                result = await crew_instance.kickoff_async()
             self.logger.info(f"{self.agent_role} execution completed")
 
             return {
@@ -95,11 +105,30 @@ class SampleAnalysisCrew(ITaskExecutor):
                 },
             }
 
+    async def _abstract(self) -> Optional[str]:
+        """Manuscript abstract for pre-ranking (None: search results unranked)"""
+        overview_id = self.context.get_shared_data("structured_content_overview_id")
+        if not overview_id:
+            return None
+        try:
+            sections = await read_content_sections(
+                self.adapter, overview_id, section_types=("abstract",)
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not read abstract for pre-ranking: {e}")
+            return None
+        abstract = next(
+            (s for s in sections.values() if s.section_type.lower() == "abstract"),
+            None,
+        )
+        return f"{abstract.title}\n{abstract.content}" if abstract else None
+
     def comparative_analyzer(self) -> Agent:
         """内容分析与搜索Agent: 使用MCP工具读取section，搜索论文，创建analysis"""
 
         # 使用MCP工具
-        all_tools = self.adapter.get_tools(
+        all_tools = get_tools(
+            self.adapter,
             [
                 "get_content_section_list",  # 列出content sections
                 "get_content_section_detail",  # 读取section详情
@@ -124,7 +153,8 @@ class SampleAnalysisCrew(ITaskExecutor):
             Your workflow:
             1. Use get_content_section_list to get available sections.
             2. Use get_content_section_detail to read section detail.
-            3. Use search_articles with related keyword parameter to search for academic articles.
+            3. Use search_articles with related keyword parameter to search for academic articles
+               (results are ranked by similarity to the paper, most similar first).
             4. Use get_article to get Abstract detail for selected articles by DOI. if failed or no abstract, try another article.(max 20 tries)
             5. Use create_analysis_overview ONCE to create analysis with analysis_type='comparative_analysis'.
             6. Use create_analysis_section to add Comparative analysis analysis_type='comparative_analysis' and define section_type according to your analysis,
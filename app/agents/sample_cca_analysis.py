@@ -6,11 +6,23 @@ Demonstrates Claude Code execution with MCP tools for comparative analysis.
 Reads content sections, searches related articles, and creates comparative analysis.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from crewai.project import CrewBase
 
 from app.core.config import config
+from app.core.incremental import (
+    AnalysisRecord,
+    ContentSection,
+    analyzed_keys,
+    load_record,
+    parse_sections,
+    plan_rerun,
+    read_content_sections,
+    save_record,
+    write_analysis,
+)
+from app.core.timeouts import remaining_budget
 
 from oxsci_oma_core import OMAContext
 from oxsci_oma_core.adapter.crew_ai import CrewAIToolAdapter
@@ -29,16 +41,48 @@ else:
 
     logger.info("Using Claude Code CLI mode (default)")
 
+# Content sections the comparative analysis is based on
+ANALYZED_SECTIONS = ("abstract", "introduction", "summary", "conclusion", "references")
+
+ANALYSIS_INSTRUCTIONS = """You are an academic researcher specializing in comparative analysis of scholarly articles.
+Your task is to compare the given paper sections with related academic articles.
+
+TASK WORKFLOW:
+1. Use search_articles with related keyword parameter to search for academic articles related to the content.
+2. Use get_article to get Abstract detail for selected articles by DOI. If failed or no abstract, try another article (max 20 tries).
+3. Write comparative analysis sections:
+   - Define section_type according to your analysis
+   - Use "section type: title of compared article" as section title
+   - Compare 5-10 articles if possible
+   - List in based_on the keys of the paper sections the analysis section relies on
+
+ANALYSIS FOCUS:
+- Analyze how the paper's approach differs from existing literature
+- Identify methodological similarities and differences
+- Compare findings and conclusions with related work
+- Evaluate the paper's novelty in relation to existing research
+- Assess how the paper extends or challenges current knowledge
+
+OUTPUT:
+Do not create analysis overviews or sections with tools. Answer with one JSON object only:
+{"sections": [{"section_type": "...", "title": "...", "content": "...", "based_on": ["abstract"]}]}"""
+
 
 @CrewBase
 class SampleCCAAnalysis(ITaskExecutor):
     """Claude Code Agent for comparative analysis - reads sections, searches articles, creates analysis"""
 
     agent_role: str = "cca_comparative_analysis"
+    # Long-running batch analysis: yields to interactive tasks (TASK_SCHEDULING_MODE=priority)
+    task_priority: str = "batch"
 
-    def __init__(self, context: OMAContext):
+    def __init__(
+        self, context: OMAContext, adapter: Optional[CrewAIToolAdapter] = None
+    ):
         """Initialize the agent with context and adapters"""
         self.context = context
+        # MCP tools for incremental reruns (without an adapter every run is a full run)
+        self.adapter = adapter
         self.logger = logger
 
     @classmethod
@@ -56,7 +100,8 @@ class SampleCCAAnalysis(ITaskExecutor):
         - complete_analysis_overview: Complete analysis
 
         Data flow:
-        - Input: structured_content_overview_id (from step 1 output)
+        - Input: structured_content_overview_id (from step 1 output), and
+          comparative_analysis_id of the previous run to rerun incrementally
         - Output: comparative_analysis_id (analysis result ID via analysis_type="comparative_analysis")
         """
         return AgentConfig(
@@ -67,6 +112,7 @@ class SampleCCAAnalysis(ITaskExecutor):
             retry_count=3,
             input={
                 "structured_content_overview_id": "string - structured content overview ID from step 1",
+                "comparative_analysis_id": "string - (optional) previous analysis to update: sections with unchanged inputs are reused",
             },
             output={
                 "comparative_analysis_id": "string - analysis result ID with search findings",
@@ -89,13 +135,15 @@ class SampleCCAAnalysis(ITaskExecutor):
 
             self.logger.info(f"Processing overview: {overview_id}")
 
+            if self.adapter is not None:
+                return await self.run_incremental(overview_id)
+
             # Build task prompt for Claude Code
+            # Static instructions first and task-specific values last, so the provider can
+            # reuse the cached prompt prefix across tasks and turns
             task_prompt = f"""You are an academic researcher specializing in comparative analysis of scholarly articles.
 Your task is to read specific sections of a given paper, search for related academic articles, and create a comprehensive comparative analysis.
 
-CONTEXT:
-- structured_content_overview_id: {overview_id}
-
 TASK WORKFLOW:
 1. Use get_content_section_list tool to get available sections for the content overview.
 2. Use get_content_section_detail to read the abstract, introduction or summary section, and reference section.
@@ -117,14 +165,18 @@ ANALYSIS FOCUS:
 - Assess how the paper extends or challenges current knowledge
 
 OUTPUT:
-Provide a summary of successfully compared articles and section statistics."""
+Provide a summary of successfully compared articles and section statistics.
+
+CONTEXT:
+- structured_content_overview_id: {overview_id}"""
 
             # Execute with Claude Code
             self.logger.info("Executing comparative analysis with Claude Code...")
             result = await execute_claude_code(
                 prompt=task_prompt,
                 context=self.context,
-                timeout=600,
+                # Remaining task budget (AgentConfig.timeout minus time already spent)
+                timeout=int(remaining_budget(default=600)),
                 use_mcp_tools=True,
                 allowed_tools=["mcp__*"],
                 disable_web_search=True,
@@ -151,3 +203,103 @@ Provide a summary of successfully compared articles and section statistics."""
                     "agent_role": self.agent_role,
                 },
             }
+
+    async def run_incremental(self, overview_id: str) -> Dict[str, Any]:
+        """
+        Reuse the analysis sections of the previous run whose content sections
+        are unchanged and let Claude Code write only the affected ones.
+        """
+        inputs = await read_content_sections(self.adapter, overview_id)
+        analyzed = analyzed_keys(inputs, ANALYZED_SECTIONS)
+        previous_id = self.context.get_shared_data("comparative_analysis_id", None)
+        record = load_record(previous_id)
+        plan = plan_rerun(record, inputs, analyzed)
+
+        if record is not None and not plan.changed:
+            if record.content_overview_id == overview_id:
+                self.logger.info(f"Analysis {record.analysis_id} is up to date")
+                return self._result(record.analysis_id, record.sections, [], "")
+
+        new_sections: List[Dict[str, Any]] = []
+        raw_output = ""
+        if plan.changed:
+            raw_output = await self._generate(
+                inputs, analyzed, plan.changed, plan.reused
+            )
+            new_sections = parse_sections(raw_output, analyzed)
+            if not new_sections:
+                raise ValueError("Claude Code returned no analysis sections")
+
+        sections = plan.reused + new_sections
+        analysis_id = await write_analysis(
+            self.adapter,
+            {
+                "structured_content_overview_id": overview_id,
+                "analysis_type": "comparative_analysis",
+            },
+            sections,
+        )
+        if analysis_id:
+            digests = {key: section.digest for key, section in inputs.items()}
+            save_record(AnalysisRecord(analysis_id, overview_id, digests, sections))
+        return self._result(analysis_id, plan.reused, new_sections, raw_output)
+
+    async def _generate(
+        self,
+        inputs: Dict[str, ContentSection],
+        analyzed: List[str],
+        changed: List[str],
+        reused: List[Dict[str, Any]],
+    ) -> str:
+        """Let Claude Code write the analysis sections for the changed inputs."""
+        paper = "\n\n".join(
+            f"[{key}] {inputs[key].title}\n{inputs[key].content}" for key in analyzed
+        )
+        task_prompt = f"""{ANALYSIS_INSTRUCTIONS}
+
+PAPER SECTIONS (key in brackets):
+{paper}"""
+        if reused:
+            kept = "\n".join(f"- {s['title']}" for s in reused)
+            task_prompt += f"""
+
+The analysis is a rerun on a revised paper. Only these paper sections changed: {", ".join(changed)}.
+The following analysis sections are kept as they are, do not write them again:
+{kept}
+Write only the sections affected by the changed paper sections."""
+
+        self.logger.info(
+            f"Generating analysis sections for {len(changed)} changed inputs "
+            "with Claude Code..."
+        )
+        return await execute_claude_code(
+            prompt=task_prompt,
+            context=self.context,
+            # Remaining task budget (AgentConfig.timeout minus time already spent)
+            timeout=int(remaining_budget(default=600)),
+            use_mcp_tools=True,
+            allowed_tools=["mcp__*"],
+            disable_web_search=True,
+        )
+
+    def _result(
+        self,
+        analysis_id: Optional[str],
+        reused: List[Dict[str, Any]],
+        generated: List[Dict[str, Any]],
+        raw_output: str,
+    ) -> Dict[str, Any]:
+        self.logger.info(
+            f"Analysis {analysis_id}: {len(reused)} sections reused, "
+            f"{len(generated)} generated"
+        )
+        return {
+            "status": "success",
+            "result": {
+                "raw_output": raw_output,
+                "comparative_analysis_id": analysis_id,
+                "reused_sections": len(reused),
+                "generated_sections": len(generated),
+                "agent_role": self.agent_role,
+            },
+        }
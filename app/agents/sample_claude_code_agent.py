@@ -9,7 +9,15 @@ Creates a single section to verify agent can run and call tools.
 from typing import Dict, Any
 
 
+from app.core.batch import (
+    batch_concurrency,
+    batch_inputs,
+    batch_result,
+    is_batch,
+    run_batch,
+)
 from app.core.config import config
+from app.core.timeouts import remaining_budget
 
 from oxsci_oma_core import OMAContext
 from oxsci_oma_core.models.adapter import ITaskExecutor
@@ -50,7 +58,7 @@ class SampleClaudeCodeAgent(ITaskExecutor):
         - complete_content_overview: Complete the overview
 
         Data flow:
-        - Input: file_id (uploaded file ID)
+        - Input: file_id (uploaded file ID), or file_ids to process a batch
         - Output: structured_content_overview_id (saved to context automatically)
         """
         return AgentConfig(
@@ -61,6 +69,7 @@ class SampleClaudeCodeAgent(ITaskExecutor):
             retry_count=3,
             input={
                 "file_id": "string - File ID of the PDF to process",
+                "file_ids": "list - File IDs of the PDFs to process in one batch (instead of file_id)",
             },
             output={
                 "structured_content_overview_id": "string - ID of the structured content overview created"
@@ -74,36 +83,21 @@ class SampleClaudeCodeAgent(ITaskExecutor):
         try:
             self.logger.info(f"Starting {self.agent_role} execution")
 
+            if is_batch(self.context):
+                results = await run_batch(
+                    batch_inputs(self.context),
+                    self.process_document,
+                    batch_concurrency(self.context),
+                )
+                self.logger.info(f"{self.agent_role} batch execution completed")
+                return batch_result(self.agent_role, results)
+
             # Get file_id from context
             file_id = self.context.get_shared_data("file_id")
             if not file_id:
                 raise ValueError("file_id is required in context")
 
-            self.logger.info(f"Processing file: {file_id}")
-
-            # Build simple task prompt
-            task_prompt = f"""You are a PDF processing assistant. Process PDF file and create ONE section only.
-
-TASK:
-1. Use get_pdf_pages tool to fetch PDF content (file_id: {file_id})
-2. Use create_content_overview to create overview
-3. Use create_content_section to create ONE abstract section from the PDF
-4. Use complete_content_overview to finalize
-
-Keep it simple - just create one section to verify tools work."""
-
-            # Execute with Claude Code
-            self.logger.info("Executing with Claude Code...")
-            result = await execute_claude_code(
-                prompt=task_prompt,
-                context=self.context,
-                timeout=300,
-                use_mcp_tools=True,
-                allowed_tools=["mcp__*"],
-                disable_web_search=True,
-            )
-
-            self.logger.info(f"Execution completed: {result[:200]}...")
+            result = await self.process_document(file_id)
             overview_id = self.context.get_shared_data("structured_content_overview_id")
 
             return {
@@ -124,3 +118,33 @@ Keep it simple - just create one section to verify tools work."""
                     "agent_role": self.agent_role,
                 },
             }
+
+    async def process_document(self, file_id: str) -> str:
+        """Run Claude Code on one PDF and return its summary"""
+        self.logger.info(f"Processing file: {file_id}")
+
+        # Build simple task prompt
+        task_prompt = f"""You are a PDF processing assistant. Process PDF file and create ONE section only.
+
+TASK:
+1. Use get_pdf_pages tool to fetch PDF content (file_id: {file_id})
+2. Use create_content_overview to create overview (file_id: {file_id})
+3. Use create_content_section to create ONE abstract section from the PDF
+4. Use complete_content_overview to finalize
+
+Keep it simple - just create one section to verify tools work."""
+
+        # Execute with Claude Code
+        self.logger.info("Executing with Claude Code...")
+        result = await execute_claude_code(
+            prompt=task_prompt,
+            context=self.context,
+            # Remaining task budget (AgentConfig.timeout minus time already spent)
+            timeout=int(remaining_budget(default=300)),
+            use_mcp_tools=True,
+            allowed_tools=["mcp__*"],
+            disable_web_search=True,
+        )
+
+        self.logger.info(f"Execution completed: {result[:200]}...")
+        return result
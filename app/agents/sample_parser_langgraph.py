@@ -8,7 +8,7 @@ Demonstrates:
 - Async agent execution
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from langgraph.prebuilt import create_react_agent
 
@@ -18,17 +18,40 @@ from oxsci_oma_core.models.adapter import ITaskExecutor
 from oxsci_oma_core.models.agent_config import AgentConfig
 from oxsci_shared_core.logging import logger
 
+from app.core.batch import (
+    batch_inputs,
+    batch_result,
+    is_batch,
+    run_batch,
+)
+from app.core.config import config
+from app.core.llm import create_llm
+from app.core.pdf_pages import document_tools, open_pdf
+from app.core.structured_content import (
+    ABSTRACT,
+    HYBRID,
+    StructuredContentPipeline,
+    document_concurrency,
+    execution_mode,
+)
+from app.core.tool_pipeline import get_tools
+
 
 class SampleParserLangGraph(ITaskExecutor):
     """PDF Parser using LangGraph framework"""
 
     agent_role: str = "sample_parser_langgraph"
+    # Agent-mode batch documents run one at a time (shared task context)
+    document_concurrency = staticmethod(document_concurrency)
 
     def __init__(self, context: OMAContext, adapter: LangGraphAdapter):
         """Initialize with context and LangGraph adapter"""
         self.context = context
         self.adapter = adapter
-        self.llm = self.adapter.create_llm(
+        # Routed through the LLM pipeline (provider rate limits shared by all agents)
+        self.llm = create_llm(
+            self.adapter,
+            agent_role=self.agent_role,
             model=context.get_shared_data("model", "openrouter/openai/gpt-4o-mini"),
             temperature=0.1,
         )
@@ -40,13 +63,14 @@ class SampleParserLangGraph(ITaskExecutor):
         Get Agent configuration
 
         Tools (all MCP tools):
-        - get_pdf_pages: Get PDF page content from MCP server
+        - get_pdf_pages: Get PDF page content from MCP server (read page by page
+          through get_pdf_outline / read_pdf_pages)
         - create_content_overview: Create content overview
         - create_content_section: Create content section
         - complete_content_overview: Complete overview
 
         Data flow:
-        - Input: file_id (user uploaded file ID)
+        - Input: file_id (user uploaded file ID), or file_ids to process a batch
         - Output: overview_id (auto-saved to context for downstream use)
         """
         return AgentConfig(
@@ -57,6 +81,7 @@ class SampleParserLangGraph(ITaskExecutor):
             retry_count=3,
             input={
                 "file_id": "string - manuscript file ID to process",
+                "file_ids": "list - manuscript file IDs to process in one batch (instead of file_id)",
                 "model": "string - LLM model to use (default: openrouter/openai/gpt-4o-mini)",
             },
             output={
@@ -71,21 +96,74 @@ class SampleParserLangGraph(ITaskExecutor):
         # try:
         self.logger.info(f"Starting {self.agent_role} execution (LangGraph)")
 
-        # Get tools from adapter
-        tools = self.adapter.get_tools(
+        self.hybrid = (
+            execution_mode(self.context, config.PARSER_EXECUTION_MODE) == HYBRID
+        )
+        # Tools and the LLM are bound once and shared by all documents of a batch
+        self.content_tools = get_tools(
+            self.adapter,
             [
-                "get_pdf_pages",
                 "create_content_overview",
                 "create_content_section",
                 "complete_content_overview",
             ]
         )
+        if self.hybrid:
+            self.pipeline = StructuredContentPipeline(
+                self.adapter, self.llm, self.context
+            )
+
+        if is_batch(self.context):
+            results = await run_batch(
+                batch_inputs(self.context),
+                self.process_document,
+                self.document_concurrency(self.context),
+            )
+            self.logger.info(f"{self.agent_role} batch execution completed")
+            return batch_result(self.agent_role, results)
+
+        result = await self.process_document()
+        self.logger.info(f"{self.agent_role} execution completed")
+
+        return {
+            "status": "success",
+            "result": {**result, "agent_role": self.agent_role},
+        }
+
+        # except Exception as e:
+        #     self.logger.error(f"{self.agent_role} execution failed: {e}")
+        #     return {
+        #         "status": "error",
+        #         "result": {
+        #             "error": str(e),
+        #             "agent_role": self.agent_role,
+        #         },
+        #     }
+
+    async def process_document(self, file_id: Optional[str] = None) -> Dict[str, Any]:
+        """Process one PDF (the context's file_id when none is given)"""
+        arguments = {"file_id": file_id} if file_id else None
+        # Pages are fetched on demand and kept in a local page store for this document
+        document = open_pdf(self.adapter, arguments)
+
+        if self.hybrid:
+            # Fixed tool sequence in code, the LLM only writes the abstract
+            with document:
+                structured = await self.pipeline.run(document, [ABSTRACT], file_id)
+            return {
+                "structured_content_overview_id": structured.overview_id,
+                "sections": [s["title"] for s in structured.sections],
+            }
+
+        # PDF pages through the lazy document handle, content tools shared
+        tools = document_tools(self.adapter, document) + self.content_tools
 
         # System prompt for the agent
         system_prompt = """You are a PDF processor that efficiently processes PDFs using tools.
 
 Your workflow:
-1. Use get_pdf_pages tool to fetch content and identify sections.
+1. Use get_pdf_outline tool to find the pages of the sections you need, then read only
+   those pages with read_pdf_pages.
 2. Use create_content_overview tool to create an overview before adding sections.
 3. Use create_content_section tool to add sections with extracted content.
 4. Use complete_content_overview tool to finalize.
@@ -104,21 +182,20 @@ Process the PDF file and create the abstract section only, then finalize."""
             verbose=True, agent_name=self.agent_role
         )
 
+        user_prompt = "Process the PDF file and create structured content overview."
+        if file_id:
+            # Batch documents: the content tools need the document's file ID
+            user_prompt += f" Pass file_id {file_id} to the tools that take a file_id."
+
         # Execute agent with recursion limit and logging
-        result = await agent.ainvoke(
-            {
-                "messages": [
-                    (
-                        "user",
-                        "Process the PDF file and create structured content overview.",
-                    )
-                ]
-            },
-            config={
-                "recursion_limit": 50,  # Default is 25, increase for complex tasks
-                "callbacks": [logging_handler],
-            },
-        )
+        with document:
+            result = await agent.ainvoke(
+                {"messages": [("user", user_prompt)]},
+                config={
+                    "recursion_limit": 50,  # Default is 25, increase for complex tasks
+                    "callbacks": [logging_handler],
+                },
+            )
 
         # Log execution summary
         summary = logging_handler.get_summary()
@@ -134,22 +211,4 @@ Process the PDF file and create the abstract section only, then finalize."""
             if hasattr(final_message, "content"):
                 final_output = final_message.content
 
-        self.logger.info(f"{self.agent_role} execution completed")
-
-        return {
-            "status": "success",
-            "result": {
-                "raw_output": str(final_output),
-                "agent_role": self.agent_role,
-            },
-        }
-
-        # except Exception as e:
-        #     self.logger.error(f"{self.agent_role} execution failed: {e}")
-        #     return {
-        #         "status": "error",
-        #         "result": {
-        #             "error": str(e),
-        #             "agent_role": self.agent_role,
-        #         },
-        #     }
+        return {"raw_output": str(final_output)}
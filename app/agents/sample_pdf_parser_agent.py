@@ -5,7 +5,7 @@ Simple Read Crew - 步骤1: 下载PDF并解析提取前3页
 """
 
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from crewai import Agent, Task, Crew, Process
 from crewai.project import CrewBase
@@ -16,18 +16,41 @@ from oxsci_oma_core.models.adapter import ITaskExecutor
 from oxsci_oma_core.models.agent_config import AgentConfig
 from oxsci_shared_core.logging import logger
 
+from app.core.batch import (
+    batch_inputs,
+    batch_result,
+    is_batch,
+    run_batch,
+)
+from app.core.config import config
+from app.core.llm import create_llm
+from app.core.pdf_pages import PdfDocument, document_tools, open_pdf
+from app.core.structured_content import (
+    ABSTRACT,
+    HYBRID,
+    StructuredContentPipeline,
+    document_concurrency,
+    execution_mode,
+)
+from app.core.tool_pipeline import get_tools
+
 
 @CrewBase
 class SampleParserCrew(ITaskExecutor):
     """步骤1: 下载PDF并解析，创建structured content overview"""
 
     agent_role: str = "simple_read_test"
+    # Agent-mode batch documents run one at a time (shared task context)
+    document_concurrency = staticmethod(document_concurrency)
 
     def __init__(self, context: OMAContext, adapter: CrewAIToolAdapter):
         """Initialize the crew with context and adapters"""
         self.context = context
         self.adapter = adapter
-        self.llm = self.adapter.create_llm(
+        # Routed through the LLM pipeline (provider rate limits shared by all agents)
+        self.llm = create_llm(
+            self.adapter,
+            agent_role=self.agent_role,
             model=context.get_shared_data("model", "openrouter/openai/gpt-4o-mini"),
             temperature=0.1,
         )
@@ -39,13 +62,13 @@ class SampleParserCrew(ITaskExecutor):
         获取Agent配置
 
         工具链 (全部使用MCP工具):
-        - get_pdf_pages: 从MCP服务器获取PDF页面内容
+        - get_pdf_pages: 从MCP服务器获取PDF页面内容 (通过 get_pdf_outline / read_pdf_pages 按页读取)
         - create_content_overview: 创建content overview
         - create_content_section: 创建content section (前3页)
         - complete_content_overview: 完成overview
 
         数据流:
-        - Input: file_id (用户上传的文件ID)
+        - Input: file_id (用户上传的文件ID), 或 file_ids (批量处理多个文件)
         - Output: overview_id (自动记录到context，供下游使用)
         """
 
@@ -58,6 +81,7 @@ class SampleParserCrew(ITaskExecutor):
             retry_count=3,
             input={
                 "file_id": "string - manuscript file ID to process",
+                "file_ids": "list - manuscript file IDs to process in one batch (instead of file_id)",
                 "model": "string - LLM model to use (default: openrouter/openai/gpt-4o-mini)",
             },
             output={
@@ -71,16 +95,30 @@ class SampleParserCrew(ITaskExecutor):
         """执行任务并返回结果"""
         try:
             self.logger.info(f"Starting {self.agent_role} execution")
-            crew_instance = self.crew()
-            result = await crew_instance.kickoff_async()
+            self.hybrid = (
+                execution_mode(self.context, config.PARSER_EXECUTION_MODE) == HYBRID
+            )
+            if self.hybrid:
+                # Content tools and the LLM are bound once and shared by all documents
+                self.pipeline = StructuredContentPipeline(
+                    self.adapter, self.llm, self.context
+                )
+
+            if is_batch(self.context):
+                results = await run_batch(
+                    batch_inputs(self.context),
+                    self.process_document,
+                    self.document_concurrency(self.context),
+                )
+                self.logger.info(f"{self.agent_role} batch execution completed")
+                return batch_result(self.agent_role, results)
+
+            result = await self.process_document()
             self.logger.info(f"{self.agent_role} execution completed")
 
             return {
                 "status": "success",
-                "result": {
-                    "raw_output": str(result),
-                    "agent_role": self.agent_role,
-                },
+                "result": {**result, "agent_role": self.agent_role},
             }
         except Exception as e:
             self.logger.error(f"{self.agent_role} execution failed: {e}")
@@ -92,14 +130,31 @@ class SampleParserCrew(ITaskExecutor):
                 },
             }
 
-    def pdf_processor(self) -> Agent:
+    async def process_document(self, file_id: Optional[str] = None) -> Dict[str, Any]:
+        """处理单个PDF (file_id 为空时使用context中的file_id)"""
+        arguments = {"file_id": file_id} if file_id else None
+        # Pages are fetched on demand and kept in a local page store for this document
+        with open_pdf(self.adapter, arguments) as document:
+            if self.hybrid:
+                # Fixed tool sequence in code, the LLM only writes the abstract
+                structured = await self.pipeline.run(document, [ABSTRACT], file_id)
+                return {
+                    "structured_content_overview_id": structured.overview_id,
+                    "sections": [s["title"] for s in structured.sections],
+                }
+
+            result = await self.crew(document, file_id).kickoff_async()
+        return {"raw_output": str(result)}
+
+    def pdf_processor(self, document: PdfDocument) -> Agent:
         """PDF处理Agent: 使用MCP工具获取PDF内容并创建structured content"""
 
         # 使用MCP工具
         # MCP工具通过工具名称列表获取
-        all_tools = self.adapter.get_tools(
+        # get_pdf_outline / read_pdf_pages: 按需读取PDF页面 (代替整份 get_pdf_pages)
+        all_tools = document_tools(self.adapter, document) + get_tools(
+            self.adapter,
             [
-                "get_pdf_pages",  # 获取PDF页面
                 "create_content_overview",  # 创建概览
                 "create_content_section",  # 创建章节
                 "complete_content_overview",  # 完成概览
@@ -108,9 +163,10 @@ class SampleParserCrew(ITaskExecutor):
 
         return Agent(
             role="PDF Processor",
-            goal="Get PDF pages via tools and create structured content",
+            goal="Read only the PDF pages you need via tools and create structured content",
             backstory="""You process PDFs efficiently using tools. Your workflow:
-            1. Use get_pdf_pages tool to fetch content and identify sections.
+            1. Use get_pdf_outline tool to find the pages of the sections you need,
+               then read only those pages with read_pdf_pages.
             2. Use create_content_overview tool to create an overview before adding section.
             3. Use create_content_section tool to add sections with extracted content.
             4. Use complete_content_overview tool to finalize.
@@ -122,19 +178,24 @@ class SampleParserCrew(ITaskExecutor):
             tools=all_tools,
         )
 
-    def process_pdf_task(self) -> Task:
+    def process_pdf_task(self, agent: Agent, file_id: Optional[str] = None) -> Task:
         """处理PDF并创建structured content"""
+        description = """Process PDF file and create abstract section only, then finalize the structured content overview."""
+        if file_id:
+            # Batch documents: the content tools need the document's file ID
+            description += f" Pass file_id {file_id} to the tools that take a file_id."
         return Task(
-            description="""Process PDF file and create abstract section only, then finalize the structured content overview.""",
-            agent=self.pdf_processor(),
+            description=description,
+            agent=agent,
             expected_output="section name",
         )
 
-    def crew(self) -> Crew:
+    def crew(self, document: PdfDocument, file_id: Optional[str] = None) -> Crew:
         """创建PDF处理crew"""
+        agent = self.pdf_processor(document)
         return Crew(
-            agents=[self.pdf_processor()],
-            tasks=[self.process_pdf_task()],
+            agents=[agent],
+            tasks=[self.process_pdf_task(agent, file_id)],
             process=Process.sequential,
             verbose=True,
         )
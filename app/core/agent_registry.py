@@ -0,0 +1,266 @@
+"""
+Agent Discovery and Registration
+
+Agent executors no longer need to be imported and listed in main.py by hand.
+Every ITaskExecutor subclass defined in a module under app/agents/ is
+discovered, plus executors that installed packages publish through the
+``oma.agents`` entry point group:
+
+    [tool.poetry.plugins."oma.agents"]
+    citation_checker = "oma_citations.agent:CitationChecker"
+
+The discovered set is cached in a manifest at image build time
+(``python -m app.core.agent_registry build``), so startup reads one JSON file
+and imports only the selected agents instead of scanning and importing every
+module.
+
+OMA_AGENTS selects the agents a deployment runs (comma-separated agent roles),
+so one image can run hot and cold agents as separately scaled services:
+
+    OMA_AGENTS=""                                   # all agents except sample_* modules
+    OMA_AGENTS="*"                                  # everything, samples included
+    OMA_AGENTS="simple_read_test,claude_code_demo"  # just these
+
+The adapter an agent is scheduled with is taken from an ``adapter_class``
+attribute on the executor when present, otherwise inferred from the type hint
+of the ``adapter`` parameter of ``__init__`` (no such parameter: no adapter,
+as for Claude Code agents; an abstract IAdapter hint: CrewAIToolAdapter).
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import importlib.metadata
+import inspect
+import json
+import os
+import sys
+import typing
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from oxsci_oma_core.models.adapter import ITaskExecutor
+from oxsci_shared_core.logging import logger
+
+AGENTS_PACKAGE = "app.agents"
+AGENTS_DIR = Path(__file__).resolve().parent.parent / "agents"
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / "config" / "agent_manifest.json"
+MANIFEST_VERSION = 1
+ENTRY_POINT_GROUP = "oma.agents"
+
+# Modules under app/agents/ that never hold deployable agents
+SKIPPED_MODULES = ("__init__", "agent_template")
+# Modules only selected when named explicitly (or with OMA_AGENTS="*")
+SAMPLE_PREFIX = "sample_"
+DEFAULT_ADAPTER = "oxsci_oma_core.adapter.crew_ai:CrewAIToolAdapter"
+
+
+class AgentRegistryError(ValueError):
+    """Raised for duplicate agent roles or unloadable registrations."""
+
+
+@dataclass(frozen=True)
+class AgentEntry:
+    """One discovered agent executor, referenced by import path."""
+
+    role: str
+    target: str  # "module:Class"
+    adapter: Optional[str] = None  # "module:Class", None when no adapter is needed
+    sample: bool = False
+
+    def load(self) -> Tuple[Type[Any], Optional[Type[Any]]]:
+        """Import the executor class and its adapter class."""
+        executor_class = _import_object(self.target)
+        adapter_class = _import_object(self.adapter) if self.adapter else None
+        return executor_class, adapter_class
+
+
+def _import_object(path: str) -> Any:
+    module_name, _, attr = path.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _qualified_name(cls: Type[Any]) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def infer_adapter(executor_class: Type[Any]) -> Optional[str]:
+    """Adapter import path for an executor (see module docstring for the rules)."""
+    explicit = getattr(executor_class, "adapter_class", None)
+    if inspect.isclass(explicit):
+        return _qualified_name(explicit)
+
+    # Decorators like @CrewBase wrap __init__ in (*args, **kwargs): use the first
+    # __init__ in the MRO with a concrete signature
+    for klass in executor_class.__mro__:
+        init = klass.__dict__.get("__init__")
+        if init is None:
+            continue
+        params = inspect.signature(init).parameters
+        if all(
+            p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD) for p in list(params.values())[1:]
+        ):
+            continue
+        if "adapter" not in params:
+            return None
+        try:
+            hint = typing.get_type_hints(init).get("adapter")
+        except Exception:
+            hint = None
+        if inspect.isclass(hint) and not inspect.isabstract(hint) and hint.__name__ != "IAdapter":
+            return _qualified_name(hint)
+        return DEFAULT_ADAPTER
+    return None
+
+
+def _executors_in(module: Any) -> List[Tuple[str, Type[Any]]]:
+    """(attribute name, class) of the executors a module defines."""
+    found = []
+    for name, obj in vars(module).items():
+        if (
+            inspect.isclass(obj)
+            and issubclass(obj, ITaskExecutor)
+            and obj is not ITaskExecutor
+            and getattr(obj, "agent_role", None)
+            # Defined (or subclassed) here, not imported from another module
+            and any(k.__module__ == module.__name__ for k in obj.__mro__)
+        ):
+            found.append((name, obj))
+    return found
+
+
+def discover_agents(agents_dir: Path = AGENTS_DIR) -> List[AgentEntry]:
+    """Import app/agents/*.py and installed entry points and collect their executors."""
+    entries: Dict[str, AgentEntry] = {}
+
+    def add(entry: AgentEntry) -> None:
+        existing = entries.get(entry.role)
+        if existing is not None and existing.target != entry.target:
+            raise AgentRegistryError(
+                f"Agent role '{entry.role}' is defined by both "
+                f"{existing.target} and {entry.target}"
+            )
+        entries[entry.role] = entry
+
+    for path in sorted(agents_dir.glob("*.py")):
+        if path.stem in SKIPPED_MODULES:
+            continue
+        module = importlib.import_module(f"{AGENTS_PACKAGE}.{path.stem}")
+        for name, executor_class in _executors_in(module):
+            add(
+                AgentEntry(
+                    role=executor_class.agent_role,
+                    target=f"{module.__name__}:{name}",
+                    adapter=infer_adapter(executor_class),
+                    sample=path.stem.startswith(SAMPLE_PREFIX),
+                )
+            )
+
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        executor_class = entry_point.load()
+        add(
+            AgentEntry(
+                role=getattr(executor_class, "agent_role", entry_point.name),
+                target=entry_point.value,
+                adapter=infer_adapter(executor_class),
+            )
+        )
+
+    return sorted(entries.values(), key=lambda e: e.role)
+
+
+def write_manifest(path: Path = MANIFEST_PATH) -> List[AgentEntry]:
+    """Discover agents and write the manifest (atomic replace)."""
+    entries = discover_agents()
+    data = {"version": MANIFEST_VERSION, "agents": [asdict(e) for e in entries]}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return entries
+
+
+def read_manifest(path: Path = MANIFEST_PATH) -> Optional[List[AgentEntry]]:
+    """Agents from a build-time manifest, or None when missing or outdated."""
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    return [AgentEntry(**item) for item in data.get("agents", [])]
+
+
+def get_agent_entries(use_manifest: bool = True) -> List[AgentEntry]:
+    """All registered agents: the build-time manifest, else a live discovery."""
+    if use_manifest:
+        entries = read_manifest()
+        if entries is not None:
+            return entries
+        logger.info(f"No agent manifest at {MANIFEST_PATH}, discovering agents")
+    return discover_agents()
+
+
+def select_agents(entries: List[AgentEntry], selection: str = "") -> List[AgentEntry]:
+    """Filter entries by an OMA_AGENTS value (see module docstring)."""
+    selection = selection.strip()
+    if not selection:
+        return [e for e in entries if not e.sample]
+    if selection in ("*", "all"):
+        return list(entries)
+
+    by_role = {e.role: e for e in entries}
+    selected = []
+    for role in (r.strip() for r in selection.split(",")):
+        if not role:
+            continue
+        if role not in by_role:
+            logger.error(f"OMA_AGENTS: unknown agent role '{role}' (known: {sorted(by_role)})")
+            continue
+        selected.append(by_role[role])
+    return selected
+
+
+def load_agents(
+    selection: str = "", use_manifest: bool = True
+) -> List[Tuple[Type[Any], Optional[Type[Any]]]]:
+    """(executor_class, adapter_class) of the selected agents, importing only those."""
+    agents = []
+    for entry in select_agents(get_agent_entries(use_manifest), selection):
+        try:
+            agents.append(entry.load())
+        except Exception as e:
+            logger.error(f"Failed to load agent '{entry.role}' from {entry.target}: {e}")
+    return agents
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Discover agent executors and build the agent manifest"
+    )
+    parser.add_argument("command", choices=["build", "list"])
+    parser.add_argument("--manifest", type=Path, default=MANIFEST_PATH)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            entries = write_manifest(args.manifest)
+            print(f"✅ {len(entries)} agents written to {args.manifest}")
+        else:
+            entries = discover_agents()
+    except Exception as e:
+        print(f"❌ Agent discovery failed: {e}", file=sys.stderr)
+        return 1
+
+    for entry in entries:
+        sample = " (sample)" if entry.sample else ""
+        print(f"  {entry.role}: {entry.target} [adapter: {entry.adapter}]{sample}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,364 @@
+"""
+Local Article Index
+
+Comparative analysis agents search articles and then try up to 20
+``get_article`` calls to find ones with an abstract. Across a corpus in one
+field the same references come up again and again, so ``get_article`` results
+are kept in a local SQLite index keyed by DOI
+({OMA_CACHE_DIR}/articles.sqlite, shared by the workers of a pod):
+
+- ``get_article`` is answered locally for DOIs seen before. DOIs whose article
+  has no abstract are recorded as negative entries (for
+  ARTICLE_INDEX_NEGATIVE_TTL seconds, abstracts are sometimes added later).
+- ``search_articles`` results are filtered: candidates known to lack an
+  abstract are removed before the LLM sees them.
+- An inverted keyword index (title, abstract and keywords of each article)
+  can answer ``search_articles`` locally when at least
+  ARTICLE_INDEX_LOCAL_SEARCH_MIN_HITS indexed articles contain all query
+  keywords (0 = always search remotely). Searches with filters other than the
+  query and a result limit are always sent to the server.
+
+Registered before the MCP server middlewares, so local answers skip
+the circuit breakers and deadlines of the MCP servers. Hit counts are
+reported at GET /article-index.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+from app.core.tool_pipeline import ToolCall, ToolHandler, result_payload
+
+GET_ARTICLE = "get_article"
+SEARCH_ARTICLES = "search_articles"
+
+QUERY_ARGUMENTS = ("query", "keyword", "keywords", "q")
+LIMIT_ARGUMENTS = ("limit", "max_results", "top_k", "page_size")
+RESULT_LISTS = ("articles", "results", "items", "data")
+# Shorter "abstracts" are placeholders ("N/A", "No abstract available.")
+MIN_ABSTRACT_CHARS = 40
+DEFAULT_SEARCH_LIMIT = 10
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9-]{2,}")
+STOPWORDS = frozenset(
+    {
+        "and",
+        "the",
+        "for",
+        "with",
+        "from",
+        "that",
+        "this",
+        "are",
+        "was",
+        "were",
+        "its",
+        "into",
+        "using",
+        "based",
+        "study",
+        "analysis",
+    }
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    doi TEXT PRIMARY KEY,
+    has_abstract INTEGER NOT NULL,
+    title TEXT,
+    result TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT NOT NULL,
+    doi TEXT NOT NULL,
+    PRIMARY KEY (term, doi)
+) WITHOUT ROWID;
+"""
+
+
+def normalize_doi(doi: Any) -> str:
+    doi = str(doi or "").strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix) :]
+    return doi
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _article(payload: Any) -> Optional[Dict[str, Any]]:
+    """The article of a get_article result (None for errors and unknown shapes)."""
+    if not isinstance(payload, dict) or payload.get("error"):
+        return None
+    for key in ("article", "data", "result"):
+        if isinstance(payload.get(key), dict):
+            return payload[key]
+    return payload
+
+
+def _abstract(article: Dict[str, Any]) -> str:
+    abstract = article.get("abstract") or ""
+    return abstract.strip() if isinstance(abstract, str) else ""
+
+
+def article_text(result: str) -> Optional[str]:
+    """Abstract of a stored get_article result."""
+    article = _article(result_payload(result))
+    return _abstract(article) if article is not None else None
+
+
+def _result_text(result: Any) -> str:
+    """Tool result as the text served on later hits."""
+    if isinstance(result, str):
+        return result
+    return json.dumps(result_payload(result), ensure_ascii=False, default=str)
+
+
+def search_items(payload: Any) -> Tuple[Optional[str], List[Any]]:
+    """Result list key (None for a bare list) and the listed articles."""
+    if isinstance(payload, list):
+        return None, payload
+    if isinstance(payload, dict):
+        for key in RESULT_LISTS:
+            if isinstance(payload.get(key), list):
+                return key, payload[key]
+    return None, []
+
+
+class ArticleIndex:
+    """SQLite store of get_article results with an inverted keyword index."""
+
+    def __init__(self, path: Path, negative_ttl: float = 30 * 24 * 3600):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the event loop and CrewAI tool threads
+        self._db = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, doi: str) -> Optional[Tuple[bool, str]]:
+        """(has abstract, stored result) of a DOI, None when unknown or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT has_abstract, result, updated_at FROM articles WHERE doi = ?",
+                (doi,),
+            ).fetchone()
+        if row is None:
+            return None
+        has_abstract, result, updated_at = row
+        if not has_abstract and time.time() - updated_at > self.negative_ttl:
+            return None
+        return bool(has_abstract), result
+
+    def put(self, doi: str, article: Dict[str, Any], result: str) -> bool:
+        """Store an article; returns whether it has an abstract."""
+        abstract = _abstract(article)
+        has_abstract = len(abstract) >= MIN_ABSTRACT_CHARS
+        title = str(article.get("title") or "")
+        keywords = article.get("keywords") or []
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        terms = set(tokenize(" ".join([title, abstract, *map(str, keywords)])))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?)",
+                (doi, int(has_abstract), title, result, time.time()),
+            )
+            self._db.execute("DELETE FROM terms WHERE doi = ?", (doi,))
+            if has_abstract:
+                self._db.executemany(
+                    "INSERT INTO terms VALUES (?, ?)", [(t, doi) for t in terms]
+                )
+        return has_abstract
+
+    def negatives(self, dois: List[str]) -> Set[str]:
+        """DOIs among ``dois`` with an unexpired negative entry."""
+        if not dois:
+            return set()
+        cutoff = time.time() - self.negative_ttl
+        placeholders = ",".join("?" * len(dois))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT doi FROM articles WHERE has_abstract = 0 "
+                f"AND updated_at >= ? AND doi IN ({placeholders})",
+                (cutoff, *dois),
+            ).fetchall()
+        return {doi for (doi,) in rows}
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Indexed articles containing all query keywords, most recent first."""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        placeholders = ",".join("?" * len(terms))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT a.result FROM terms t JOIN articles a ON a.doi = t.doi "
+                f"WHERE t.term IN ({placeholders}) GROUP BY t.doi "
+                f"HAVING COUNT(*) = ? ORDER BY a.updated_at DESC LIMIT ?",
+                (*terms, len(terms), limit),
+            ).fetchall()
+        articles = []
+        for (result,) in rows:
+            article = _article(result_payload(result))
+            if article is not None:
+                articles.append(article)
+        return articles
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            total, positive = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(has_abstract), 0) FROM articles"
+            ).fetchone()
+        return {
+            "articles": total,
+            "with_abstract": positive,
+            "negative": total - positive,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class ArticleIndexMiddleware:
+    """Tool pipeline middleware answering article lookups from the local index."""
+
+    def __init__(self, index: ArticleIndex, local_search_min_hits: int = 0):
+        self.index = index
+        self.local_search_min_hits = local_search_min_hits
+        self.stats: Dict[str, int] = {
+            "article_hits": 0,
+            "article_misses": 0,
+            "negative_hits": 0,
+            "filtered_candidates": 0,
+            "local_searches": 0,
+        }
+
+    async def __call__(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        if call.tool == GET_ARTICLE:
+            return await self._get_article(call, call_next)
+        if call.tool == SEARCH_ARTICLES:
+            return await self._search(call, call_next)
+        return await call_next(call)
+
+    async def _get_article(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        doi = normalize_doi(call.arguments.get("doi"))
+        if not doi:
+            return await call_next(call)
+        cached = self.index.get(doi)
+        if cached is not None:
+            has_abstract, result = cached
+            self.stats["article_hits" if has_abstract else "negative_hits"] += 1
+            call.metadata["article_index"] = "hit"
+            return result
+
+        self.stats["article_misses"] += 1
+        result = await call_next(call)
+        article = _article(result_payload(result))
+        if article is not None:
+            self.index.put(doi, article, _result_text(result))
+        return result
+
+    def _local_query(self, arguments: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+        """Query text and limit of a search the index can answer."""
+        if self.local_search_min_hits <= 0:
+            return None
+        if any(k not in QUERY_ARGUMENTS + LIMIT_ARGUMENTS for k in arguments):
+            return None
+        query = " ".join(
+            " ".join(map(str, v)) if isinstance(v, list) else str(v)
+            for k, v in arguments.items()
+            if k in QUERY_ARGUMENTS and v
+        )
+        limit = next(
+            (int(arguments[k]) for k in LIMIT_ARGUMENTS if arguments.get(k)),
+            DEFAULT_SEARCH_LIMIT,
+        )
+        return (query, limit) if query else None
+
+    async def _search(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        local = self._local_query(call.arguments)
+        if local is not None:
+            query, limit = local
+            articles = self.index.search(query, limit)
+            if len(articles) >= min(self.local_search_min_hits, limit):
+                self.stats["local_searches"] += 1
+                call.metadata["article_index"] = "local_search"
+                return json.dumps(
+                    {"articles": articles, "total": len(articles)},
+                    ensure_ascii=False,
+                    default=str,
+                )
+
+        result = await call_next(call)
+        payload = result_payload(result)
+        key, items = search_items(payload)
+        dois = [
+            normalize_doi(item.get("doi")) for item in items if isinstance(item, dict)
+        ]
+        negatives = self.index.negatives([d for d in dois if d])
+        if not negatives:
+            return result
+        kept = [
+            item
+            for item in items
+            if not (
+                isinstance(item, dict) and normalize_doi(item.get("doi")) in negatives
+            )
+        ]
+        self.stats["filtered_candidates"] += len(items) - len(kept)
+        logger.debug(f"Filtered {len(items) - len(kept)} articles without abstract")
+        filtered = kept if key is None else {**payload, key: kept}
+        return json.dumps(filtered, ensure_ascii=False, default=str)
+
+
+# Global middleware (created in the application lifespan when ARTICLE_INDEX_ENABLED)
+article_index: Optional[ArticleIndexMiddleware] = None
+
+
+def configure(
+    path: Path, enabled: bool, negative_ttl: float, local_search_min_hits: int
+) -> Optional[ArticleIndexMiddleware]:
+    """Create the index middleware (None when disabled or the index cannot open)."""
+    global article_index
+    if not enabled:
+        article_index = None
+        return None
+    try:
+        index = ArticleIndex(path, negative_ttl=negative_ttl)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Article index disabled, cannot open {path}: {e}")
+        article_index = None
+        return None
+    article_index = ArticleIndexMiddleware(index, local_search_min_hits)
+    logger.info(f"Article index at {path}: {index.counts()}")
+    return article_index
+
+
+router = APIRouter()
+
+
+@router.get("/article-index")
+async def article_index_stats() -> Dict[str, Any]:
+    if article_index is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        **article_index.index.counts(),
+        "stats": article_index.stats,
+    }
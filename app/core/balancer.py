@@ -0,0 +1,230 @@
+"""
+Client-Side Load Balancing across MCP Replicas
+
+With ``"direct_routing": true`` a server's tool calls bypass the single
+service endpoint / proxy and go straight to one of its replicas:
+
+    "mcp-article-processing": {
+      "direct_routing": true,
+      "load_balancing": "ewma",            # or "least_outstanding" (default)
+      "resolve_interval": 30,              # seconds between re-resolution
+      "replicas": ["http://10.0.1.12:8060", "http://10.0.2.40:8060"]
+    }
+
+Replicas come from the ``replicas`` list when given, otherwise from resolving
+``{service_name}.oxsci.internal`` (Cloud Map multivalue A records), refreshed
+every ``resolve_interval`` seconds.
+
+Selection uses power-of-two-choices over either the number of outstanding
+requests or an EWMA of latency weighted by outstanding requests.
+
+Outlier ejection: a replica that fails EJECT_AFTER_FAILURES calls in a row
+(transport errors or timeouts) is taken out of rotation for EJECT_SECONDS.
+After the cooldown it gets traffic again; its next failure ejects it at once,
+its next success resets the count. When every replica is ejected, all of them
+are used rather than none. Calls cancelled before their deadline (e.g. the
+losing request of a hedge) and budget-capped timeouts do not count.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from oxsci_shared_core.logging import logger
+
+from app.core.mcp_config import MCPServerConfig
+from app.core.mcp_registry import registry
+from app.core.mcp_transport import MCPToolError
+from app.core.resilience import ResilientServerPool
+from app.core.tool_pipeline import ToolCall, ToolHandler
+
+# Weight of the newest sample in the latency EWMA
+EWMA_ALPHA = 0.3
+# Consecutive failures that eject a replica, and how long it stays ejected
+EJECT_AFTER_FAILURES = 3
+EJECT_SECONDS = 30.0
+
+
+@dataclass
+class Replica:
+    """One resolved replica endpoint and its load statistics."""
+
+    url: str
+    outstanding: int = 0
+    ewma: float = 0.0
+    # Consecutive failed calls
+    failures: int = 0
+    # Monotonic time until which the replica is out of rotation
+    ejected_until: float = 0.0
+
+    def score(self, policy: str) -> float:
+        if policy == "ewma":
+            # Unknown latency counts as fast so new replicas get traffic
+            return self.ewma * (self.outstanding + 1)
+        return float(self.outstanding)
+
+
+def resolve_replicas(server: MCPServerConfig) -> List[str]:
+    """Replica URLs from the explicit list or from DNS of the service name."""
+    if server.replicas:
+        return list(server.replicas)
+    host = f"{server.service_name}.oxsci.internal"
+    infos = socket.getaddrinfo(host, server.port, type=socket.SOCK_STREAM)
+    addresses = sorted({info[4][0] for info in infos})
+    return [
+        f"http://[{a}]:{server.port}" if ":" in a else f"http://{a}:{server.port}"
+        for a in addresses
+    ]
+
+
+class ReplicaBalancer:
+    """Picks a replica per call and tracks per-replica load."""
+
+    def __init__(self, policy: str = "least_outstanding"):
+        self.policy = policy
+        self._replicas: Dict[str, Replica] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def replicas(self) -> List[Replica]:
+        with self._lock:
+            return list(self._replicas.values())
+
+    def update(self, urls: List[str]) -> None:
+        """Replace the replica set, keeping statistics of replicas that remain."""
+        with self._lock:
+            self._replicas = {url: self._replicas.get(url) or Replica(url) for url in urls}
+
+    def pick(self) -> Optional[Replica]:
+        with self._lock:
+            candidates = list(self._replicas.values())
+            if not candidates:
+                return None
+            now = time.monotonic()
+            # Never eject the whole set: with every replica ejected, use all
+            candidates = [r for r in candidates if r.ejected_until <= now] or candidates
+            if len(candidates) > 2:
+                candidates = random.sample(candidates, 2)
+            replica = min(candidates, key=lambda r: r.score(self.policy))
+            replica.outstanding += 1
+            return replica
+
+    def release(
+        self, replica: Replica, seconds: float, success: Optional[bool]
+    ) -> None:
+        """Record a finished call (success None: cancelled, outcome unknown)."""
+        with self._lock:
+            replica.outstanding -= 1
+            if success is None:
+                return
+            if success:
+                replica.failures = 0
+                replica.ewma = (
+                    seconds
+                    if replica.ewma == 0
+                    else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * replica.ewma
+                )
+            else:
+                replica.failures += 1
+                # Penalise failing replicas until they answer again
+                replica.ewma = max(replica.ewma, seconds) * 2
+                if replica.failures >= EJECT_AFTER_FAILURES:
+                    replica.ejected_until = time.monotonic() + EJECT_SECONDS
+                    logger.warning(
+                        f"Replica {replica.url} ejected for {EJECT_SECONDS:.0f}s "
+                        f"after {replica.failures} consecutive failures"
+                    )
+
+
+class BalancedServerPool(ResilientServerPool):
+    """ServerPool that routes calls directly to load-balanced replicas."""
+
+    def __init__(self, server: MCPServerConfig):
+        super().__init__(server)
+        self.balancer = ReplicaBalancer(server.load_balancing)
+        self._resolve_task: Optional[asyncio.Task] = None
+
+    @property
+    def direct(self) -> bool:
+        return self.server.direct_routing and not self.server.url_override
+
+    async def resolve(self) -> None:
+        try:
+            urls = await asyncio.to_thread(resolve_replicas, self.server)
+        except OSError as e:
+            logger.warning(f"Replica resolution failed for {self.name}: {e}")
+            return
+        if urls:
+            self.balancer.update(urls)
+
+    async def _refresh(self) -> None:
+        while True:
+            await asyncio.sleep(self.server.resolve_interval)
+            await self.resolve()
+
+    async def open(self) -> None:
+        await super().open()
+        if self.direct:
+            await self.resolve()
+            logger.info(
+                f"Direct routing for {self.name} over "
+                f"{[r.url for r in self.balancer.replicas]} ({self.balancer.policy})"
+            )
+            self._resolve_task = asyncio.create_task(self._refresh())
+
+    async def close(self) -> None:
+        if self._resolve_task is not None:
+            self._resolve_task.cancel()
+            self._resolve_task = None
+        await super().close()
+
+
+class DirectRoutingMiddleware:
+    """
+    Tool pipeline middleware: sends calls of direct-routing servers to a
+    balanced replica; other servers continue to the adapter's MCP client.
+    """
+
+    async def __call__(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        pool = registry.pool(call.server) if call.server else None
+        if not isinstance(pool, BalancedServerPool) or not pool.direct:
+            return await call_next(call)
+        replica = pool.balancer.pick()
+        if replica is None:
+            return await call_next(call)
+
+        call.metadata["replica"] = replica.url
+        # Read before awaiting: a hedge's second request overwrites them
+        deadline = call.metadata.get("deadline")
+        budget_capped = call.metadata.get("budget_capped", False)
+        start = time.monotonic()
+        success: Optional[bool] = False
+        try:
+            result = await pool.transport.call_tool(
+                replica.url,
+                call.tool,
+                call.arguments,
+                call.metadata.get("timeout"),
+                headers=pool.server.auth_headers(),
+            )
+            success = True
+            return result
+        except MCPToolError:
+            # The replica answered, the tool itself failed
+            success = True
+            raise
+        except asyncio.CancelledError:
+            # Reaching the call's own deadline counts against the replica; a
+            # budget-capped deadline or a hedge cancelling the loser does not
+            timed_out = deadline is not None and time.monotonic() >= deadline
+            if not timed_out or budget_capped:
+                success = None
+            raise
+        finally:
+            pool.balancer.release(replica, time.monotonic() - start, success)
@@ -0,0 +1,140 @@
+"""
+Batch Document Processing
+
+Agents that take a single ``file_id`` can also take ``file_ids`` (a list) and
+process many documents in one task, so per-task overhead (scheduling, MCP
+sessions, LLM client, tool bindings) is paid once per batch instead of once
+per document:
+
+    if is_batch(self.context):
+        file_ids = batch_inputs(self.context)
+        concurrency = batch_concurrency(self.context)
+        results = await run_batch(file_ids, self.process_document, concurrency)
+        return batch_result(self.agent_role, results)
+
+Shared per-task resources (LLM client, MCP tool bindings) are created once
+and used by every document; per-document state (the PDF handle) is created in
+the handler. Document handlers pass the file ID explicitly to the tools, so
+batch tools must accept a ``file_id`` argument instead of reading it from the
+task context.
+
+Documents run with bounded concurrency (BATCH_CONCURRENCY, overridable per task
+with the ``batch_concurrency`` shared data field). Each document reports its
+own status: one failed manuscript does not fail the batch. The task budget
+(app.core.timeouts) is scaled to the batch: the agent timeout per round of
+concurrent documents. Agents whose documents cannot run concurrently (e.g.
+because their tools write to the shared task context) define a
+``document_concurrency(context)`` static method, which the budget uses too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from oxsci_shared_core.logging import logger
+
+from app.core.config import config
+
+SUCCESS = "success"
+ERROR = "error"
+PARTIAL = "partial"
+
+
+@dataclass
+class ItemResult:
+    """Outcome of one document of a batch."""
+
+    item: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+def is_batch(context: Any, batch_key: str = "file_ids") -> bool:
+    """Whether the task was given a batch of documents."""
+    return bool(context.get_shared_data(batch_key, None))
+
+
+def batch_inputs(
+    context: Any, single_key: str = "file_id", batch_key: str = "file_ids"
+) -> List[str]:
+    """The task's documents: ``file_ids`` when given, else the single ``file_id``."""
+    items = context.get_shared_data(batch_key, None)
+    if isinstance(items, str):
+        items = [i.strip() for i in items.split(",") if i.strip()]
+    if items:
+        # Keep order, drop duplicates
+        return list(dict.fromkeys(str(i) for i in items))
+    single = context.get_shared_data(single_key, None)
+    if not single:
+        raise ValueError(f"{single_key} or {batch_key} is required in context")
+    return [str(single)]
+
+
+def batch_concurrency(context: Any) -> int:
+    value = context.get_shared_data("batch_concurrency", None)
+    return max(1, int(value or config.BATCH_CONCURRENCY))
+
+
+def budget_scale(
+    context: Any, concurrency: Callable[[Any], int] = batch_concurrency
+) -> Tuple[int, int]:
+    """
+    Multipliers of the task budget's time and steps: a batch gets the agent
+    timeout once per round of concurrent documents and the steps of every
+    document. ``concurrency`` is the agent's documents-at-once policy.
+    """
+    if context is None or not is_batch(context):
+        return 1, 1
+    documents = len(batch_inputs(context))
+    return -(-documents // concurrency(context)), documents
+
+
+async def run_batch(
+    items: Sequence[str],
+    handler: Callable[[str], Awaitable[Any]],
+    concurrency: int,
+) -> List[ItemResult]:
+    """Run ``handler`` for every item, at most ``concurrency`` at a time."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(item: str) -> ItemResult:
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                result = await handler(item)
+                status, error = SUCCESS, None
+            except Exception as e:
+                logger.error(f"Batch item {item} failed: {e}")
+                result, status, error = None, ERROR, str(e)
+            seconds = round(time.monotonic() - start, 3)
+            return ItemResult(item, status, result, error, seconds)
+
+    results = await asyncio.gather(*(run_one(item) for item in items))
+    failed = sum(1 for r in results if r.status == ERROR)
+    logger.info(f"Batch of {len(items)} documents finished, {failed} failed")
+    return list(results)
+
+
+def batch_result(agent_role: str, results: List[ItemResult]) -> Dict[str, Any]:
+    """Task result with one entry per document."""
+    failed = sum(1 for r in results if r.status == ERROR)
+    if not failed:
+        status = SUCCESS
+    elif failed == len(results):
+        status = ERROR
+    else:
+        status = PARTIAL
+    return {
+        "status": status,
+        "result": {
+            "documents": [asdict(r) for r in results],
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "agent_role": agent_role,
+        },
+    }
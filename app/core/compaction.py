@@ -0,0 +1,166 @@
+"""
+Conversation History Compaction
+
+Tool loops append every tool result to the message history, and the whole
+history is resent on each turn (LangGraph ``recursion_limit``, CrewAI
+``max_iter``). A few ``get_pdf_pages`` results make every later request
+megabytes large.
+
+HistoryCompactionMiddleware shortens old tool results before the request is
+sent. The most recent LLM_COMPACT_KEEP_RECENT tool results are kept in full.
+Older results longer than LLM_COMPACT_MIN_CHARS keep their first
+LLM_COMPACT_KEEP_CHARS characters, followed by a note naming the tool call
+that produced them, so the agent can fetch the full result again if it needs
+it.
+
+Compaction is append-only: older results are compacted in batches of
+LLM_COMPACT_BATCH, and the batch boundary only depends on the number of tool
+results in the history. Between boundaries the part of the request already
+sent stays byte-identical, so provider prompt caches keep matching it; only
+every LLM_COMPACT_BATCH-th tool result rewrites the earlier ones, once.
+
+Handled tool results:
+- LangChain ``ToolMessage`` (LangGraph), referenced via the AIMessage tool calls
+- OpenAI-style ``{"role": "tool"}`` messages (CrewAI function calling)
+- CrewAI ReAct turns (``Action`` / ``Action Input`` / ``Observation`` text)
+
+The framework's own history is not modified; only the request is compacted.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.llm import LLMCall, LLMHandler, message_list, message_text
+
+OBSERVATION_MARKER = "Observation:"
+ACTION_PATTERN = re.compile(r"^Action:\s*(.+)$", re.MULTILINE)
+ACTION_INPUT_PATTERN = re.compile(r"^Action Input:\s*(.+)$", re.MULTILINE)
+
+
+def _role(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("role", "")
+    return getattr(message, "type", "")
+
+
+def _tool_call_refs(message: Any) -> Dict[str, Tuple[str, Any]]:
+    """Tool name and arguments by tool call ID of an assistant message."""
+    refs: Dict[str, Tuple[str, Any]] = {}
+    if isinstance(message, dict):
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function") or {}
+            refs[tool_call.get("id", "")] = (
+                function.get("name", "?"),
+                function.get("arguments"),
+            )
+    else:
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            refs[tool_call.get("id", "")] = (
+                tool_call.get("name", "?"),
+                tool_call.get("args"),
+            )
+    return refs
+
+
+def _reference(tool: Optional[str], arguments: Any) -> str:
+    if not tool:
+        return "Repeat the tool call if you need the full result."
+    if not isinstance(arguments, str):
+        arguments = json.dumps(arguments, ensure_ascii=False, default=str)
+    return f"Call {tool} with {arguments} again if you need the full result."
+
+
+def compact_text(text: str, keep_chars: int, reference: str) -> str:
+    omitted = len(text) - keep_chars
+    return (
+        f"{text[:keep_chars]}\n[Compacted: {omitted} more characters of this "
+        f"tool result were omitted. {reference}]"
+    )
+
+
+def _with_content(message: Any, content: str) -> Any:
+    if isinstance(message, dict):
+        return {**message, "content": content}
+    # LangChain BaseMessage (pydantic)
+    return message.model_copy(update={"content": content})
+
+
+class HistoryCompactionMiddleware:
+    """LLM pipeline middleware: shortens large tool results of earlier turns."""
+
+    def __init__(
+        self,
+        min_chars: int = 4000,
+        keep_chars: int = 500,
+        keep_recent: int = 2,
+        batch: int = 4,
+    ):
+        self.min_chars = min_chars
+        self.keep_chars = keep_chars
+        self.keep_recent = keep_recent
+        self.batch = max(batch, 1)
+
+    def _tool_results(self, messages: List[Any]) -> List[Tuple[int, Optional[str], Any]]:
+        """Positions of tool results with the tool call that produced them."""
+        results: List[Tuple[int, Optional[str], Any]] = []
+        refs: Dict[str, Tuple[str, Any]] = {}
+        for index, message in enumerate(messages):
+            role = _role(message)
+            if role in ("ai", "assistant"):
+                refs.update(_tool_call_refs(message))
+                text = message_text(message)
+                if OBSERVATION_MARKER in text:
+                    action = ACTION_PATTERN.search(text)
+                    action_input = ACTION_INPUT_PATTERN.search(text)
+                    results.append(
+                        (
+                            index,
+                            action.group(1).strip() if action else None,
+                            action_input.group(1).strip() if action_input else "",
+                        )
+                    )
+            elif role == "tool":
+                tool_call_id = (
+                    message.get("tool_call_id")
+                    if isinstance(message, dict)
+                    else getattr(message, "tool_call_id", None)
+                )
+                tool, arguments = refs.get(tool_call_id or "", (None, None))
+                results.append((index, tool, arguments))
+        return results
+
+    def compact(self, messages: List[Any]) -> Tuple[List[Any], int]:
+        """Compacted copy of the messages and the number of characters removed."""
+        results = self._tool_results(messages)
+        # Whole batches only, so the compacted prefix is the same on every turn
+        # until another batch of tool results has been appended
+        older = max(len(results) - self.keep_recent, 0)
+        results = results[: older - older % self.batch]
+        compacted = list(messages)
+        removed = 0
+        for index, tool, arguments in results:
+            message = messages[index]
+            text = message_text(message)
+            if _role(message) == "tool":
+                prefix, result = "", text
+            else:
+                # CrewAI ReAct turn: keep the thought and action, compact the observation
+                head, _, result = text.rpartition(OBSERVATION_MARKER)
+                prefix = head + OBSERVATION_MARKER
+            if len(result) < self.min_chars:
+                continue
+            short = compact_text(result, self.keep_chars, _reference(tool, arguments))
+            compacted[index] = _with_content(message, prefix + short)
+            removed += len(result) - len(short)
+        return compacted, removed
+
+    async def __call__(self, call: LLMCall, call_next: LLMHandler) -> Any:
+        if self.min_chars > 0 and not isinstance(call.messages, str):
+            messages, removed = self.compact(message_list(call.messages))
+            if removed:
+                call.messages = messages
+                call.metadata["compacted_chars"] = removed
+        return await call_next(call)
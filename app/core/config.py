@@ -2,6 +2,8 @@
 Configuration Management
 """
 
+from typing import Dict, List
+
 from oxsci_shared_core.config import BaseConfig
 
 
@@ -23,6 +25,126 @@ class Config(BaseConfig):
     MCP_ENV: str = ""
     MCP_PROXY_URL: str = ""
     PROXY_API_KEY: str = ""
+    # Load the MCP config snapshot built into the image (python -m app.core.mcp_config build)
+    # falls back to merging base.json + {env}.json when the snapshot is missing; turn it
+    # off to use config files mounted over the image
+    MCP_CONFIG_SNAPSHOT: bool = True
+    # Poll app/config/mcp/*.json every N seconds and hot reload on change (0 = disabled)
+    # SIGHUP always triggers a reload
+    MCP_RELOAD_INTERVAL: float = 0
+
+    # Hedged requests for idempotent MCP read tools: send a duplicate request when the
+    # first has not answered after the tool's observed latency percentile
+    # (circuit breakers are always on, tune them per server in app/config/mcp/*.json)
+    MCP_HEDGE_ENABLED: bool = False
+    MCP_HEDGE_TOOLS: List[str] = ["get_article", "get_content_section_detail"]
+    MCP_HEDGE_PERCENTILE: float = 95
+
+    # Adaptive per-tool timeouts: clamp(p99 * factor, min, server timeout) once a tool
+    # has enough samples; each call is also capped by the task budget (AgentConfig.timeout)
+    TOOL_TIMEOUT_FACTOR: float = 3.0
+    TOOL_TIMEOUT_MIN: float = 1.0
+    TOOL_TIMEOUT_MIN_SAMPLES: int = 20
+    TOOL_BUDGET_SLACK: float = 3.0
+
+    # Call MCP tools as async requests from the service event loop instead of blocking
+    # a thread in the adapter's synchronous tool. Opt-in: the adapter's tool is not
+    # run, so IDs the adapter auto-saves to the task context (e.g.
+    # structured_content_overview_id) are not saved; only enable it for agents that
+    # read IDs from tool results
+    MCP_NATIVE_TOOL_CALLS: bool = False
+    # Tools safe to send again through the adapter when a native call was not sent
+    MCP_IDEMPOTENT_TOOLS: List[str] = [
+        "get_article",
+        "get_content_section_detail",
+        "get_content_section_list",
+        "get_pdf_pages",
+        "search_articles",
+    ]
+    # Threads shared by all crews for synchronous tool calls that cannot run natively.
+    # A call that times out keeps its thread until the adapter's client returns (up
+    # to the server timeout): size for concurrent calls plus timed-out ones
+    TOOL_THREAD_POOL_SIZE: int = 16
+    # Threads for the blocking provider requests of synchronous (CrewAI) LLM calls;
+    # bounds concurrent CrewAI LLM requests per worker
+    LLM_THREAD_POOL_SIZE: int = 64
+
+    # Agents this deployment runs: comma-separated agent roles, "" = all non-sample
+    # agents, "*" = all (one image can run different agent subsets per service)
+    OMA_AGENTS: str = ""
+    # Read the agent manifest built into the image (python -m app.core.agent_registry build)
+    # instead of importing every module under app/agents/ at startup
+    OMA_AGENT_MANIFEST: bool = True
+
+    # Worker processes per pod (python -m app.core.workers), sharing one listening socket
+    # - shard: agent schedulers are split across the workers by agent role
+    # - replicate: every worker runs every scheduler, OMA_MAX_CONCURRENT_TASKS caps
+    #   concurrently executing tasks across all workers (0 = no cap)
+    OMA_WORKERS: int = 1
+    OMA_WORKER_MODE: str = "shard"
+    OMA_MAX_CONCURRENT_TASKS: int = 0
+    OMA_WORKER_SHUTDOWN_TIMEOUT: float = 30.0
+
+    # Task scheduling: "fifo" (each TaskScheduler in polling order) or "priority"
+    # (interactive before batch, least deadline slack first, at most
+    # TASK_SCHEDULING_SLOTS tasks executing per worker; 0 = no limit)
+    # Tasks that can no longer meet their deadline are "shed" or "defer"red
+    TASK_SCHEDULING_MODE: str = "fifo"
+    TASK_SCHEDULING_SLOTS: int = 4
+    TASK_SHED_POLICY: str = "shed"
+
+    # LLM rate limits per provider or model (requests and tokens per minute, per pod),
+    # e.g. {"openrouter": {"rpm": 500, "tpm": 400000}}; unlisted models are not limited
+    LLM_RATE_LIMITS: Dict[str, Dict[str, float]] = {}
+    # LLM response cache for deterministic calls (reprocessing replays earlier completions)
+    # agent roles to cache, ["*"] = all agents, [] = disabled; only requests with
+    # temperature <= LLM_CACHE_MAX_TEMPERATURE, kept in memory and in {OMA_CACHE_DIR}/llm_responses
+    LLM_CACHE_AGENTS: List[str] = []
+    LLM_CACHE_TTL: float = 7 * 24 * 3600
+    LLM_CACHE_SIZE: int = 256
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.2
+    # Provider prompt caching: models (substring match) that need explicit cache_control
+    # breakpoints on the system prompt and latest message; OpenAI/DeepSeek/Gemini cache
+    # prompt prefixes automatically ([] = never add breakpoints)
+    LLM_PROMPT_CACHE_MODELS: List[str] = ["anthropic", "claude"]
+    # History compaction for long tool loops: tool results of earlier turns longer than
+    # LLM_COMPACT_MIN_CHARS are cut to LLM_COMPACT_KEEP_CHARS plus a note to re-fetch them;
+    # the latest LLM_COMPACT_KEEP_RECENT tool results stay complete (0 chars = disabled).
+    # Older results are compacted LLM_COMPACT_BATCH at a time so the request prefix
+    # stays unchanged (and prompt-cached) between batches
+    LLM_COMPACT_MIN_CHARS: int = 4000
+    LLM_COMPACT_KEEP_CHARS: int = 500
+    LLM_COMPACT_KEEP_RECENT: int = 2
+    LLM_COMPACT_BATCH: int = 4
+
+    # Parser agents: "agent" (LLM tool loop) or "hybrid" (fixed tool sequence in code,
+    # one LLM call per section); tasks may override it with shared data "execution_mode"
+    PARSER_EXECUTION_MODE: str = "agent"
+
+    # Local article index ({OMA_CACHE_DIR}/articles.sqlite): get_article results by DOI,
+    # articles without abstract are remembered for ARTICLE_INDEX_NEGATIVE_TTL seconds;
+    # search_articles is answered locally with at least this many hits (0 = never)
+    ARTICLE_INDEX_ENABLED: bool = True
+    ARTICLE_INDEX_NEGATIVE_TTL: float = 30 * 24 * 3600
+    ARTICLE_INDEX_LOCAL_SEARCH_MIN_HITS: int = 0
+
+    # Pre-ranking of search_articles results by similarity to the manuscript abstract
+    # (agents opt in with ranking_reference): candidates kept (0 = disabled) and the
+    # sentence-transformers model to embed with ("" = feature hashing stand-in)
+    ARTICLE_RANKING_TOP_K: int = 10
+    ARTICLE_EMBEDDING_MODEL: str = ""
+
+    # Compact task context shared data while a task executes: interned keys, values of
+    # at least CONTEXT_BLOB_MIN_BYTES in a shared compressed blob store
+    CONTEXT_COMPACT_ENABLED: bool = True
+    CONTEXT_BLOB_MIN_BYTES: int = 4096
+
+    # Batch tasks (shared data "file_ids"): documents processed at once per task;
+    # tasks may override it with shared data "batch_concurrency"
+    BATCH_CONCURRENCY: int = 4
+
+    # Local state/cache directory (tool latency history, caches, indexes)
+    OMA_CACHE_DIR: str = ".cache/oma"
 
     # Claude Code integration mode: "cli" or "sdk"
     # - cli: Use subprocess-based CLI (default, production-ready),
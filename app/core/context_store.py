@@ -0,0 +1,326 @@
+"""
+Compact Task Context Storage
+
+Each task's OMAContext carries the outputs of every upstream pipeline step in
+its shared data, and a worker holds many concurrent contexts. While a task
+executes, its shared data dict is replaced with a CompactSharedData mapping:
+
+- keys and short string values are interned, so the keys and repeated values
+  (model names, agent roles) of all contexts are stored once
+- values larger than CONTEXT_BLOB_MIN_BYTES move out of the context into a
+  process-wide blob store as compressed, content-addressed blobs; the context
+  keeps a BlobRef. Identical upstream outputs of concurrent tasks share one
+  blob
+- a blob is decoded on the first read of its key and the decoded value is kept
+  for the rest of the task: later reads return the same object, so in-place
+  changes persist as with a dict and hot loops decode once. Values written
+  during the task are kept as given; the blob they replace is released
+
+The mapping is transparent for ``get_shared_data`` / ``set_shared_data`` and any
+code reading the dict. The plain dict is restored when execute() returns, so
+the framework serializes results as before. Contexts that do not expose their
+shared data as a dict (SHARED_DATA_ATTRIBUTES) are left unchanged.
+
+Memory profile for concurrent tasks (synthetic upstream outputs):
+
+    python -m app.core.context_store profile --tasks 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import pickle
+import random
+import sys
+import threading
+import tracemalloc
+import zlib
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from oxsci_shared_core.logging import logger
+
+from app.core.config import config
+
+# Attribute names under which context implementations keep their shared data
+SHARED_DATA_ATTRIBUTES = ("shared_data", "_shared_data")
+# String values up to this length are interned
+INTERN_MAX_CHARS = 64
+
+
+class BlobRef:
+    """Reference to a value in the blob store."""
+
+    __slots__ = ("digest", "size")
+
+    def __init__(self, digest: bytes, size: int):
+        self.digest = digest
+        self.size = size
+
+    def __repr__(self) -> str:
+        return f"BlobRef({self.digest.hex()[:12]}, {self.size} bytes)"
+
+
+class _Blob:
+    __slots__ = ("data", "refs")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.refs = 0
+
+
+class BlobStore:
+    """Process-wide, reference-counted store of compressed pickled values."""
+
+    def __init__(self) -> None:
+        self._blobs: Dict[bytes, _Blob] = {}
+        self._lock = threading.Lock()
+
+    def put(self, serialized: bytes) -> BlobRef:
+        digest = hashlib.blake2b(serialized, digest_size=16).digest()
+        with self._lock:
+            blob = self._blobs.get(digest)
+            if blob is None:
+                blob = self._blobs[digest] = _Blob(zlib.compress(serialized, 1))
+            blob.refs += 1
+        return BlobRef(digest, len(serialized))
+
+    def get(self, ref: BlobRef) -> Any:
+        with self._lock:
+            data = self._blobs[ref.digest].data
+        return pickle.loads(zlib.decompress(data))
+
+    def release(self, ref: BlobRef) -> None:
+        with self._lock:
+            blob = self._blobs.get(ref.digest)
+            if blob is not None:
+                blob.refs -= 1
+                if blob.refs <= 0:
+                    del self._blobs[ref.digest]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "blobs": len(self._blobs),
+                "bytes": sum(len(b.data) for b in self._blobs.values()),
+                "refs": sum(b.refs for b in self._blobs.values()),
+            }
+
+
+# Global blob store shared by all contexts of this process
+blob_store = BlobStore()
+
+
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    """Short strings interned, other values unchanged."""
+    if isinstance(value, str) and len(value) <= INTERN_MAX_CHARS:
+        return sys.intern(value)
+    return value
+
+
+def _large(value: Any, min_bytes: int) -> Optional[bytes]:
+    """Pickled value when it belongs in the blob store, else None."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return None
+    if isinstance(value, (str, bytes)) and len(value) < min_bytes:
+        return None
+    try:
+        serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return serialized if len(serialized) >= min_bytes else None
+
+
+class CompactSharedData(MutableMapping):
+    """Shared data mapping with interned keys and large values as blob refs."""
+
+    __slots__ = ("_data", "_decoded", "_store", "_min_bytes")
+
+    def __init__(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        store: BlobStore = blob_store,
+        min_bytes: int = 4096,
+    ):
+        self._data: Dict[str, Any] = {}
+        # Blob values decoded by a read, kept for the rest of the task
+        self._decoded: Dict[str, Any] = {}
+        self._store = store
+        self._min_bytes = min_bytes
+        for key, value in (data or {}).items():
+            serialized = _large(value, min_bytes)
+            key = sys.intern(key) if isinstance(key, str) else key
+            self._data[key] = (
+                store.put(serialized) if serialized is not None else _intern(value)
+            )
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        if not isinstance(value, BlobRef):
+            return value
+        decoded = self._decoded.get(key, _MISSING)
+        if decoded is _MISSING:
+            # Concurrent first reads all return the object that was kept
+            decoded = self._decoded.setdefault(key, self._store.get(value))
+        return decoded
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        key = sys.intern(key) if isinstance(key, str) else key
+        old = self._data.get(key)
+        self._data[key] = _intern(value)
+        self._decoded.pop(key, None)
+        if isinstance(old, BlobRef):
+            self._store.release(old)
+
+    def __delitem__(self, key: str) -> None:
+        old = self._data.pop(key)
+        self._decoded.pop(key, None)
+        if isinstance(old, BlobRef):
+            self._store.release(old)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def refs(self) -> List[BlobRef]:
+        return [v for v in self._data.values() if isinstance(v, BlobRef)]
+
+    def release(self) -> Dict[str, Any]:
+        """Plain dict of all values; the blob references are released."""
+        data = dict(self.items())
+        for ref in self.refs():
+            self._store.release(ref)
+        self._data.clear()
+        self._decoded.clear()
+        return data
+
+
+def _shared_data_attribute(context: Any) -> Optional[str]:
+    for name in SHARED_DATA_ATTRIBUTES:
+        if type(getattr(context, name, None)) is dict:
+            return name
+    return None
+
+
+def compact_context(context: Any, min_bytes: int) -> Optional[CompactSharedData]:
+    """Replace a context's shared data dict with a CompactSharedData mapping."""
+    name = _shared_data_attribute(context)
+    if name is None:
+        return None
+    compact = CompactSharedData(getattr(context, name), min_bytes=min_bytes)
+    # Context models may validate attribute types, bypass their __setattr__
+    object.__setattr__(context, name, compact)
+    return compact
+
+
+def restore_context(context: Any) -> None:
+    """Put back a plain shared data dict (releasing the blob references)."""
+    for name in SHARED_DATA_ATTRIBUTES:
+        compact = getattr(context, name, None)
+        if isinstance(compact, CompactSharedData):
+            object.__setattr__(context, name, compact.release())
+
+
+def with_compact_context(executor_class: Type[Any]) -> Type[Any]:
+    """
+    Subclass an ITaskExecutor so its context's shared data is held compactly
+    while execute() runs.
+    """
+    original_execute = executor_class.execute
+
+    @functools.wraps(original_execute)
+    async def execute(self: Any) -> Any:
+        context = getattr(self, "context", None)
+        if context is None or not config.CONTEXT_COMPACT_ENABLED:
+            return await original_execute(self)
+        if compact_context(context, config.CONTEXT_BLOB_MIN_BYTES) is None:
+            logger.debug(f"{type(context).__name__} shared data not compacted")
+        try:
+            return await original_execute(self)
+        finally:
+            restore_context(context)
+
+    return type(executor_class.__name__, (executor_class,), {"execute": execute})
+
+
+# ============================================================================
+# Memory profile
+# ============================================================================
+
+WORDS = (
+    "protein binding affinity model results methods analysis sample data cell "
+    "network structure measurement regression signal response control study"
+).split()
+
+
+def _upstream_outputs(task: int, blob_kb: int, rng: random.Random) -> Dict[str, Any]:
+    """Shared data shaped like a parse -> analysis pipeline context."""
+    words = blob_kb * 1024 // 8
+    sections = [
+        {
+            "section_type": kind,
+            "title": kind.title(),
+            "content": " ".join(rng.choice(WORDS) for _ in range(words // 4)),
+        }
+        for kind in ("abstract", "introduction", "methods", "results")
+    ]
+    return {
+        "file_id": f"file-{task:06d}",
+        "model": "openrouter/openai/gpt-4o-mini",
+        "structured_content_overview_id": f"overview-{task:06d}",
+        "execution_mode": "agent",
+        "priority": "batch",
+        "sections": sections,
+        # Pipeline-wide configuration copied into every task of a batch
+        "pipeline_config": {"steps": WORDS * (blob_kb * 4), "version": 3},
+    }
+
+
+def _measure(tasks: int, blob_kb: int, compact: bool) -> int:
+    rng = random.Random(0)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    contexts: List[Any] = []
+    for task in range(tasks):
+        data = _upstream_outputs(task, blob_kb, rng)
+        if compact:
+            data = CompactSharedData(data, min_bytes=config.CONTEXT_BLOB_MIN_BYTES)
+        contexts.append(data)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    for data in contexts:
+        if isinstance(data, CompactSharedData):
+            data.release()
+    return used
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Memory footprint of concurrent task contexts"
+    )
+    parser.add_argument("command", choices=["profile"])
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument(
+        "--blob-kb", type=int, default=16, help="size of the upstream sections"
+    )
+    args = parser.parse_args(argv)
+
+    plain = _measure(args.tasks, args.blob_kb, compact=False)
+    compact = _measure(args.tasks, args.blob_kb, compact=True)
+    print(f"{args.tasks} concurrent task contexts:")
+    print(f"  plain dict:   {plain / args.tasks / 1024:8.1f} KiB per task")
+    print(f"  compact:      {compact / args.tasks / 1024:8.1f} KiB per task")
+    if plain:
+        print(f"  reduction:    {100 * (1 - compact / plain):8.1f} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Optimized Image Build Steps
+
+Used by the ``optimized`` Dockerfile target (docker build --target optimized .):
+
+    python -m app.core.image_build prune --venv /app/.venv [--keep crewai,...]
+        Removes test suites, docs and examples bundled in site-packages, and the
+        agent framework distributions (crewai, langgraph, claude-agent-sdk, ...)
+        that the registered agents can never import. ``--keep`` names
+        distributions that must stay regardless.
+
+    python -m app.core.image_build warm
+        Imports the service, its agents and every framework they import lazily
+        (failing the build if a pruned module is still needed) and fills
+        download caches (tiktoken encodings) so the first start does no network
+        work.
+
+    python -m app.core.image_build benchmark --max-seconds 15
+        Measures cold start (fresh interpreter importing the app and loading the
+        selected agents) and fails when the median exceeds the budget.
+
+Framework usage is traced, not guessed: a subprocess imports app.core.main and
+every agent selected by OMA_AGENTS and reports the modules it loaded. Agents
+and libraries often import a framework only inside the function that uses it
+(e.g. ``import claude_agent_sdk`` when a task starts), so the source of every
+loaded module is also scanned for import statements, including those in
+function bodies. A framework distribution is only removed when none of its
+modules was loaded or is imported anywhere in the loaded code, and it is not
+on the keep-list.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import importlib.metadata
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# Directories inside installed packages that are never needed at runtime
+STRIP_DIR_NAMES = ("tests", "test", "docs", "doc", "examples")
+
+# Agent framework distributions that may be removed when no agent uses them
+FRAMEWORK_DISTRIBUTIONS = (
+    "crewai",
+    "crewai-tools",
+    "langgraph",
+    "langgraph-prebuilt",
+    "langchain",
+    "langchain-openai",
+    "claude-agent-sdk",
+)
+
+# Imports the service performs at startup (run in a fresh interpreter), then
+# the modules named on the command line
+STARTUP_SCRIPT = """
+import importlib, json, sys
+import app.core.main
+from app.core.agent_registry import load_agents
+from app.core.config import config
+load_agents(config.OMA_AGENTS, use_manifest=config.OMA_AGENT_MANIFEST)
+modules = sorted({name.partition(".")[0] for name in sys.modules})
+files = sorted(
+    {getattr(m, "__file__", None) or "" for m in list(sys.modules.values())} - {""}
+)
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+json.dump({"modules": modules, "files": files}, sys.stdout)
+"""
+
+
+def _run_startup(
+    python: str = sys.executable, imports: Iterable[str] = ()
+) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [python, "-c", STARTUP_SCRIPT, *imports],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def startup_trace(
+    python: str = sys.executable, imports: Iterable[str] = ()
+) -> Dict[str, List[str]]:
+    """Top-level modules and source files loaded by a service startup."""
+    result = _run_startup(python, imports)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def imported_top_level_modules(python: str = sys.executable) -> Set[str]:
+    """Top-level modules loaded by a service startup."""
+    return set(startup_trace(python)["modules"])
+
+
+def lazily_imported(files: Iterable[str], candidates: Set[str]) -> Set[str]:
+    """Candidate top-level modules imported anywhere in the given source files.
+
+    Covers imports inside functions and methods, which a startup never runs.
+    """
+    found: Set[str] = set()
+    for file in files:
+        if not file.endswith(".py"):
+            continue
+        try:
+            source = Path(file).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        # Parsing is the slow part: skip files that never mention a candidate
+        if not any(name in source for name in candidates - found):
+            continue
+        try:
+            tree = ast.parse(source, filename=file)
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names = [node.module]
+            else:
+                continue
+            found.update(name.partition(".")[0] for name in names)
+    return found & candidates
+
+
+def used_modules(trace: Dict[str, List[str]]) -> Set[str]:
+    """Modules a startup loaded plus framework modules the loaded code imports."""
+    framework_modules: Set[str] = set()
+    for name, modules in _distribution_modules().items():
+        if name in FRAMEWORK_DISTRIBUTIONS:
+            framework_modules |= modules
+    loaded = set(trace["modules"])
+    return loaded | lazily_imported(trace["files"], framework_modules - loaded)
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower().replace("_", "-")
+
+
+def _distribution_modules() -> Dict[str, Set[str]]:
+    """Top-level module names per (normalized) distribution name."""
+    modules: Dict[str, Set[str]] = {}
+    for module, dists in importlib.metadata.packages_distributions().items():
+        for dist in dists:
+            modules.setdefault(_normalize(dist), set()).add(module)
+    return modules
+
+
+def _remove_distribution(dist: importlib.metadata.Distribution) -> int:
+    """Delete the files listed in a distribution's RECORD and its dist-info."""
+    removed = 0
+    info_dirs = set()
+    for file in dist.files or []:
+        path = Path(dist.locate_file(file))
+        if path.parent.name.endswith(".dist-info"):
+            info_dirs.add(path.parent)
+        if path.is_file():
+            path.unlink()
+            removed += 1
+    for info_dir in info_dirs:
+        shutil.rmtree(info_dir, ignore_errors=True)
+    return removed
+
+
+def prune_frameworks(used: Set[str], keep: Iterable[str] = ()) -> List[str]:
+    """Remove framework distributions none of whose modules are used."""
+    modules = _distribution_modules()
+    kept = {_normalize(name) for name in keep}
+    removed = []
+    for name in FRAMEWORK_DISTRIBUTIONS:
+        dist_modules = modules.get(name)
+        if not dist_modules or dist_modules & used or name in kept:
+            continue
+        dist = importlib.metadata.distribution(name)
+        files = _remove_distribution(dist)
+        for module in dist_modules:
+            package_dir = Path(dist.locate_file(module))
+            if package_dir.is_dir():
+                shutil.rmtree(package_dir)
+        removed.append(f"{name} ({files} files)")
+    return removed
+
+
+def strip_site_packages(venv: Path) -> int:
+    """Delete test/doc/example directories inside installed packages."""
+    removed = 0
+    for site_packages in venv.glob("lib/python*/site-packages"):
+        for path in sorted(site_packages.rglob("*"), reverse=True):
+            if (
+                path.is_dir()
+                and path.name in STRIP_DIR_NAMES
+                # Only sub-directories of packages, never a top-level package
+                and path.parent != site_packages
+                and (path.parent / "__init__.py").exists()
+            ):
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+    return removed
+
+
+def warm() -> None:
+    """Import everything the service may load and fill caches it would download.
+
+    Besides the startup imports this imports the frameworks the loaded code
+    imports lazily, so a module pruned by mistake fails the build instead of
+    the first task.
+    """
+    trace = startup_trace()
+    lazy = sorted(used_modules(trace) - set(trace["modules"]))
+    startup_trace(imports=lazy)
+    if importlib.util.find_spec("tiktoken") is not None:
+        import tiktoken
+
+        for encoding in ("cl100k_base", "o200k_base"):
+            tiktoken.get_encoding(encoding)
+    print(
+        f"✅ Warmed startup imports ({len(trace['modules'])} top-level modules"
+        f", lazily imported: {', '.join(lazy) or 'none'})"
+    )
+
+
+def benchmark(runs: int = 3) -> float:
+    """Median cold start time in seconds over fresh interpreters."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run_startup()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Optimized image build steps")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prune_parser = subparsers.add_parser("prune")
+    prune_parser.add_argument("--venv", type=Path, default=Path(sys.prefix))
+    prune_parser.add_argument(
+        "--keep",
+        default=os.environ.get("OMA_KEEP_FRAMEWORKS", ""),
+        help="Comma-separated framework distributions never to remove",
+    )
+    subparsers.add_parser("warm")
+    bench_parser = subparsers.add_parser("benchmark")
+    bench_parser.add_argument("--max-seconds", type=float, required=True)
+    bench_parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "prune":
+            used = used_modules(startup_trace())
+            keep = [name for name in args.keep.split(",") if name.strip()]
+            for entry in prune_frameworks(used, keep):
+                print(f"  removed unused framework {entry}")
+            print(f"  removed {strip_site_packages(args.venv)} test/doc directories")
+            # The service must still start after pruning
+            imported_top_level_modules()
+            print("✅ Pruned virtualenv")
+        elif args.command == "warm":
+            warm()
+        else:
+            seconds = benchmark(args.runs)
+            print(f"Cold start: {seconds:.2f}s (budget {args.max_seconds:.2f}s)")
+            if seconds > args.max_seconds:
+                print("❌ Cold start regressed beyond the budget", file=sys.stderr)
+                return 1
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Service startup failed:\n{e.stderr}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
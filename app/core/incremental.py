@@ -0,0 +1,266 @@
+"""
+Incremental Analysis
+
+A rerun of an analysis on a revised manuscript should not rebuild the whole
+analysis when only one or two content sections changed. Each content section
+is hashed (SHA-256 of its normalized type, title and content), and every
+analysis section records the content sections it is based on. After a run the
+analysis is stored as an AnalysisRecord next to its overview ID:
+
+    {OMA_CACHE_DIR}/analyses/{analysis_id}.json
+
+On a rerun (the task context holds the previous analysis ID) the current
+section digests are compared with the record. Analysis sections whose inputs
+are unchanged are reused as they are; only the sections based on changed
+inputs are regenerated:
+
+    inputs = await read_content_sections(adapter, overview_id)
+    plan = plan_rerun(load_record(previous_id), inputs, ANALYZED_SECTIONS)
+    if plan.changed:
+        ...generate sections for plan.changed...
+    analysis_id = await write_analysis(adapter, values, plan.reused + new_sections)
+    save_record(AnalysisRecord(analysis_id, overview_id, digests, sections))
+
+Tool arguments are filtered by each tool's argument schema, as in
+app.core.structured_content.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from oxsci_shared_core.logging import logger
+
+from app.core.config import config
+from app.core.structured_content import json_object
+from app.core.tool_pipeline import (
+    get_tools,
+    invoke_tool,
+    result_payload,
+    tool_arguments,
+)
+
+RECORD_DIR = Path(config.OMA_CACHE_DIR) / "analyses"
+RECORD_VERSION = 1
+
+SECTION_LIST = "get_content_section_list"
+SECTION_DETAIL = "get_content_section_detail"
+CREATE_OVERVIEW = "create_analysis_overview"
+CREATE_SECTION = "create_analysis_section"
+COMPLETE_OVERVIEW = "complete_analysis_overview"
+
+SECTION_ID_KEYS = ("section_id", "id")
+ANALYSIS_ID_KEYS = ("analysis_id", "analysis_overview_id", "overview_id", "id")
+
+
+@dataclass
+class ContentSection:
+    """One content section of a structured content overview."""
+
+    key: str  # section type, numbered when a type occurs more than once
+    section_type: str
+    title: str
+    content: str
+    digest: str
+
+
+@dataclass
+class AnalysisRecord:
+    """A completed analysis with the input digests it was generated from."""
+
+    analysis_id: str
+    content_overview_id: str
+    # Digest by content section key
+    inputs: Dict[str, str]
+    # section_type, title, content and based_on (content section keys)
+    sections: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class RerunPlan:
+    reused: List[Dict[str, Any]]
+    # Analyzed content section keys that are new or changed
+    changed: List[str]
+
+
+def section_digest(section_type: str, title: str, content: str) -> str:
+    """Digest of a content section, insensitive to whitespace changes."""
+    normalized = "\n".join(
+        " ".join(part.split()) for part in (section_type.lower(), title, content)
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _items(payload: Any, key: str) -> List[Dict[str, Any]]:
+    if isinstance(payload, dict):
+        payload = payload.get(key, payload.get("items", []))
+    return [item for item in payload or [] if isinstance(item, dict)]
+
+
+def _first(data: Dict[str, Any], keys: Sequence[str]) -> Optional[str]:
+    for key in keys:
+        if data.get(key):
+            return str(data[key])
+    return None
+
+
+async def read_content_sections(
+    adapter: Any, overview_id: str, section_types: Optional[Sequence[str]] = None
+) -> Dict[str, ContentSection]:
+    """
+    Content sections of an overview by key, in document order (only the given
+    section types when the section list reports them).
+    """
+    list_tool, detail_tool = get_tools(adapter, [SECTION_LIST, SECTION_DETAIL])
+    values = {
+        "structured_content_overview_id": overview_id,
+        "overview_id": overview_id,
+    }
+    listing = await invoke_tool(list_tool, tool_arguments(list_tool, values))
+
+    sections: Dict[str, ContentSection] = {}
+    for entry in _items(result_payload(listing), "sections"):
+        listed_type = str(entry.get("section_type") or "").lower()
+        if section_types is not None and listed_type not in (*section_types, ""):
+            continue
+        detail = entry
+        if "content" not in entry:
+            section_id = _first(entry, SECTION_ID_KEYS)
+            result = await invoke_tool(
+                detail_tool,
+                tool_arguments(detail_tool, {**values, "section_id": section_id}),
+            )
+            payload = result_payload(result)
+            if isinstance(payload, dict):
+                detail = {**entry, **payload.get("section", payload)}
+        section_type = str(detail.get("section_type") or "section")
+        title = str(detail.get("title") or "")
+        content = str(detail.get("content") or "")
+        key = section_type.lower()
+        if key in sections:
+            key = f"{key}#{sum(1 for k in sections if k.split('#')[0] == key) + 1}"
+        digest = section_digest(section_type, title, content)
+        sections[key] = ContentSection(key, section_type, title, content, digest)
+    return sections
+
+
+def analyzed_keys(
+    sections: Dict[str, ContentSection], section_types: Sequence[str]
+) -> List[str]:
+    """Keys of the sections an analysis reads (all sections when none match)."""
+    keys = [
+        key
+        for key, section in sections.items()
+        if section.section_type.lower() in section_types
+        or section.title.strip().rstrip(":").lower() in section_types
+    ]
+    return keys or list(sections)
+
+
+def plan_rerun(
+    record: Optional[AnalysisRecord],
+    inputs: Dict[str, ContentSection],
+    analyzed: Sequence[str],
+) -> RerunPlan:
+    """Analysis sections to reuse and the analyzed inputs to regenerate for."""
+    if record is None:
+        return RerunPlan([], list(analyzed))
+    changed = [
+        key for key in analyzed if record.inputs.get(key) != inputs[key].digest
+    ]
+    removed = [key for key in record.inputs if key not in inputs]
+    stale = set(changed) | set(removed)
+    reused = [
+        section
+        for section in record.sections
+        # Sections without recorded inputs depend on everything that was analyzed
+        if not stale & set(section.get("based_on") or record.inputs)
+    ]
+    if len(reused) < len(record.sections) and not changed:
+        # A removed input invalidated sections: regenerate from the current ones
+        changed = list(analyzed)
+    logger.info(
+        f"Rerun of analysis {record.analysis_id}: {len(reused)} of "
+        f"{len(record.sections)} sections reused, changed inputs: {changed or 'none'}"
+    )
+    return RerunPlan(reused, changed)
+
+
+def parse_sections(text: str, inputs: Sequence[str]) -> List[Dict[str, Any]]:
+    """Analysis sections from an agent's JSON answer ({"sections": [...]})."""
+    match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", text, re.DOTALL)
+    data = json_object(match.group(1) if match else text) or {}
+    sections = []
+    for item in _items(data, "sections"):
+        based_on = [k for k in item.get("based_on") or [] if k in inputs]
+        sections.append(
+            {
+                "section_type": str(item.get("section_type") or "analysis"),
+                "title": str(item.get("title") or ""),
+                "content": str(item.get("content") or ""),
+                "based_on": based_on or list(inputs),
+            }
+        )
+    return sections
+
+
+async def write_analysis(
+    adapter: Any, values: Dict[str, Any], sections: Sequence[Dict[str, Any]]
+) -> Optional[str]:
+    """Create an analysis overview with the sections and complete it."""
+    create, add, complete = get_tools(
+        adapter, [CREATE_OVERVIEW, CREATE_SECTION, COMPLETE_OVERVIEW]
+    )
+    created = result_payload(await invoke_tool(create, tool_arguments(create, values)))
+    analysis_id = None
+    if isinstance(created, dict):
+        analysis_id = _first(created, ANALYSIS_ID_KEYS)
+    ids = {**values, "analysis_id": analysis_id, "analysis_overview_id": analysis_id}
+    for order, section in enumerate(sections, start=1):
+        arguments = {
+            **ids,
+            "section_type": section["section_type"],
+            "title": section["title"],
+            "content": section["content"],
+            "order": order,
+        }
+        await invoke_tool(add, tool_arguments(add, arguments))
+    await invoke_tool(complete, tool_arguments(complete, ids))
+    return analysis_id
+
+
+def _record_path(analysis_id: str) -> Path:
+    return RECORD_DIR / f"{analysis_id}.json"
+
+
+def load_record(analysis_id: Optional[str]) -> Optional[AnalysisRecord]:
+    if not analysis_id:
+        return None
+    try:
+        data = json.loads(_record_path(analysis_id).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable analysis record {analysis_id}: {e}")
+        return None
+    if data.pop("version", None) != RECORD_VERSION:
+        return None
+    return AnalysisRecord(**data)
+
+
+def save_record(record: AnalysisRecord) -> None:
+    path = _record_path(record.analysis_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        data = {"version": RECORD_VERSION, **asdict(record)}
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write analysis record: {e}")
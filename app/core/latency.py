@@ -0,0 +1,101 @@
+"""
+Tool Latency Tracking
+
+Keeps a bounded window of recent latencies per MCP tool and answers percentile
+queries (the p95 delay used for hedged requests, the p99 used for adaptive
+timeouts). Windows can be saved to and restored from a JSON file so the
+learned latencies survive restarts.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional
+
+from oxsci_shared_core.logging import logger
+
+DEFAULT_WINDOW_SIZE = 200
+
+
+class LatencyWindow:
+    """Thread-safe sliding window of latency samples (seconds)."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW_SIZE, samples: Iterable[float] = ()):
+        self._samples: Deque[float] = deque(samples, maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def samples(self) -> List[float]:
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        """Nearest-rank percentile, or None when there are fewer than min_samples."""
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+class LatencyTracker:
+    """Latency windows keyed by tool name."""
+
+    def __init__(self, window_size: int = DEFAULT_WINDOW_SIZE):
+        self.window_size = window_size
+        self._windows: Dict[str, LatencyWindow] = {}
+        self._lock = threading.Lock()
+
+    def window(self, tool: str) -> LatencyWindow:
+        with self._lock:
+            window = self._windows.get(tool)
+            if window is None:
+                window = self._windows[tool] = LatencyWindow(self.window_size)
+            return window
+
+    def record(self, tool: str, seconds: float) -> None:
+        self.window(tool).record(seconds)
+
+    def percentile(self, tool: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        return self.window(tool).percentile(pct, min_samples)
+
+    def save(self, path: Path) -> None:
+        """Write all windows to a JSON file (atomic replace)."""
+        with self._lock:
+            windows = dict(self._windows)
+        data = {tool: [round(s, 4) for s in w.samples()] for tool, w in windows.items()}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path) -> int:
+        """Restore windows from a JSON file, returning the number of tools loaded."""
+        if not path.exists():
+            return 0
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable latency state {path}: {e}")
+            return 0
+        with self._lock:
+            for tool, samples in data.items():
+                self._windows[tool] = LatencyWindow(
+                    self.window_size, (float(s) for s in samples)
+                )
+        return len(data)
+
+
+# Global tracker instance
+latency_tracker = LatencyTracker()
@@ -0,0 +1,316 @@
+"""
+LLM Call Pipeline
+
+LLMs created through an adapter are wrapped so every completion request runs
+through a chain of middlewares before reaching the provider, the same way MCP
+tools run through app.core.tool_pipeline:
+
+    self.llm = create_llm(
+        self.adapter,
+        agent_role=self.agent_role,
+        model=context.get_shared_data("model", "openrouter/openai/gpt-4o-mini"),
+        temperature=0.1,
+    )
+
+Both framework LLM types are supported: CrewAI ``LLM.call`` (synchronous) and
+LangChain chat models ``_generate`` / ``_agenerate`` (LangGraph). A middleware
+is an async callable ``(call, call_next) -> result`` registered once at
+startup with ``llm_pipeline.use(...)``.
+
+Synchronous calls (CrewAI, from crew threads) run the pipeline on the service
+event loop through ``llm_pipeline.bridge`` (app.core.loop_bridge) and the
+blocking provider request on its bounded thread pool.
+
+CrewAI's ``LLM.call`` returns only text. The usage of each provider response it
+receives is collected for the call that made the request (``call_usage(call)``),
+so middlewares can account usage per call even when concurrent calls share one
+LLM.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Tuple
+
+from app.core.loop_bridge import LoopBridge
+
+CREWAI = "crewai"
+LANGCHAIN = "langchain"
+
+# Rough characters per token for request size estimates
+CHARS_PER_TOKEN = 4
+# Completion size assumed when the request sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+# Threads for synchronous calls made on the service loop itself, which cannot run
+# their pipeline on the (blocked) loop
+SYNC_HELPER_THREADS = 4
+
+
+@dataclass
+class LLMCall:
+    """One completion request flowing through the pipeline."""
+
+    model: str
+    agent_role: str
+    framework: str
+    messages: Any
+    kwargs: Dict[str, Any]
+    temperature: Optional[float] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # The wrapped framework LLM
+    llm: Any = field(default=None, repr=False, compare=False)
+
+
+LLMHandler = Callable[[LLMCall], Awaitable[Any]]
+LLMMiddleware = Callable[[LLMCall, LLMHandler], Awaitable[Any]]
+
+
+def message_text(message: Any) -> str:
+    """Text content of a message (string, dict or LangChain message)."""
+    if isinstance(message, str):
+        return message
+    if isinstance(message, dict):
+        content = message.get("content")
+    else:
+        content = getattr(message, "content", "")
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content or "")
+
+
+def message_list(messages: Any) -> List[Any]:
+    return [messages] if isinstance(messages, str) else list(messages or [])
+
+
+def estimate_tokens(call: LLMCall) -> int:
+    """Prompt plus expected completion tokens of a request."""
+    prompt_chars = sum(len(message_text(m)) for m in message_list(call.messages))
+    completion = call.kwargs.get("max_tokens") or DEFAULT_COMPLETION_TOKENS
+    return prompt_chars // CHARS_PER_TOKEN + int(completion)
+
+
+def usage_field(usage: Any, *names: str) -> int:
+    """First non-zero count of a provider usage record (dict or object)."""
+    for name in names:
+        value = (
+            usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        )
+        if isinstance(value, int) and value:
+            return value
+    return 0
+
+
+# Usage records of the responses received by the CrewAI call in progress
+_call_responses: contextvars.ContextVar[Optional[List[Any]]] = contextvars.ContextVar(
+    "oma_llm_call_responses", default=None
+)
+
+
+def call_usage(call: LLMCall) -> List[Any]:
+    """Provider usage records of the responses a CrewAI call received."""
+    return call.metadata.get("usage_records", [])
+
+
+def usage_tokens(result: Any, call: Optional[LLMCall] = None) -> Optional[int]:
+    """Total tokens reported for a call's result (None when unknown)."""
+    llm_output = getattr(result, "llm_output", None) or {}
+    usage = llm_output.get("token_usage") or {}
+    if usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    for generation in getattr(result, "generations", None) or []:
+        metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if metadata and metadata.get("total_tokens"):
+            return int(metadata["total_tokens"])
+    records = call_usage(call) if call is not None else []
+    if records:
+        return sum(
+            usage_field(record, "total_tokens")
+            or usage_field(record, "prompt_tokens", "input_tokens")
+            + usage_field(record, "completion_tokens", "output_tokens")
+            for record in records
+        )
+    return None
+
+
+def _bind(func: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Call arguments as one keyword dict (``**kwargs`` flattened)."""
+    signature = inspect.signature(func)
+    arguments = dict(signature.bind(*args, **kwargs).arguments)
+    for name, param in signature.parameters.items():
+        if param.kind is param.VAR_KEYWORD:
+            arguments.update(arguments.pop(name, {}))
+    return arguments
+
+
+_sync_helper = concurrent.futures.ThreadPoolExecutor(
+    max_workers=SYNC_HELPER_THREADS, thread_name_prefix="oma-llm-sync"
+)
+
+
+class LLMPipeline:
+    """Ordered middleware chain applied to wrapped LLMs."""
+
+    def __init__(self) -> None:
+        self._middlewares: List[LLMMiddleware] = []
+        # Service loop for synchronous calls, bounded pool for provider requests
+        self.bridge = LoopBridge("oma-llm")
+
+    def _run_sync(self, coro_factory: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        """Run the async pipeline from synchronous framework code."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        loop = self.bridge.loop
+        if running is None or (
+            loop is not None and loop.is_running() and running is not loop
+        ):
+            # Crew threads, and threads running a loop of their own: the pipeline
+            # runs on the service loop (the calling loop blocks, as it would anyway)
+            return self.bridge.run_blocking(coro_factory())
+        # Called synchronously on the service loop (or before bind()): the loop is
+        # blocked, so the pipeline needs a loop of its own on a helper thread (with
+        # the caller's context: task budget, LLM usage accounting)
+        context = contextvars.copy_context()
+        return _sync_helper.submit(
+            context.run, lambda: asyncio.run(coro_factory())
+        ).result()
+
+    def use(self, middleware: LLMMiddleware) -> None:
+        """Append a middleware (first registered runs outermost)."""
+        self._middlewares.append(middleware)
+
+    def clear(self) -> None:
+        self._middlewares.clear()
+
+    async def run(self, call: LLMCall, terminal: LLMHandler) -> Any:
+        """Run a call through all middlewares and finally the terminal handler."""
+        handler = terminal
+        for middleware in reversed(self._middlewares):
+            handler = functools.partial(middleware, call_next=handler)
+        return await handler(call)
+
+    def wrap(self, llm: Any, model: str, agent_role: str) -> Any:
+        """Route an LLM's completion calls through the pipeline (in place)."""
+        if getattr(llm, "_oma_pipeline", False):
+            return llm
+
+        if hasattr(llm, "_agenerate") and hasattr(llm, "_generate"):
+            orig_generate = llm._generate
+            orig_agenerate = llm._agenerate
+
+            def _new_call(func: Callable[..., Any], args: Tuple, kwargs: Dict) -> LLMCall:
+                arguments = _bind(func, args, kwargs)
+                messages = arguments.pop("messages")
+                return LLMCall(
+                    model,
+                    agent_role,
+                    LANGCHAIN,
+                    messages,
+                    arguments,
+                    temperature=getattr(llm, "temperature", None),
+                    llm=llm,
+                )
+
+            async def _agenerate(*args: Any, **kwargs: Any) -> Any:
+                async def terminal(call: LLMCall) -> Any:
+                    return await orig_agenerate(call.messages, **call.kwargs)
+
+                return await self.run(_new_call(orig_agenerate, args, kwargs), terminal)
+
+            def _generate(*args: Any, **kwargs: Any) -> Any:
+                if not self._middlewares:
+                    return orig_generate(*args, **kwargs)
+
+                async def terminal(call: LLMCall) -> Any:
+                    return await self.bridge.run_sync(
+                        functools.partial(orig_generate, call.messages, **call.kwargs)
+                    )
+
+                call = _new_call(orig_generate, args, kwargs)
+                return self._run_sync(lambda: self.run(call, terminal))
+
+            # Chat models are pydantic models, bypass their __setattr__ validation
+            object.__setattr__(llm, "_generate", _generate)
+            object.__setattr__(llm, "_agenerate", _agenerate)
+
+        elif hasattr(llm, "call"):
+            orig_call = llm.call
+            track = getattr(llm, "_track_token_usage_internal", None)
+
+            if track is not None:
+                # CrewAI passes each provider response's usage here and only sums it
+                # into llm._token_usage, shared by all calls of the LLM
+                @functools.wraps(track)
+                def track_usage(usage_data: Any, *args: Any, **kwargs: Any) -> Any:
+                    records = _call_responses.get()
+                    if records is not None and usage_data:
+                        records.append(usage_data)
+                    return track(usage_data, *args, **kwargs)
+
+                object.__setattr__(llm, "_track_token_usage_internal", track_usage)
+
+            def call(*args: Any, **kwargs: Any) -> Any:
+                if not self._middlewares:
+                    return orig_call(*args, **kwargs)
+                arguments = _bind(orig_call, args, kwargs)
+                messages = arguments.pop("messages")
+                llm_call = LLMCall(
+                    model,
+                    agent_role,
+                    CREWAI,
+                    messages,
+                    arguments,
+                    temperature=getattr(llm, "temperature", None),
+                    llm=llm,
+                )
+
+                async def terminal(c: LLMCall) -> Any:
+                    records: List[Any] = []
+                    c.metadata["usage_records"] = records
+
+                    def run_call() -> Any:
+                        # Runs in a copy of the caller's context
+                        _call_responses.set(records)
+                        return orig_call(c.messages, **c.kwargs)
+
+                    return await self.bridge.run_sync(run_call)
+
+                return self._run_sync(lambda: self.run(llm_call, terminal))
+
+            object.__setattr__(llm, "call", call)
+
+        object.__setattr__(llm, "_oma_pipeline", True)
+        return llm
+
+
+# Global LLM pipeline instance
+llm_pipeline = LLMPipeline()
+
+
+def create_llm(
+    adapter: Any, agent_role: str, model: str, temperature: float, **kwargs: Any
+) -> Any:
+    """Create an LLM via the adapter, routed through the LLM pipeline."""
+    llm = adapter.create_llm(model=model, temperature=temperature, **kwargs)
+    return llm_pipeline.wrap(llm, model, agent_role)
+
+
+async def complete(llm: Any, prompt: str, system: Optional[str] = None) -> str:
+    """Single completion from agent code (outside an agent loop), as text."""
+    if hasattr(llm, "ainvoke"):
+        messages = ([("system", system)] if system else []) + [("human", prompt)]
+        return message_text(await llm.ainvoke(messages))
+    messages = ([{"role": "system", "content": system}] if system else []) + [
+        {"role": "user", "content": prompt}
+    ]
+    # CrewAI LLM.call is synchronous
+    return str(await asyncio.to_thread(llm.call, messages))
@@ -0,0 +1,280 @@
+"""
+LLM Response Cache
+
+Opt-in cache for deterministic LLM calls, so reprocessing the same manuscript
+(e.g. after a task retry) replays earlier completions instead of paying for
+them again:
+
+    LLM_CACHE_AGENTS=["sample_parser_langgraph"]   # or ["*"] for all agents
+
+Requests are keyed by model, messages, tools, temperature and the remaining
+request parameters. Only requests at or below LLM_CACHE_MAX_TEMPERATURE are
+cached. Entries live in an in-memory LRU (LLM_CACHE_SIZE entries) backed by
+{OMA_CACHE_DIR}/llm_responses/, shared by the workers of a pod and kept across
+restarts; both tiers expire after LLM_CACHE_TTL seconds. Entries are stored
+as JSON (completion text, or LangChain's serialized generations), never as
+pickles: reading an entry from the shared directory cannot run code.
+
+Registered before the rate limiter, so cache hits use no provider capacity.
+Hit/miss counts per agent role are reported at GET /llm-cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+from app.core.llm import CREWAI, LLMCall, LLMHandler, message_list
+
+# Call arguments that do not change the completion
+IGNORED_ARGUMENTS = frozenset(
+    {"run_manager", "callbacks", "from_task", "from_agent", "response_model"}
+)
+ALL_AGENTS = "*"
+
+
+def _message_key(message: Any) -> Any:
+    if isinstance(message, (str, dict)):
+        return message
+    # LangChain BaseMessage
+    return {
+        "type": getattr(message, "type", type(message).__name__),
+        "content": getattr(message, "content", ""),
+        "tool_calls": getattr(message, "tool_calls", None),
+        "tool_call_id": getattr(message, "tool_call_id", None),
+        "name": getattr(message, "name", None),
+    }
+
+
+def cache_key(call: LLMCall) -> str:
+    """Stable hash of everything that determines a completion."""
+    payload = {
+        "model": call.model,
+        "temperature": call.temperature,
+        "messages": [_message_key(m) for m in message_list(call.messages)],
+        "arguments": {
+            name: value
+            for name, value in call.kwargs.items()
+            if name not in IGNORED_ARGUMENTS and value is not None
+        },
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def encode_response(response: Any) -> Optional[bytes]:
+    """JSON form of a completion (None for response types that are not cached)."""
+    if isinstance(response, str):
+        # CrewAI LLM.call
+        data: Dict[str, Any] = {"type": "text", "text": response}
+    elif hasattr(response, "generations"):
+        # LangChain ChatResult
+        from langchain_core.load import dumpd
+
+        data = {
+            "type": "chat_result",
+            "generations": [dumpd(g) for g in response.generations],
+            "llm_output": response.llm_output,
+        }
+    else:
+        return None
+    return json.dumps(data).encode("utf-8")
+
+
+def decode_response(blob: bytes) -> Any:
+    data = json.loads(blob)
+    if data["type"] == "text":
+        return data["text"]
+    from langchain_core.load import load
+    from langchain_core.outputs import ChatResult
+
+    # load() only revives classes from the LangChain namespaces
+    return ChatResult(
+        generations=[load(g) for g in data["generations"]],
+        llm_output=data["llm_output"],
+    )
+
+
+class ResponseCache:
+    """In-memory LRU of JSON-encoded responses in front of a disk directory."""
+
+    def __init__(
+        self, directory: Optional[Path], max_entries: int = 256, ttl: float = 86400
+    ):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, directory: Path, key: str) -> Path:
+        return directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, created: float, blob: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (created, blob)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """``(True, response)`` on a hit, ``(False, None)`` otherwise."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+
+        if entry is None and self.directory is not None:
+            path = self._path(self.directory, key)
+            try:
+                created = path.stat().st_mtime
+                if now - created < self.ttl:
+                    entry = (created, path.read_bytes())
+                    self._remember(key, *entry)
+                else:
+                    path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+        if entry is None:
+            return False, None
+        try:
+            # A fresh copy per hit: callers may mutate the response
+            return True, decode_response(entry[1])
+        except Exception as e:
+            logger.warning(f"Dropping unreadable LLM cache entry {key[:12]}: {e}")
+            self.discard(key)
+            return False, None
+
+    def put(self, key: str, response: Any) -> None:
+        try:
+            blob = encode_response(response)
+        except Exception as e:
+            logger.debug(f"LLM response not cacheable ({type(response).__name__}): {e}")
+            return
+        if blob is None:
+            return
+        self._remember(key, time.time(), blob)
+        if self.directory is None:
+            return
+        path = self._path(self.directory, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry: {e}")
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory is not None:
+            self._path(self.directory, key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LLMCacheMiddleware:
+    """LLM pipeline middleware: replays cached completions of enabled agents."""
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        agents: Iterable[str] = (),
+        max_temperature: float = 0.2,
+    ):
+        self.cache = cache
+        self.agents = set(agents)
+        self.max_temperature = max_temperature
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def cacheable(self, call: LLMCall) -> bool:
+        if ALL_AGENTS not in self.agents and call.agent_role not in self.agents:
+            return False
+        if call.temperature is not None and call.temperature > self.max_temperature:
+            return False
+        # CrewAI executes the returned tool calls itself, the result is not a completion
+        if call.framework == CREWAI and call.kwargs.get("available_functions"):
+            return False
+        return True
+
+    def _count(self, role: str, outcome: str) -> None:
+        counts = self.stats.setdefault(role, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    async def __call__(self, call: LLMCall, call_next: LLMHandler) -> Any:
+        if not self.cacheable(call):
+            return await call_next(call)
+        key = cache_key(call)
+        hit, response = self.cache.get(key)
+        if hit:
+            self._count(call.agent_role, "hits")
+            call.metadata["cache"] = "hit"
+            return response
+        self._count(call.agent_role, "misses")
+        call.metadata["cache"] = "miss"
+        response = await call_next(call)
+        self.cache.put(key, response)
+        return response
+
+
+# Global middleware (created in the application lifespan when LLM_CACHE_AGENTS is set)
+llm_cache: Optional[LLMCacheMiddleware] = None
+
+
+def configure(
+    directory: Optional[Path],
+    agents: Iterable[str],
+    ttl: float,
+    max_entries: int,
+    max_temperature: float,
+) -> Optional[LLMCacheMiddleware]:
+    """Create the cache middleware (None when no agent has caching enabled)."""
+    global llm_cache
+    agents = [a for a in agents if a]
+    if not agents:
+        llm_cache = None
+        return None
+    llm_cache = LLMCacheMiddleware(
+        ResponseCache(directory, max_entries=max_entries, ttl=ttl),
+        agents=agents,
+        max_temperature=max_temperature,
+    )
+    logger.info(f"LLM response cache enabled for: {', '.join(sorted(agents))}")
+    return llm_cache
+
+
+router = APIRouter()
+
+
+@router.get("/llm-cache")
+async def llm_cache_stats() -> Dict[str, Any]:
+    if llm_cache is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "agents": sorted(llm_cache.agents),
+        "ttl": llm_cache.cache.ttl,
+        "memory_entries": len(llm_cache.cache),
+        "stats": llm_cache.stats,
+    }
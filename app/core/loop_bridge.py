@@ -0,0 +1,109 @@
+"""
+Service Event Loop Bridge
+
+CrewAI runs crews in worker threads and calls tools and LLMs synchronously.
+The tool and LLM pipelines are async, and a new event loop per call (plus the
+default executor each such loop starts) makes thread counts grow with every
+concurrent crew. A LoopBridge bound to the service event loop at startup:
+
+    bridge.bind(asyncio.get_running_loop(), max_threads=16)
+
+- ``run_blocking(coro)``: runs a coroutine on the service loop from a thread
+  without a running loop and waits for the result. The calling thread's
+  context (task budget, ranking reference, LLM usage accounting) is copied
+  into the task. Before bind() (scripts, tests) the coroutine runs on a new
+  loop.
+- ``run_sync(func)``: runs a blocking function on the bridge's bounded thread
+  pool (with the caller's context) and awaits it.
+
+A thread cannot be interrupted: when the awaiting task is cancelled (e.g. by a
+tool call timeout) the function keeps running and keeps its pool slot until it
+returns. Such threads are reported as ``abandoned_threads`` in stats(); size
+the pool for the concurrent calls plus the calls still running after their
+deadline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+
+class LoopBridge:
+    """Runs coroutines on the service loop and blocking calls on a bounded pool."""
+
+    def __init__(self, thread_name_prefix: str):
+        self.thread_name_prefix = thread_name_prefix
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_threads = 0
+        # Functions currently running on the thread pool, and those nobody awaits
+        self._busy = 0
+        self._abandoned = 0
+        self._busy_lock = threading.Lock()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def bind(self, loop: asyncio.AbstractEventLoop, max_threads: int) -> None:
+        """Use ``loop`` for run_blocking and a pool of ``max_threads`` for run_sync."""
+        self.shutdown()
+        self._loop = loop
+        self._max_threads = max_threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_threads, thread_name_prefix=self.thread_name_prefix
+        )
+
+    def shutdown(self) -> None:
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bound": self._loop is not None,
+            "max_threads": self._max_threads if self._executor else None,
+            "busy_threads": self._busy,
+            "abandoned_threads": self._abandoned,
+        }
+
+    async def run_sync(self, func: Callable[[], Any]) -> Any:
+        """Run a blocking function on the thread pool."""
+        context = contextvars.copy_context()
+        state = {"started": False, "done": False, "abandoned": False}
+
+        def run() -> Any:
+            with self._busy_lock:
+                self._busy += 1
+                state["started"] = True
+            try:
+                return context.run(func)
+            finally:
+                with self._busy_lock:
+                    self._busy -= 1
+                    self._abandoned -= state["abandoned"]
+                    state["done"] = True
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, run)
+        except asyncio.CancelledError:
+            with self._busy_lock:
+                if state["started"] and not state["done"]:
+                    # The thread runs on until func returns (queued calls are dropped)
+                    state["abandoned"] = True
+                    self._abandoned += 1
+            raise
+
+    def run_blocking(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Run a coroutine from a thread without a running event loop."""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            # call_soon_threadsafe copies this thread's context into the task
+            return asyncio.run_coroutine_threadsafe(coro, loop).result()
+        return asyncio.run(coro)
@@ -1,10 +1,50 @@
+import asyncio
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import AsyncGenerator, List
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.agent_registry import load_agents
+from app.core.article_index import configure as configure_article_index
+from app.core.article_index import router as article_index_router
+from app.core.balancer import BalancedServerPool, DirectRoutingMiddleware
+from app.core.compaction import HistoryCompactionMiddleware
 from app.core.config import config
+from app.core.context_store import with_compact_context
+from app.core.latency import latency_tracker
+from app.core.llm import llm_pipeline
+from app.core.llm_cache import configure as configure_llm_cache
+from app.core.llm_cache import router as llm_cache_router
+from app.core.mcp_config import get_mcp_config
+from app.core.mcp_registry import registry as mcp_registry
+from app.core.mcp_reload import MCPConfigReloader
+from app.core.native_tools import configure as configure_native_tools
+from app.core.native_tools import router as tool_calls_router
+from app.core.prompt_cache import PromptCacheMiddleware
+from app.core.prompt_cache import router as llm_usage_router
+from app.core.prompt_cache import with_llm_usage
+from app.core.ranking import PreRankingMiddleware, create_embedder
+from app.core.rate_limit import RateLimitMiddleware, rate_limits
+from app.core.rate_limit import router as rate_limit_router
+from app.core.resilience import ResilienceMiddleware
+from app.core.resilience import router as mcp_breakers_router
+from app.core.scheduling import PRIORITY
+from app.core.scheduling import admission as task_admission
+from app.core.scheduling import router as scheduling_router
+from app.core.scheduling import with_scheduling
+from app.core.timeouts import AdaptiveTimeoutMiddleware, with_task_budget
+from app.core.tool_pipeline import pipeline as tool_pipeline
+from app.core.workers import (
+    clear_heartbeat,
+    router as workers_router,
+    run_heartbeat,
+    shard_for_worker,
+    with_worker_accounting,
+    worker_count,
+    worker_index,
+)
 from oxsci_shared_core.logging import logger
 from oxsci_shared_core.middleware import ExceptionHandlerMiddleware
 from oxsci_shared_core.router import default_router
@@ -12,15 +52,26 @@ from oxsci_shared_core.router import default_router
 # Import OMA-Core components
 from oxsci_oma_core.schedule import TaskScheduler
 
-# from oxsci_oma_core.adapter.crew_ai import CrewAIToolAdapter
-
-# Import agent executors
-# TODO: Add your agent imports here
-# Example: from app.agents.my_agent import MyAgent
-
 # Global scheduler list
 schedulers: List[TaskScheduler] = []
 
+# Learned tool latencies, persisted across restarts
+LATENCY_STATE_PATH = Path(config.OMA_CACHE_DIR) / "tool_latency.json"
+LATENCY_SAVE_INTERVAL = 60
+
+
+async def _persist_latency() -> None:
+    while True:
+        await asyncio.sleep(LATENCY_SAVE_INTERVAL)
+        try:
+            latency_tracker.save(LATENCY_STATE_PATH)
+        except OSError as e:
+            logger.warning(f"Failed to save tool latency state: {e}")
+
+
+# MCP config hot reload (SIGHUP, plus file watch when MCP_RELOAD_INTERVAL > 0)
+mcp_reloader = MCPConfigReloader(interval=config.MCP_RELOAD_INTERVAL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
@@ -33,19 +84,122 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """
     logger.info(f"Starting {config.SERVICE_NAME} ({config.SERVICE_VERSION})...")
 
-    # Create TaskSchedulers for all agent executors
-    # TODO: Add your agent executor classes here
-    agent_executors = [
-        # Example: MyAgent,
-    ]
+    # MCP tool call pipeline, outermost: article search results pre-ranked by similarity
+    if config.ARTICLE_RANKING_TOP_K > 0:
+        tool_pipeline.use(
+            PreRankingMiddleware(
+                create_embedder(config.ARTICLE_EMBEDDING_MODEL),
+                top_k=config.ARTICLE_RANKING_TOP_K,
+            )
+        )
+    # Article lookups answered from the local index
+    article_index = configure_article_index(
+        Path(config.OMA_CACHE_DIR) / "articles.sqlite",
+        enabled=config.ARTICLE_INDEX_ENABLED,
+        negative_ttl=config.ARTICLE_INDEX_NEGATIVE_TTL,
+        local_search_min_hits=config.ARTICLE_INDEX_LOCAL_SEARCH_MIN_HITS,
+    )
+    if article_index is not None:
+        tool_pipeline.use(article_index)
+    # Per-server circuit breakers and optional hedging
+    mcp_registry.set_pool_factory(BalancedServerPool)
+    tool_pipeline.use(
+        ResilienceMiddleware(
+            hedge_tools=config.MCP_HEDGE_TOOLS if config.MCP_HEDGE_ENABLED else (),
+            hedge_percentile=config.MCP_HEDGE_PERCENTILE,
+        )
+    )
+    # Adaptive per-call deadlines learned from observed tool latency
+    tool_pipeline.use(
+        AdaptiveTimeoutMiddleware(
+            factor=config.TOOL_TIMEOUT_FACTOR,
+            min_timeout=config.TOOL_TIMEOUT_MIN,
+            min_samples=config.TOOL_TIMEOUT_MIN_SAMPLES,
+            budget_slack=config.TOOL_BUDGET_SLACK,
+        )
+    )
+    # Direct routing to load-balanced replicas (servers with "direct_routing": true)
+    tool_pipeline.use(DirectRoutingMiddleware())
+    # Innermost: other MCP calls as async requests from the service loop
+    native_tools = configure_native_tools(
+        config.MCP_NATIVE_TOOL_CALLS, idempotent_tools=config.MCP_IDEMPOTENT_TOOLS
+    )
+    if native_tools is not None:
+        tool_pipeline.use(native_tools)
+    # Synchronous (CrewAI) tool calls run on this loop, blocking tools on a bounded pool
+    tool_pipeline.bridge.bind(asyncio.get_running_loop(), config.TOOL_THREAD_POOL_SIZE)
+    # Opt-in response cache for deterministic LLM calls (hits skip the rate limits)
+    llm_cache = configure_llm_cache(
+        Path(config.OMA_CACHE_DIR) / "llm_responses",
+        agents=config.LLM_CACHE_AGENTS,
+        ttl=config.LLM_CACHE_TTL,
+        max_entries=config.LLM_CACHE_SIZE,
+        max_temperature=config.LLM_CACHE_MAX_TEMPERATURE,
+    )
+    if llm_cache is not None:
+        llm_pipeline.use(llm_cache)
+    # Compact large tool results of earlier turns in long tool loops
+    llm_pipeline.use(
+        HistoryCompactionMiddleware(
+            min_chars=config.LLM_COMPACT_MIN_CHARS,
+            keep_chars=config.LLM_COMPACT_KEEP_CHARS,
+            keep_recent=config.LLM_COMPACT_KEEP_RECENT,
+            batch=config.LLM_COMPACT_BATCH,
+        )
+    )
+    # LLM provider rate limits shared by all agents (per pod, split across workers)
+    rate_limits.configure(config.LLM_RATE_LIMITS, divisor=worker_count())
+    llm_pipeline.use(RateLimitMiddleware())
+    # Provider prompt caching breakpoints and cached-token accounting
+    llm_pipeline.use(PromptCacheMiddleware(config.LLM_PROMPT_CACHE_MODELS))
+    # Synchronous (CrewAI) LLM calls run the pipeline on this loop
+    llm_pipeline.bridge.bind(asyncio.get_running_loop(), config.LLM_THREAD_POOL_SIZE)
+
+    loaded = latency_tracker.load(LATENCY_STATE_PATH)
+    logger.info(f"Loaded latency history for {loaded} tools")
+    latency_task = asyncio.create_task(_persist_latency())
+
+    # Resolve MCP configuration (prebuilt snapshot when available)
+    try:
+        mcp_config = get_mcp_config()
+        logger.info(
+            f"MCP config loaded for env '{mcp_config.env}' from {mcp_config.source}: "
+            f"{[s.name for s in mcp_config.enabled_servers]}"
+        )
+        await mcp_registry.apply(mcp_config)
+    except Exception as e:
+        logger.error(f"Failed to resolve MCP configuration: {e}")
+    mcp_reloader.start()
 
-    for executor_class in agent_executors:
+    # Create TaskSchedulers for the discovered agent executors
+    # (all agents in app/agents/, or the subset named in OMA_AGENTS)
+    agent_executors = load_agents(
+        config.OMA_AGENTS, use_manifest=config.OMA_AGENT_MANIFEST
+    )
+    # Multi-worker mode: this worker's shard (or all agents in replicate mode)
+    agent_executors = shard_for_worker(agent_executors, config.OMA_WORKER_MODE)
+    # Priority/deadline admission shared by all schedulers of this worker
+    task_admission.configure(config.TASK_SCHEDULING_SLOTS, config.TASK_SHED_POLICY)
+
+    for executor_class, adapter_class in agent_executors:
         try:
+            # Run each task under a time budget split across its tool calls,
+            # account its LLM usage (cached prompt tokens) and hold its
+            # context's shared data compactly
+            wrapped = with_task_budget(
+                with_llm_usage(
+                    with_worker_accounting(with_compact_context(executor_class))
+                )
+            )
+            if config.TASK_SCHEDULING_MODE == PRIORITY:
+                # Outermost: the budget clock and the pod-wide task slot start
+                # only once the task is admitted, not while it waits in the queue
+                wrapped = with_scheduling(wrapped)
             # Create TaskScheduler (automatically retrieves agent_config)
             scheduler = TaskScheduler(
-                executor_class=executor_class,  # type: ignore
-                # adapter_class=CrewAIToolAdapter, # CCA not required
-                adapter_class=None,  # CCA not required
+                executor_class=wrapped,  # type: ignore
+                # Inferred from the executor's adapter type hint (None for CCA)
+                adapter_class=adapter_class,
             )
 
             await scheduler.start()
@@ -60,7 +214,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 f"Failed to start scheduler for executor {executor_class.__name__}: {e}"
             )
 
-    logger.info(f"🚀 {config.SERVICE_NAME} started with {len(schedulers)} agents")
+    logger.info(
+        f"🚀 {config.SERVICE_NAME} started with {len(schedulers)} agents "
+        f"(worker {worker_index() + 1}/{worker_count()})"
+    )
+    heartbeat_task = asyncio.create_task(
+        run_heartbeat([s.agent_config.agent_id for s in schedulers])
+    )
 
     yield
 
@@ -77,6 +237,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         except Exception as e:
             logger.warning(f"Failed to stop scheduler: {e}")
 
+    heartbeat_task.cancel()
+    clear_heartbeat()
+
+    # Persist learned tool latencies
+    latency_task.cancel()
+    try:
+        latency_tracker.save(LATENCY_STATE_PATH)
+    except OSError as e:
+        logger.warning(f"Failed to save tool latency state: {e}")
+
+    if article_index is not None:
+        article_index.index.close()
+
+    # Stop config reload, drain MCP pools and close their sessions
+    await mcp_reloader.stop()
+    await mcp_registry.close()
+    tool_pipeline.bridge.shutdown()
+    llm_pipeline.bridge.shutdown()
+
     logger.info(f"👋 {config.SERVICE_NAME} shutdown complete")
 
 
@@ -101,3 +280,19 @@ app.add_middleware(
 
 # Include default routes (health, version, etc.)
 app.include_router(default_router)
+# Aggregated health of all worker processes
+app.include_router(workers_router)
+# Task admission decisions (TASK_SCHEDULING_MODE="priority")
+app.include_router(scheduling_router)
+# LLM rate limit queueing per model and agent role
+app.include_router(rate_limit_router)
+# LLM response cache hits and misses per agent role
+app.include_router(llm_cache_router)
+# Local article index size and lookups answered locally
+app.include_router(article_index_router)
+# LLM prompt tokens and provider cache hits per agent role
+app.include_router(llm_usage_router)
+# MCP tool calls made natively vs through adapters, tool thread pool usage
+app.include_router(tool_calls_router)
+# Circuit breaker state per MCP server
+app.include_router(mcp_breakers_router)
@@ -0,0 +1,473 @@
+"""
+MCP Configuration Resolution
+
+Resolves the MCP server configuration from the JSON files in app/config/mcp/:
+- base.json       - complete server definitions (all disabled by default)
+- {env}.json      - environment overrides merged on top of base.json
+
+Build step (run in the Docker image, fails the build on invalid config):
+    python -m app.core.mcp_config build            # all environments
+    python -m app.core.mcp_config build --env test # single environment
+    python -m app.core.mcp_config check            # validate only
+
+The build writes one frozen snapshot per environment to
+app/config/mcp/snapshot/{env}.json. At runtime load_mcp_config() trusts the
+snapshot and reads it directly, without reading or hashing the source files. It
+only merges base.json + {env}.json when the snapshot is missing or
+MCP_CONFIG_SNAPSHOT is off (e.g. to use a mounted dev.json); hot reloads
+always merge the source files.
+
+Placeholders such as ${MCP_PROXY_URL} and ${PROXY_API_KEY} are kept in the
+snapshot (secrets are never baked into the image) and substituted on load. The
+build can only check that a required field references a placeholder; the build
+output lists the placeholders each environment needs at runtime, and a load
+whose required field is empty because its placeholder is not set fails naming
+the variable.
+
+Limit: the snapshot is read by this service's own MCP code (registry pools,
+tool discovery, native tool calls, direct routing) and by the build-time
+validation. The oxsci-oma-core adapters still load base.json + {env}.json with
+their own loader at startup, so calls that go through an adapter's MCP client
+(native calls off, or a fallback) use the SDK's merge of the same files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+MCP_CONFIG_DIR = Path(__file__).resolve().parent.parent / "config" / "mcp"
+SNAPSHOT_DIR_NAME = "snapshot"
+SNAPSHOT_VERSION = 1
+
+# Placeholders allowed in MCP config files, resolved from app.core.config / environment
+ALLOWED_PLACEHOLDERS = ("MCP_PROXY_URL", "PROXY_API_KEY")
+
+# Keys accepted in a server's "circuit_breaker" object (see app/core/resilience.py)
+CIRCUIT_BREAKER_KEYS = (
+    "enabled",
+    "window_size",
+    "min_calls",
+    "failure_rate",
+    "slow_call_seconds",
+    "slow_call_rate",
+    "open_seconds",
+    "half_open_calls",
+)
+
+LOAD_BALANCING_POLICIES = ("least_outstanding", "ewma")
+
+_PLACEHOLDER_RE = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+class MCPConfigError(ValueError):
+    """Raised when the MCP configuration is invalid."""
+
+
+@dataclass(frozen=True)
+class MCPServerConfig:
+    """Validated configuration of a single MCP server."""
+
+    name: str
+    enabled: bool = False
+    service_name: str = ""
+    port: int = 8060
+    timeout: float = 30
+    max_startup_wait: float = 300
+    retry_interval: float = 5
+    proxy: bool = False
+    proxy_url: str = ""
+    api_key: str = ""
+    api_key_env: str = ""
+    # Header carrying the API key on tool calls the service sends itself
+    # (native calls, direct routing); "Authorization" sends "Bearer <key>"
+    api_key_header: str = "X-API-Key"
+    url_override: str = ""
+    # Optional resilience overrides, see app/core/resilience.py for the keys
+    circuit_breaker: Dict[str, Any] = field(default_factory=dict)
+    # Client-side load balancing, see app/core/balancer.py
+    direct_routing: bool = False
+    replicas: List[str] = field(default_factory=list)
+    load_balancing: str = "least_outstanding"
+    resolve_interval: float = 30
+    mcp_path: str = "/mcp"
+
+    @property
+    def url(self) -> str:
+        """Resolve the server URL according to the connection mode."""
+        if self.url_override:
+            return self.url_override
+        if self.proxy:
+            return f"{self.proxy_url.rstrip('/')}/{self.service_name}:{self.port}"
+        return f"http://{self.service_name}.oxsci.internal:{self.port}"
+
+    def auth_headers(self) -> Dict[str, str]:
+        """Authentication headers for requests the service sends to this server."""
+        key = self.api_key or (
+            os.environ.get(self.api_key_env, "") if self.api_key_env else ""
+        )
+        if not key:
+            return {}
+        if self.api_key_header.lower() == "authorization":
+            return {self.api_key_header: f"Bearer {key}"}
+        return {self.api_key_header: key}
+
+    @property
+    def connection_mode(self) -> str:
+        if self.url_override:
+            return "url_override"
+        return "proxy" if self.proxy else "direct"
+
+    def validate(self) -> None:
+        """Validate field values, raising MCPConfigError on the first problem."""
+        prefix = f"mcp server '{self.name}'"
+        if not 0 < self.port <= 65535:
+            raise MCPConfigError(f"{prefix}: port must be in 1-65535, got {self.port}")
+        for name in ("timeout", "retry_interval"):
+            if getattr(self, name) <= 0:
+                raise MCPConfigError(f"{prefix}: {name} must be > 0")
+        if self.max_startup_wait < 0:
+            raise MCPConfigError(f"{prefix}: max_startup_wait must be >= 0")
+        unknown = set(self.circuit_breaker) - set(CIRCUIT_BREAKER_KEYS)
+        if unknown:
+            raise MCPConfigError(f"{prefix}: unknown circuit_breaker keys {sorted(unknown)}")
+        if self.load_balancing not in LOAD_BALANCING_POLICIES:
+            raise MCPConfigError(
+                f"{prefix}: load_balancing must be one of {LOAD_BALANCING_POLICIES}"
+            )
+        if self.resolve_interval <= 0:
+            raise MCPConfigError(f"{prefix}: resolve_interval must be > 0")
+        for replica in self.replicas:
+            if not replica.startswith(("http://", "https://")):
+                raise MCPConfigError(f"{prefix}: replica '{replica}' must be an http(s) URL")
+        if not self.enabled or self.url_override:
+            return
+        if not self.service_name:
+            raise MCPConfigError(f"{prefix}: service_name is required when enabled")
+        if self.proxy and not self.proxy_url:
+            raise MCPConfigError(f"{prefix}: proxy_url is required when proxy=true")
+
+    @classmethod
+    def from_dict(cls, name: str, data: Mapping[str, Any]) -> "MCPServerConfig":
+        """Build a server config from raw JSON, rejecting unknown keys and bad types."""
+        known = {f.name: f for f in fields(cls) if f.name != "name"}
+        unknown = set(data) - set(known)
+        if unknown:
+            raise MCPConfigError(
+                f"mcp server '{name}': unknown keys {sorted(unknown)}"
+            )
+        values: Dict[str, Any] = {}
+        for key, value in data.items():
+            expected = known[key].type
+            if expected == "bool" and not isinstance(value, bool):
+                raise MCPConfigError(f"mcp server '{name}': {key} must be a boolean")
+            if expected in ("int", "float") and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                raise MCPConfigError(f"mcp server '{name}': {key} must be a number")
+            if expected == "str" and not isinstance(value, str):
+                raise MCPConfigError(f"mcp server '{name}': {key} must be a string")
+            if expected.startswith("Dict") and not isinstance(value, dict):
+                raise MCPConfigError(f"mcp server '{name}': {key} must be an object")
+            if expected == "List[str]" and not (
+                isinstance(value, list) and all(isinstance(v, str) for v in value)
+            ):
+                raise MCPConfigError(f"mcp server '{name}': {key} must be a list of strings")
+            values[key] = value
+        server = cls(name=name, **values)
+        server.validate()
+        return server
+
+
+@dataclass(frozen=True)
+class MCPConfig:
+    """Resolved MCP configuration for one environment."""
+
+    env: str
+    servers: Tuple[MCPServerConfig, ...] = field(default_factory=tuple)
+    source: str = "dynamic"  # "snapshot" or "dynamic"
+
+    def get(self, name: str) -> Optional[MCPServerConfig]:
+        for server in self.servers:
+            if server.name == name:
+                return server
+        return None
+
+    @property
+    def enabled_servers(self) -> Tuple[MCPServerConfig, ...]:
+        return tuple(s for s in self.servers if s.enabled)
+
+
+# ============================================================================
+# Resolution
+# ============================================================================
+
+
+def _read_json(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise MCPConfigError(f"{path.name}: invalid JSON ({e})") from e
+    if not isinstance(data, dict) or not isinstance(data.get("servers", {}), dict):
+        raise MCPConfigError(f"{path.name}: expected an object with a 'servers' object")
+    return data
+
+
+def _source_paths(env: str, config_dir: Path) -> List[Path]:
+    paths = [config_dir / "base.json"]
+    env_path = config_dir / f"{env}.json"
+    if env_path.exists():
+        paths.append(env_path)
+    return paths
+
+
+def merge_raw_config(
+    env: str, config_dir: Path = MCP_CONFIG_DIR
+) -> Dict[str, Dict[str, Any]]:
+    """Merge base.json with {env}.json, returning raw per-server dicts."""
+    base_path = config_dir / "base.json"
+    if not base_path.exists():
+        raise MCPConfigError(f"missing {base_path}")
+    merged: Dict[str, Dict[str, Any]] = {}
+    for path in _source_paths(env, config_dir):
+        for name, overrides in _read_json(path).get("servers", {}).items():
+            if not isinstance(overrides, dict):
+                raise MCPConfigError(f"{path.name}: server '{name}' must be an object")
+            merged.setdefault(name, {}).update(overrides)
+    return merged
+
+
+def _check_placeholders(name: str, raw: Mapping[str, Any]) -> None:
+    for key, value in raw.items():
+        if not isinstance(value, str):
+            continue
+        for var in _PLACEHOLDER_RE.findall(value):
+            if var not in ALLOWED_PLACEHOLDERS:
+                raise MCPConfigError(
+                    f"mcp server '{name}': {key} references unknown placeholder "
+                    f"${{{var}}} (allowed: {', '.join(ALLOWED_PLACEHOLDERS)})"
+                )
+
+
+def _placeholder_values() -> Dict[str, str]:
+    """Resolve placeholder values from app config, falling back to the environment."""
+    try:
+        from app.core.config import config
+
+        values = {var: str(getattr(config, var, "") or "") for var in ALLOWED_PLACEHOLDERS}
+    except ImportError:
+        values = {}
+    for var in ALLOWED_PLACEHOLDERS:
+        if not values.get(var):
+            values[var] = os.environ.get(var, "")
+    return values
+
+
+def runtime_placeholders(merged: Mapping[str, Mapping[str, Any]]) -> List[str]:
+    """Placeholders the enabled servers of a merged configuration reference."""
+    found = set()
+    for raw in merged.values():
+        if not raw.get("enabled"):
+            continue
+        for value in raw.values():
+            if isinstance(value, str):
+                found.update(_PLACEHOLDER_RE.findall(value))
+    return sorted(found)
+
+
+def _substitute(raw: Mapping[str, Any], values: Mapping[str, str]) -> Dict[str, Any]:
+    return {
+        key: (
+            _PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), ""), value)
+            if isinstance(value, str)
+            else value
+        )
+        for key, value in raw.items()
+    }
+
+
+def _build_servers(
+    merged: Mapping[str, Mapping[str, Any]], values: Optional[Mapping[str, str]]
+) -> Tuple[MCPServerConfig, ...]:
+    servers = []
+    for name, raw in merged.items():
+        _check_placeholders(name, raw)
+        if values is None:
+            servers.append(MCPServerConfig.from_dict(name, raw))
+            continue
+        resolved = _substitute(raw, values)
+        try:
+            servers.append(MCPServerConfig.from_dict(name, resolved))
+        except MCPConfigError as e:
+            # Valid at build time, but a placeholder is empty in this environment
+            unset = sorted(
+                {
+                    var
+                    for key, value in raw.items()
+                    if isinstance(value, str) and not resolved[key]
+                    for var in _PLACEHOLDER_RE.findall(value)
+                }
+            )
+            if not unset:
+                raise
+            raise MCPConfigError(
+                f"{e} (placeholder {', '.join(f'${{{v}}}' for v in unset)} "
+                "is not set in this environment)"
+            ) from e
+    return tuple(servers)
+
+
+def build_snapshot(env: str, config_dir: Path = MCP_CONFIG_DIR) -> Dict[str, Any]:
+    """Merge and validate one environment, returning the snapshot document."""
+    merged = merge_raw_config(env, config_dir)
+    # Validate with placeholders kept, they are substituted at load time
+    _build_servers(merged, None)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "env": env,
+        "placeholders": runtime_placeholders(merged),
+        "servers": merged,
+    }
+
+
+def write_snapshot(env: str, config_dir: Path = MCP_CONFIG_DIR) -> Path:
+    """Build and write app/config/mcp/snapshot/{env}.json."""
+    snapshot = build_snapshot(env, config_dir)
+    snapshot_dir = config_dir / SNAPSHOT_DIR_NAME
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    path = snapshot_dir / f"{env}.json"
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(snapshot, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def _load_snapshot(env: str, config_dir: Path) -> Optional[Dict[str, Any]]:
+    path = config_dir / SNAPSHOT_DIR_NAME / f"{env}.json"
+    if not path.exists():
+        return None
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("env") != env:
+        return None
+    return snapshot
+
+
+def resolve_env() -> str:
+    """MCP environment name: MCP_ENV if set, otherwise the service ENV."""
+    from app.core.config import config
+
+    env = config.MCP_ENV or getattr(config.ENV, "value", config.ENV)
+    return str(env)
+
+
+def load_mcp_config(
+    env: Optional[str] = None,
+    config_dir: Path = MCP_CONFIG_DIR,
+    use_snapshot: bool = True,
+) -> MCPConfig:
+    """
+    Load the MCP configuration for an environment.
+
+    Args:
+        env: Environment name (default: resolve_env())
+        config_dir: Directory holding base.json, {env}.json and snapshot/
+        use_snapshot: Read the prebuilt snapshot when there is one
+
+    Returns:
+        MCPConfig: Frozen, validated configuration with placeholders substituted
+    """
+    env = env or resolve_env()
+    values = _placeholder_values()
+    snapshot = _load_snapshot(env, config_dir) if use_snapshot else None
+    if snapshot is not None:
+        return MCPConfig(
+            env=env, servers=_build_servers(snapshot["servers"], values), source="snapshot"
+        )
+    return MCPConfig(
+        env=env,
+        servers=_build_servers(merge_raw_config(env, config_dir), values),
+        source="dynamic",
+    )
+
+
+_current: Optional[MCPConfig] = None
+
+
+def get_mcp_config() -> MCPConfig:
+    """Process-wide resolved MCP configuration (loaded once)."""
+    global _current
+    if _current is None:
+        from app.core.config import config
+
+        _current = load_mcp_config(use_snapshot=config.MCP_CONFIG_SNAPSHOT)
+    return _current
+
+
+def set_mcp_config(mcp_config: MCPConfig) -> None:
+    """Replace the process-wide MCP configuration."""
+    global _current
+    _current = mcp_config
+
+
+def config_as_dict(mcp_config: MCPConfig) -> Dict[str, Any]:
+    """Serializable view of a resolved configuration (secrets masked)."""
+    servers = {}
+    for server in mcp_config.servers:
+        data = asdict(server)
+        data.pop("name")
+        if data.get("api_key"):
+            data["api_key"] = "***"
+        data["url"] = server.url
+        servers[server.name] = data
+    return {"env": mcp_config.env, "source": mcp_config.source, "servers": servers}
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+
+def _available_envs(config_dir: Path) -> List[str]:
+    return sorted(p.stem for p in config_dir.glob("*.json") if p.stem != "base")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Validate MCP configuration and build per-environment snapshots"
+    )
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument(
+        "--env",
+        action="append",
+        help="Environment to process (repeatable, default: all {env}.json files)",
+    )
+    parser.add_argument("--config-dir", type=Path, default=MCP_CONFIG_DIR)
+    args = parser.parse_args(argv)
+
+    envs = args.env or _available_envs(args.config_dir)
+    failed = False
+    for env in envs:
+        try:
+            if args.command == "build":
+                path = write_snapshot(env, args.config_dir)
+                print(f"✅ {env}: snapshot written to {path}")
+            else:
+                build_snapshot(env, args.config_dir)
+                print(f"✅ {env}: configuration valid")
+            placeholders = runtime_placeholders(merge_raw_config(env, args.config_dir))
+            if placeholders:
+                print(f"   {env}: needs {', '.join(placeholders)} at runtime")
+        except (MCPConfigError, OSError) as e:
+            print(f"❌ {env}: {e}", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+MCP Server Registry
+
+Process-wide runtime state for the configured MCP servers:
+- one ServerPool per enabled server: its MCP session (app.core.mcp_transport)
+  used for native and direct tool calls, in-flight accounting, drain/close
+- tool routes mapping each MCP tool name to the server that provides it,
+  from the server's own ``tools/list`` when its pool is opened
+
+The registry state is an immutable RegistrySnapshot that is replaced atomically
+when the configuration changes, so in-flight tool calls keep the pool they
+acquired while new calls see the new servers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional
+
+from oxsci_shared_core.logging import logger
+
+from app.core.mcp_config import MCPConfig, MCPServerConfig
+from app.core.mcp_transport import MCPHttpTransport, MCPToolError, MCPTransportError
+
+
+_DRAIN_POLL_INTERVAL = 0.1
+
+
+class ServerUnavailableError(RuntimeError):
+    """Raised when a tool call targets a server that is closed or unknown."""
+
+
+class ServerPool:
+    """Runtime state of one MCP server and its MCP session."""
+
+    def __init__(self, server: MCPServerConfig):
+        self.server = server
+        self.transport = MCPHttpTransport(path=server.mcp_path)
+        # Tool names the server listed when the pool was opened
+        self.tools: List[str] = []
+        self.in_flight = 0
+        self.closed = False
+        # Calls may run on worker-thread event loops, so count under a thread lock
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    async def open(self) -> None:
+        """Open the MCP session and list the server's tools."""
+        try:
+            self.tools = await self.transport.list_tools(
+                self.server.url,
+                timeout=self.server.timeout,
+                headers=self.server.auth_headers(),
+            )
+        except (MCPTransportError, MCPToolError) as e:
+            # The session is opened again on the first call
+            logger.warning(f"MCP server {self.name} did not list its tools: {e}")
+        logger.info(
+            f"MCP pool opened: {self.name} ({self.server.url}, {len(self.tools)} tools)"
+        )
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator["ServerPool"]:
+        """Track one in-flight call on this pool."""
+        if self.closed:
+            raise ServerUnavailableError(f"MCP server '{self.name}' is closed")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting calls and wait for in-flight calls to finish."""
+        self.closed = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        while self.in_flight > 0:
+            if deadline is not None and loop.time() >= deadline:
+                logger.warning(
+                    f"MCP pool {self.name} drain timed out with {self.in_flight} in-flight calls"
+                )
+                return False
+            await asyncio.sleep(_DRAIN_POLL_INTERVAL)
+        return True
+
+    async def close(self) -> None:
+        """Release pool resources."""
+        self.closed = True
+        await self.transport.aclose()
+        logger.info(f"MCP pool closed: {self.name}")
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable view of the registry at one point in time."""
+
+    config: Optional[MCPConfig] = None
+    pools: Mapping[str, ServerPool] = field(default_factory=dict)
+    tool_routes: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ConfigDiff:
+    """Difference between two MCP configurations (enabled servers only)."""
+
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    unchanged: List[str]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def diff_configs(old: Optional[MCPConfig], new: MCPConfig) -> ConfigDiff:
+    """Compare the enabled servers of two configurations."""
+    old_servers = {s.name: s for s in old.enabled_servers} if old else {}
+    new_servers = {s.name: s for s in new.enabled_servers}
+    return ConfigDiff(
+        added=sorted(set(new_servers) - set(old_servers)),
+        removed=sorted(set(old_servers) - set(new_servers)),
+        changed=sorted(
+            n for n in set(old_servers) & set(new_servers) if old_servers[n] != new_servers[n]
+        ),
+        unchanged=sorted(
+            n for n in set(old_servers) & set(new_servers) if old_servers[n] == new_servers[n]
+        ),
+    )
+
+
+ToolDiscoverer = Callable[[ServerPool], Iterable[str]]
+
+
+def listed_tools(pool: ServerPool) -> List[str]:
+    """Default discoverer: the tools the server listed when its pool was opened."""
+    return pool.tools
+
+
+class MCPServerRegistry:
+    """Holds the current RegistrySnapshot and applies configuration changes."""
+
+    def __init__(self, discoverer: ToolDiscoverer = listed_tools):
+        self._snapshot = RegistrySnapshot()
+        self._discoverer = discoverer
+        self._lock = asyncio.Lock()
+        self._draining: List[asyncio.Task] = []
+        self._pool_factory: Callable[[MCPServerConfig], ServerPool] = ServerPool
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        return self._snapshot
+
+    def set_pool_factory(self, factory: Callable[[MCPServerConfig], ServerPool]) -> None:
+        """Override the ServerPool class used for newly opened servers."""
+        self._pool_factory = factory
+
+    def pool(self, server_name: str) -> Optional[ServerPool]:
+        return self._snapshot.pools.get(server_name)
+
+    def server_for_tool(self, tool_name: str) -> Optional[str]:
+        return self._snapshot.tool_routes.get(tool_name)
+
+    def pool_for_tool(self, tool_name: str) -> Optional[ServerPool]:
+        server_name = self.server_for_tool(tool_name)
+        return self.pool(server_name) if server_name else None
+
+    def _discover(self, pool: ServerPool) -> List[str]:
+        try:
+            tools = list(self._discoverer(pool))
+        except Exception as e:
+            logger.warning(f"Tool discovery failed for MCP server {pool.name}: {e}")
+            return []
+        if not tools:
+            logger.warning(
+                f"No tools discovered for MCP server {pool.name}: its calls are not "
+                "routed (no native calls, direct routing or circuit breaker)"
+            )
+        return tools
+
+    async def apply(self, new_config: MCPConfig) -> ConfigDiff:
+        """
+        Apply a new configuration.
+
+        Opens pools for added/changed servers, swaps the snapshot atomically and
+        drains/closes the pools of removed/changed servers in the background.
+
+        Returns:
+            ConfigDiff: Servers added, removed, changed and unchanged
+        """
+        async with self._lock:
+            old = self._snapshot
+            diff = diff_configs(old.config, new_config)
+
+            pools: Dict[str, ServerPool] = {
+                name: old.pools[name] for name in diff.unchanged if name in old.pools
+            }
+            opened = [
+                self._pool_factory(new_config.get(name))  # type: ignore[arg-type]
+                for name in diff.added + diff.changed
+            ]
+            await asyncio.gather(*(pool.open() for pool in opened))
+            pools.update((pool.name, pool) for pool in opened)
+
+            routes: Dict[str, str] = {
+                tool: server
+                for tool, server in old.tool_routes.items()
+                if server in diff.unchanged
+            }
+            for pool in opened:
+                for tool in self._discover(pool):
+                    routes[tool] = pool.name
+
+            self._snapshot = RegistrySnapshot(
+                config=new_config,
+                pools=MappingProxyType(pools),
+                tool_routes=MappingProxyType(routes),
+            )
+
+            for name in diff.removed + diff.changed:
+                retired = old.pools.get(name)
+                if retired is not None:
+                    self._draining.append(asyncio.create_task(self._retire(retired)))
+            self._draining = [t for t in self._draining if not t.done()]
+
+        if not diff.is_empty:
+            logger.info(
+                f"MCP registry updated: added={diff.added} removed={diff.removed} "
+                f"changed={diff.changed}"
+            )
+        return diff
+
+    async def _retire(self, pool: ServerPool) -> None:
+        await pool.drain(timeout=pool.server.timeout)
+        await pool.close()
+
+    async def close(self) -> None:
+        """Drain and close every pool (service shutdown)."""
+        async with self._lock:
+            pools = list(self._snapshot.pools.values())
+            self._snapshot = RegistrySnapshot()
+        await asyncio.gather(*(self._retire(p) for p in pools), *self._draining)
+        self._draining.clear()
+
+
+# Global registry instance
+registry = MCPServerRegistry()
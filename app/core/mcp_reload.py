@@ -0,0 +1,162 @@
+"""
+MCP Configuration Hot Reload
+
+Reloads app/config/mcp/*.json without restarting the process:
+- file watch: polls the config files every MCP_RELOAD_INTERVAL seconds
+- signal: SIGHUP triggers an immediate reload
+
+A reload resolves the new configuration, applies it to the MCP server registry
+(open new pools, drain and close removed ones, swap tool routes atomically) and
+leaves running TaskSchedulers untouched. An invalid configuration is logged and
+the current one stays active.
+
+Limit: the oma-core tool registry and the adapters' MCP clients are built once
+at startup and a reload cannot rebind them. Adapter calls (the default path
+when native calls are off, and native calls that fell back) keep connecting
+to the servers the service started with. A reload that disables one of these
+servers or changes how it is reached (URL, MCP path, API key) is therefore
+rejected like an invalid configuration: it would only take effect for part of
+the calls. Such changes need a restart. Other settings (timeouts, circuit
+breakers, replicas) only apply to registry pools and reload normally; tools of
+an added server are not offered to agents until the service restarts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import signal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from oxsci_shared_core.logging import logger
+
+from app.core.mcp_config import (
+    MCP_CONFIG_DIR,
+    MCPConfig,
+    MCPConfigError,
+    MCPServerConfig,
+    load_mcp_config,
+    set_mcp_config,
+)
+from app.core.mcp_registry import ConfigDiff, MCPServerRegistry, registry
+
+
+def adapter_settings(server: MCPServerConfig) -> Tuple[Any, ...]:
+    """Settings the adapters' MCP clients were built with for a server."""
+    return (server.url, server.mcp_path, server.auth_headers())
+
+
+def adapter_conflicts(bound: Optional[MCPConfig], new: MCPConfig) -> List[str]:
+    """Servers the adapters use that a new configuration disables or moves."""
+    if bound is None:
+        return []
+    new_servers = {s.name: s for s in new.enabled_servers}
+    conflicts = []
+    for server in bound.enabled_servers:
+        replacement = new_servers.get(server.name)
+        if replacement is None:
+            conflicts.append(f"{server.name} (disabled)")
+        elif adapter_settings(replacement) != adapter_settings(server):
+            conflicts.append(f"{server.name} (connection changed)")
+    return conflicts
+
+
+class MCPConfigReloader:
+    """Watches the MCP config files and applies changes to the registry."""
+
+    def __init__(
+        self,
+        target: MCPServerRegistry = registry,
+        config_dir: Path = MCP_CONFIG_DIR,
+        interval: float = 0,
+    ):
+        """
+        Args:
+            target: Registry that receives the new configuration
+            config_dir: Directory holding the MCP JSON files
+            interval: File poll interval in seconds (0 disables file watching)
+        """
+        self.target = target
+        self.config_dir = config_dir
+        self.interval = interval
+        self._mtimes: Dict[Path, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._reload_lock = asyncio.Lock()
+        # Configuration the adapters' MCP clients were built with (set by start())
+        self._adapter_config: Optional[MCPConfig] = None
+
+    def _scan(self) -> Dict[Path, float]:
+        return {p: p.stat().st_mtime for p in sorted(self.config_dir.glob("*.json"))}
+
+    async def reload(self) -> Optional[ConfigDiff]:
+        """Resolve the configuration from disk and apply it."""
+        async with self._reload_lock:
+            try:
+                # Files changed since the build, so always resolve dynamically
+                new_config = load_mcp_config(config_dir=self.config_dir, use_snapshot=False)
+            except (MCPConfigError, OSError) as e:
+                logger.error(f"MCP config reload rejected, keeping current config: {e}")
+                return None
+            conflicts = adapter_conflicts(self._adapter_config, new_config)
+            if conflicts:
+                logger.error(
+                    f"MCP config reload rejected, keeping current config: {conflicts} "
+                    "are used by the agents' adapters, which only pick up the "
+                    "change after a restart"
+                )
+                return None
+            diff = await self.target.apply(new_config)
+            set_mcp_config(new_config)
+            if diff.added or diff.removed:
+                logger.warning(
+                    f"MCP servers added {diff.added} / removed {diff.removed}: "
+                    "agents' tool lists change only after a restart"
+                )
+            return diff
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                mtimes = self._scan()
+            except OSError as e:
+                logger.warning(f"MCP config watch failed: {e}")
+                continue
+            if mtimes != self._mtimes:
+                self._mtimes = mtimes
+                logger.info("MCP config files changed, reloading...")
+                await self.reload()
+
+    def start(self) -> None:
+        """Install the SIGHUP handler and start the file watcher (if enabled).
+
+        Call after the startup configuration has been applied to the registry:
+        it is the configuration the adapters were built with.
+        """
+        self._adapter_config = self.target.snapshot.config
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(
+                signal.SIGHUP, lambda: asyncio.ensure_future(self.reload())
+            )
+        except (NotImplementedError, AttributeError, RuntimeError):
+            # Windows / non-main thread: signal reload unavailable
+            pass
+        if self.interval > 0:
+            self._mtimes = self._scan()
+            self._task = asyncio.create_task(self._watch())
+            logger.info(f"MCP config watch enabled (every {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop watching and remove the SIGHUP handler."""
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            pass
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
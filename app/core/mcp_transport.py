@@ -0,0 +1,262 @@
+"""
+Direct MCP HTTP Transport
+
+Minimal MCP client used for direct routing, native tool calls and tool
+discovery: sends JSON-RPC ``tools/call`` and ``tools/list`` requests over the
+streamable HTTP transport and returns the result. Responses may be plain JSON
+or a server-sent event stream carrying the JSON-RPC response.
+
+Each base URL gets one MCP session: the first call performs the
+``initialize`` / ``notifications/initialized`` handshake and later calls send
+the ``Mcp-Session-Id`` the server returned (servers running stateless return
+none). A session the server no longer knows (HTTP 404) is re-initialized and
+the call is sent again, it was not processed.
+
+Errors tell whether the call may have reached the server:
+
+- MCPConnectError: the call was not sent (connection or handshake failed)
+- MCPTransportError: anything after sending (timeouts, HTTP errors), the tool
+  may have run
+- MCPToolError: the server answered with a JSON-RPC error or a failed result
+
+Calls run on the service event loop (synchronous callers go through the tool
+pipeline's LoopBridge), so a transport keeps one httpx client, created on
+first use and closed with aclose() when its registry pool closes at shutdown.
+A call from another loop (scripts and tests without a bound service loop)
+uses a one-off client instead: httpx clients cannot be shared across loops.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import httpx
+
+PROTOCOL_VERSION = "2025-03-26"
+CLIENT_INFO = {"name": "oma-service", "version": "1.0"}
+SESSION_HEADER = "Mcp-Session-Id"
+PROTOCOL_HEADER = "MCP-Protocol-Version"
+
+# httpx errors raised before the request was sent
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class MCPTransportError(RuntimeError):
+    """Raised when a replica cannot be reached or returns an invalid response."""
+
+
+class MCPConnectError(MCPTransportError):
+    """Raised when the call was not sent (connection or session setup failed)."""
+
+
+class MCPToolError(RuntimeError):
+    """Raised when the MCP server reports the tool call as failed."""
+
+
+_request_ids = itertools.count(1)
+
+
+def _parse_response(response: httpx.Response) -> Dict[str, Any]:
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                message = json.loads(line[5:].strip())
+                if "result" in message or "error" in message:
+                    return message
+        raise MCPTransportError("event stream ended without a JSON-RPC response")
+    return response.json()
+
+
+def _tool_result(result: Dict[str, Any]) -> Any:
+    """Convert an MCP CallToolResult into the value returned to the framework."""
+    texts: List[str] = [
+        block.get("text", "")
+        for block in result.get("content", [])
+        if block.get("type") == "text"
+    ]
+    if not texts and result.get("structuredContent") is not None:
+        return json.dumps(result["structuredContent"], ensure_ascii=False)
+    return "\n".join(texts)
+
+
+def _request(method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": next(_request_ids),
+        "method": method,
+        "params": params,
+    }
+
+
+class MCPHttpTransport:
+    """Calls MCP tools on a given base URL."""
+
+    def __init__(self, path: str = "/mcp", headers: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.headers = {
+            "Accept": "application/json, text/event-stream",
+            "Content-Type": "application/json",
+            **(headers or {}),
+        }
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # (session id, protocol version) per endpoint, "" for stateless servers
+        self._sessions: Dict[str, Tuple[str, str]] = {}
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+
+    def _shared_client(self) -> Optional[httpx.AsyncClient]:
+        """The transport's client, None when called off the loop that owns it."""
+        loop = asyncio.get_running_loop()
+        owner = self._client_loop
+        if self._client is None or self._client.is_closed or owner.is_closed():
+            self._client = httpx.AsyncClient(headers=self.headers, timeout=None)
+            self._client_loop = owner = loop
+        return self._client if owner is loop else None
+
+    async def _post(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Mapping[str, str],
+        timeout: Optional[float],
+    ) -> httpx.Response:
+        client = self._shared_client()
+        try:
+            if client is not None:
+                return await client.post(
+                    url, json=payload, headers=dict(headers), timeout=timeout
+                )
+            async with httpx.AsyncClient(headers=self.headers) as one_off:
+                return await one_off.post(
+                    url, json=payload, headers=dict(headers), timeout=timeout
+                )
+        except CONNECT_ERRORS as e:
+            raise MCPConnectError(f"{url}: {e!r}") from e
+        except httpx.HTTPError as e:
+            raise MCPTransportError(f"{url}: {e!r}") from e
+
+    async def _initialize(
+        self, url: str, headers: Mapping[str, str], timeout: Optional[float]
+    ) -> Tuple[str, str]:
+        """MCP handshake, returns (session id, negotiated protocol version)."""
+        params = {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO,
+        }
+        try:
+            response = await self._post(
+                url, _request("initialize", params), headers, timeout
+            )
+            response.raise_for_status()
+            message = _parse_response(response)
+            if "error" in message:
+                raise MCPConnectError(f"{url}: initialize failed: {message['error']}")
+            session = response.headers.get(SESSION_HEADER, "")
+            protocol = message.get("result", {}).get(
+                "protocolVersion", PROTOCOL_VERSION
+            )
+            notify_headers = {**headers, PROTOCOL_HEADER: protocol}
+            if session:
+                notify_headers[SESSION_HEADER] = session
+            notification = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+            response = await self._post(url, notification, notify_headers, timeout)
+            response.raise_for_status()
+        except MCPConnectError:
+            raise
+        except (MCPTransportError, httpx.HTTPError, ValueError) as e:
+            # Nothing was called yet: the tool call itself was not sent
+            raise MCPConnectError(f"{url}: MCP handshake failed: {e}") from e
+        return session, protocol
+
+    async def _session(
+        self, url: str, headers: Mapping[str, str], timeout: Optional[float]
+    ) -> Tuple[str, str]:
+        session = self._sessions.get(url)
+        if session is not None:
+            return session
+        lock = self._session_locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = self._sessions[url] = await self._initialize(
+                    url, headers, timeout
+                )
+        return session
+
+    async def _send(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Mapping[str, str],
+        timeout: Optional[float],
+    ) -> Dict[str, Any]:
+        """Send a JSON-RPC request in the endpoint's session, return the response."""
+        for attempt in range(2):
+            session, protocol = await self._session(url, headers, timeout)
+            call_headers = {**headers, PROTOCOL_HEADER: protocol}
+            if session:
+                call_headers[SESSION_HEADER] = session
+            response = await self._post(url, payload, call_headers, timeout)
+            if response.status_code == 404 and session and attempt == 0:
+                # Session expired on the server, the call was not processed
+                self._sessions.pop(url, None)
+                continue
+            break
+        try:
+            response.raise_for_status()
+            return _parse_response(response)
+        except (httpx.HTTPError, ValueError) as e:
+            raise MCPTransportError(f"{payload['method']} via {url}: {e}") from e
+
+    async def call_tool(
+        self,
+        base_url: str,
+        tool: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Any:
+        url = base_url.rstrip("/") + self.path
+        payload = _request("tools/call", {"name": tool, "arguments": arguments})
+        message = await self._send(url, payload, dict(headers or {}), timeout)
+        if "error" in message:
+            raise MCPToolError(f"{tool} via {base_url}: {message['error']}")
+        result = message.get("result", {})
+        if result.get("isError"):
+            raise MCPToolError(f"{tool} failed: {_tool_result(result)}")
+        return _tool_result(result)
+
+    async def list_tools(
+        self,
+        base_url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> List[str]:
+        """Names of the tools the server lists (``tools/list``, all pages)."""
+        url = base_url.rstrip("/") + self.path
+        names: List[str] = []
+        cursor: Optional[str] = None
+        while True:
+            params = {"cursor": cursor} if cursor else {}
+            message = await self._send(
+                url, _request("tools/list", params), dict(headers or {}), timeout
+            )
+            if "error" in message:
+                raise MCPToolError(f"tools/list via {base_url}: {message['error']}")
+            result = message.get("result", {})
+            names.extend(tool["name"] for tool in result.get("tools", []))
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return names
+
+    async def aclose(self) -> None:
+        """Close the client and forget the sessions."""
+        self._sessions.clear()
+        client, self._client = self._client, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
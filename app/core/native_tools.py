@@ -0,0 +1,140 @@
+"""
+Async-Native MCP Tool Calls
+
+CrewAIToolAdapter tools are synchronous: every call blocks a thread until the
+MCP response arrives, so 50 concurrent crews hold (at least) 50 threads just
+waiting on the network. With MCP_NATIVE_TOOL_CALLS the innermost tool pipeline
+middleware sends the call itself as an async ``tools/call`` request from the
+service event loop (app.core.mcp_transport) and the adapter's tool is not run:
+
+    crew thread --tool.run()--> pipeline on the service loop --> async HTTP call
+
+Calls use the MCP session of the server's registry pool (``initialize``
+handshake, app.core.mcp_registry) and send the server's API key in its
+``api_key_header``. A call falls back to the
+adapter's tool, on the pipeline's bounded thread pool (TOOL_THREAD_POOL_SIZE),
+only when it was never sent (connection or handshake failure) and the tool is
+listed in MCP_IDEMPOTENT_TOOLS. Timeouts and errors after sending are raised:
+a write such as ``create_content_section`` may already have been committed.
+
+A server whose connection or handshake fails NATIVE_MAX_FAILURES times in a
+row uses the adapter for the rest of the process lifetime. Tool errors
+reported by the server do not count.
+
+Native calls are off by default. Skipping the adapter's tool also skips its
+side effects: content tools no longer save the IDs they create to the task
+context (``structured_content_overview_id`` etc.), so agents relying on that
+must take the IDs from the tool results before enabling it.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, Optional, Set
+
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+from app.core.mcp_config import MCPServerConfig
+from app.core.mcp_registry import ServerPool, registry
+from app.core.mcp_transport import MCPConnectError
+from app.core.tool_pipeline import ToolCall, ToolHandler
+from app.core.tool_pipeline import pipeline as tool_pipeline
+
+# Consecutive connection failures before a server falls back to the adapter
+NATIVE_MAX_FAILURES = 3
+
+
+class NativeToolCallMiddleware:
+    """Tool pipeline middleware: calls MCP tools over the async HTTP transport."""
+
+    def __init__(self, idempotent_tools: Iterable[str] = ()) -> None:
+        self.idempotent_tools = frozenset(idempotent_tools)
+        self._failures: Dict[str, int] = {}
+        self.disabled: Set[str] = set()
+        self.stats = {"native": 0, "adapter": 0, "fallbacks": 0}
+        self._lock = threading.Lock()
+
+    def _pool(self, call: ToolCall) -> Optional[ServerPool]:
+        pool = registry.pool(call.server) if call.server else None
+        if pool is None or pool.closed:
+            return None
+        return None if pool.server.url in self.disabled else pool
+
+    def sends(self, call: ToolCall) -> bool:
+        """Whether the call is sent natively (it may still fall back if not sent)."""
+        return self._pool(call) is not None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _failed(self, server: MCPServerConfig, error: Exception) -> None:
+        with self._lock:
+            failures = self._failures.get(server.url, 0) + 1
+            self._failures[server.url] = failures
+            if failures >= NATIVE_MAX_FAILURES:
+                self.disabled.add(server.url)
+        if failures >= NATIVE_MAX_FAILURES:
+            logger.warning(
+                f"Native MCP calls to {server.name} failed {failures} times "
+                f"({error}), using the adapter's client from now on"
+            )
+
+    async def __call__(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        pool = self._pool(call)
+        if pool is None:
+            self._count("adapter")
+            return await call_next(call)
+
+        server = pool.server
+        try:
+            result = await pool.transport.call_tool(
+                server.url,
+                call.tool,
+                call.arguments,
+                call.metadata.get("timeout"),
+                headers=server.auth_headers(),
+            )
+        except MCPConnectError as e:
+            self._failed(server, e)
+            if call.tool not in self.idempotent_tools:
+                raise
+            # Not sent: safe to send again through the adapter's client
+            self._count("fallbacks")
+            logger.debug(f"Native call of {call.tool} not sent, using the adapter: {e}")
+            return await call_next(call)
+        with self._lock:
+            self._failures.pop(server.url, None)
+        self._count("native")
+        call.metadata["native"] = True
+        return result
+
+
+# Global middleware (None when MCP_NATIVE_TOOL_CALLS is off)
+native_calls: Optional[NativeToolCallMiddleware] = None
+
+
+def configure(
+    enabled: bool, idempotent_tools: Iterable[str] = ()
+) -> Optional[NativeToolCallMiddleware]:
+    """Create the native call middleware (None when disabled)."""
+    global native_calls
+    native_calls = NativeToolCallMiddleware(idempotent_tools) if enabled else None
+    return native_calls
+
+
+router = APIRouter()
+
+
+@router.get("/tool-calls")
+async def tool_call_stats() -> Dict[str, Any]:
+    stats = {"thread_pool": tool_pipeline.bridge.stats()}
+    if native_calls is None:
+        return {"native_enabled": False, **stats}
+    return {
+        "native_enabled": True,
+        "stats": dict(native_calls.stats),
+        "native_disabled_servers": sorted(native_calls.disabled),
+        **stats,
+    }
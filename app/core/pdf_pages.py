@@ -0,0 +1,440 @@
+"""
+Lazy PDF Page Access
+
+Agents that only need a few pages (e.g. the abstract) should not pull the
+whole document into the LLM context. A PdfDocument is a per-task handle to one
+PDF whose pages are fetched through the ``get_pdf_pages`` MCP tool on first
+use and kept in a memory-mapped page store until the task ends:
+
+    with open_pdf(self.adapter) as document:
+        tools = document_tools(self.adapter, document) + get_tools(self.adapter, [...])
+        ...
+
+``document_tools`` gives the agent two tools in place of ``get_pdf_pages``:
+
+- ``get_pdf_outline``: page count and detected section headings per page
+- ``read_pdf_pages``: text of a page range (capped at READ_MAX_PAGES pages)
+
+When the server's ``get_pdf_pages`` accepts a page range (``start_page`` /
+``end_page``, ``page_start`` / ``page_end``, or ``pages``), only the requested
+pages are fetched; otherwise the document is fetched once and served from the
+store. The outline then only reads the first OUTLINE_SCAN_PAGES pages: it lists
+the headings of the pages read so far and grows as the agent reads further
+pages. Code can also read ``document.pages(start, end)`` directly or stream
+page-aligned text with ``document.iter_chunks(max_chars)`` (whole document).
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import re
+import tempfile
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from oxsci_shared_core.logging import logger
+
+from app.core.tool_pipeline import (
+    get_tools,
+    invoke_tool,
+    result_payload,
+    tool_parameters,
+)
+from app.core.tool_pipeline import pipeline as tool_pipeline
+from app.core.tool_results import JsonArrayStream, result_text
+
+PDF_PAGES_TOOL = "get_pdf_pages"
+# Most pages a single read_pdf_pages call returns
+READ_MAX_PAGES = 5
+# Pages read for the outline when the tool reads page ranges
+OUTLINE_SCAN_PAGES = 3
+# Page-range parameter names supported by get_pdf_pages implementations
+RANGE_PARAMETERS = (("start_page", "end_page"), ("page_start", "page_end"))
+PAGES_PARAMETER = "pages"
+# Fields holding the pages of a get_pdf_pages result
+PAGE_FIELDS = ("pages", "content", "text")
+
+SECTION_NAMES = frozenset(
+    {
+        "abstract",
+        "introduction",
+        "background",
+        "related work",
+        "methods",
+        "materials and methods",
+        "methodology",
+        "results",
+        "discussion",
+        "conclusion",
+        "conclusions",
+        "acknowledgements",
+        "acknowledgments",
+        "references",
+        "appendix",
+    }
+)
+# "2.", "3.1", "IV." section numbers
+SECTION_NUMBER = re.compile(r"^(\d+(\.\d+)*|[IVX]+)\.?\s+")
+NUMBERED_HEADING = re.compile(r"^(\d+(\.\d+)*|[IVX]+)\.?\s+[A-Z][^.]{2,80}$")
+MAX_HEADING_CHARS = 80
+
+
+class PageStore:
+    """Page texts in an anonymous temporary file, read through mmap."""
+
+    def __init__(self) -> None:
+        self._file = tempfile.TemporaryFile(prefix="oma-pdf-")
+        self._index: Dict[int, Tuple[int, int]] = {}
+        self._size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, number: int) -> bool:
+        return number in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def numbers(self) -> List[int]:
+        with self._lock:
+            return sorted(self._index)
+
+    def put(self, number: int, text: str) -> None:
+        data = text.encode("utf-8")
+        with self._lock:
+            self._file.seek(self._size)
+            self._file.write(data)
+            self._file.flush()
+            self._index[number] = (self._size, len(data))
+            self._size += len(data)
+
+    def get(self, number: int) -> str:
+        with self._lock:
+            offset, length = self._index[number]
+            if length == 0:
+                return ""
+            if self._map is None or len(self._map) < offset + length:
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(
+                    self._file.fileno(), self._size, access=mmap.ACCESS_READ
+                )
+            # Decode straight from the mapping, without an intermediate bytes copy
+            with memoryview(self._map)[offset : offset + length] as view:
+                return str(view, "utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+            self._index.clear()
+
+
+def _text_pages(text: str) -> Iterator[str]:
+    """Pages of a plain-text extraction (separated by form feeds)."""
+    start = 0
+    while True:
+        end = text.find("\f", start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _page_items(result: Any, metadata: Dict[str, Any]) -> Iterator[Any]:
+    """Page entries of a result, decoded one at a time; other fields go to metadata."""
+    text = result_text(result)
+    if text is not None and text.lstrip().startswith("{"):
+        stream = JsonArrayStream(text, PAGE_FIELDS)
+        decoded = False
+        try:
+            for item in stream:
+                decoded = True
+                yield item
+        except ValueError:
+            if decoded:
+                raise
+            yield from _text_pages(text)
+            return
+        metadata.update(stream.metadata)
+        if stream.key is not None:
+            return
+        payload: Any = next(
+            (metadata[key] for key in PAGE_FIELDS if key in metadata), ""
+        )
+    else:
+        payload = result_payload(result)
+        if isinstance(payload, dict):
+            metadata.update(payload)
+            payload = next((payload[key] for key in PAGE_FIELDS if key in payload), "")
+    if isinstance(payload, str):
+        yield from _text_pages(payload)
+    else:
+        yield from payload or []
+
+
+def iter_pages(
+    result: Any, first_page: int = 1, metadata: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    (1-based page number, text) of a get_pdf_pages result, one page at a time.
+
+    JSON results are decoded page by page (app.core.tool_results), so a large
+    document is never held as a fully decoded payload next to the result text.
+    The result's other fields (page count) are added to ``metadata``.
+    """
+    metadata = {} if metadata is None else metadata
+    for offset, item in enumerate(_page_items(result, metadata)):
+        number = first_page + offset
+        if isinstance(item, dict):
+            number = item.get("page_number", item.get("page", number))
+            item = item.get("text", item.get("content", ""))
+        yield int(number), str(item or "")
+
+
+def page_total(metadata: Dict[str, Any]) -> Optional[int]:
+    """Page count reported in a get_pdf_pages result."""
+    for key in ("total_pages", "page_count", "num_pages"):
+        if isinstance(metadata.get(key), int):
+            return metadata[key]
+    return None
+
+
+def parse_pages(
+    result: Any, first_page: int = 1
+) -> Tuple[Dict[int, str], Optional[int]]:
+    """Page texts by 1-based page number, and the page count if reported."""
+    metadata: Dict[str, Any] = {}
+    pages = dict(iter_pages(result, first_page, metadata))
+    return pages, page_total(metadata)
+
+
+def detect_headings(text: str) -> List[str]:
+    """Section heading lines of a page (known section names and numbered headings)."""
+    headings = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or len(line) > MAX_HEADING_CHARS:
+            continue
+        name = SECTION_NUMBER.sub("", line).rstrip(":").lower()
+        if name in SECTION_NAMES or NUMBERED_HEADING.match(line):
+            headings.append(line)
+    return headings
+
+
+class PdfDocument:
+    """Lazy, page-addressable view of one PDF for the duration of a task."""
+
+    def __init__(self, tool: Any, arguments: Optional[Dict[str, Any]] = None):
+        self.tool = tool
+        self.arguments = dict(arguments or {})
+        self.store = PageStore()
+        self.page_count: Optional[int] = None
+        # Section headings per stored page, detected on the first outline() after
+        # the page was read
+        self._headings: Dict[int, List[str]] = {}
+        self._complete = False
+        parameters = tool_parameters(tool) or []
+        self._range = next(
+            (names for names in RANGE_PARAMETERS if set(names) <= set(parameters)),
+            (PAGES_PARAMETER,) if PAGES_PARAMETER in parameters else None,
+        )
+
+    @property
+    def supports_ranges(self) -> bool:
+        return self._range is not None
+
+    def _range_arguments(self, start: int, end: int) -> Dict[str, Any]:
+        if self._range is None:
+            return {}
+        if len(self._range) == 2:
+            return {self._range[0]: start, self._range[1]: end}
+        return {self._range[0]: f"{start}-{end}"}
+
+    async def _fetch(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> None:
+        ranged = self.supports_ranges and start is not None and end is not None
+        arguments = dict(self.arguments)
+        if ranged:
+            arguments.update(self._range_arguments(start, end))
+        result = await invoke_tool(self.tool, arguments)
+        # Pages go to the store as they are decoded, then the result is dropped
+        metadata: Dict[str, Any] = {}
+        fetched, last = 0, 0
+        for number, text in iter_pages(result, start if ranged else 1, metadata):
+            if number not in self.store:
+                self.store.put(number, text)
+            fetched, last = fetched + 1, max(last, number)
+        del result
+        total = page_total(metadata)
+        if total is not None:
+            self.page_count = total
+        if not ranged:
+            self._complete = True
+            self.page_count = self.page_count or last
+        logger.debug(
+            f"Fetched {fetched} PDF pages"
+            + (f" ({start}-{end})" if ranged else " (whole document)")
+        )
+
+    # No lock: without a bound service loop (scripts) CrewAI reads run on their own
+    # loops, and a concurrent duplicate fetch only stores pages that are already there
+    async def ensure_pages(self, start: int, end: int) -> None:
+        if self._complete or all(n in self.store for n in range(start, end + 1)):
+            return
+        await self._fetch(start, end)
+
+    async def ensure_all(self) -> None:
+        if not self._complete:
+            await self._fetch()
+
+    async def pages(
+        self, start: int, end: Optional[int] = None
+    ) -> List[Tuple[int, str]]:
+        """(page number, text) of the pages start..end (inclusive) that exist."""
+        end = start if end is None else end
+        if self.page_count is not None:
+            end = min(end, self.page_count)
+        if end < start:
+            return []
+        await self.ensure_pages(start, end)
+        return [
+            (n, self.store.get(n)) for n in range(start, end + 1) if n in self.store
+        ]
+
+    async def outline(self) -> Dict[str, Any]:
+        """
+        Page count and the section headings detected on each page read so far.
+
+        With page ranges only the first OUTLINE_SCAN_PAGES pages are fetched for
+        it (``scanned_pages`` then lists the pages the headings come from);
+        otherwise the whole document is.
+        """
+        if self.supports_ranges:
+            await self.pages(1, OUTLINE_SCAN_PAGES)
+        else:
+            await self.ensure_all()
+        numbers = self.store.numbers()
+        for number in numbers:
+            if number not in self._headings:
+                self._headings[number] = detect_headings(self.store.get(number))
+        outline: Dict[str, Any] = {
+            "page_count": self.page_count,
+            "sections": [
+                {"page": number, "heading": heading}
+                for number in numbers
+                for heading in self._headings[number]
+            ],
+        }
+        if not self._complete and len(numbers) != self.page_count:
+            outline["scanned_pages"] = numbers
+        return outline
+
+    async def iter_chunks(self, max_chars: int = 8000) -> AsyncIterator[str]:
+        """Document text in page-aligned chunks of up to max_chars characters."""
+        await self.ensure_all()
+        chunk: List[str] = []
+        size = 0
+        for number in range(1, (self.page_count or 0) + 1):
+            if number not in self.store:
+                continue
+            text = self.store.get(number)
+            if chunk and size + len(text) > max_chars:
+                yield "\n".join(chunk)
+                chunk, size = [], 0
+            chunk.append(text)
+            size += len(text)
+        if chunk:
+            yield "\n".join(chunk)
+
+    async def read(self, start_page: int, end_page: Optional[int] = None) -> str:
+        """Agent-facing page range read, capped at READ_MAX_PAGES pages."""
+        end_page = start_page if end_page is None else end_page
+        capped = min(end_page, start_page + READ_MAX_PAGES - 1)
+        pages = await self.pages(start_page, capped)
+        if not pages:
+            return (
+                f"No pages in range {start_page}-{end_page} "
+                f"(page count: {self.page_count})"
+            )
+        text = "\n\n".join(f"--- Page {n} ---\n{content}" for n, content in pages)
+        if capped < end_page and (self.page_count is None or capped < self.page_count):
+            text += (
+                f"\n\n[Only pages {start_page}-{capped} returned, "
+                "request further pages separately]"
+            )
+        return text
+
+    def close(self) -> None:
+        self.store.close()
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def open_pdf(adapter: Any, arguments: Optional[Dict[str, Any]] = None) -> PdfDocument:
+    """
+    Handle to the task's PDF served by the adapter's get_pdf_pages tool
+    (nothing is fetched until pages are read).
+    """
+    (tool,) = get_tools(adapter, [PDF_PAGES_TOOL])
+    return PdfDocument(tool, arguments)
+
+
+OUTLINE_DESCRIPTION = (
+    "Get the page count of the PDF and the section headings found on each page "
+    "read so far (scanned_pages, when not all pages were read). Use it to find "
+    "which pages to read; pages you read are added to the next outline."
+)
+READ_DESCRIPTION = (
+    f"Read the text of PDF pages start_page to end_page (1-based, inclusive, "
+    f"at most {READ_MAX_PAGES} pages per call)."
+)
+
+
+def document_tools(adapter: Any, document: PdfDocument) -> List[Any]:
+    """get_pdf_outline and read_pdf_pages tools for the adapter's framework."""
+
+    async def get_pdf_outline() -> str:
+        return json.dumps(await document.outline(), ensure_ascii=False)
+
+    async def read_pdf_pages(start_page: int, end_page: int) -> str:
+        return await document.read(start_page, end_page)
+
+    if "LangGraph" in type(adapter).__name__:
+        from langchain_core.tools import StructuredTool
+
+        return [
+            StructuredTool.from_function(
+                coroutine=get_pdf_outline,
+                name="get_pdf_outline",
+                description=OUTLINE_DESCRIPTION,
+            ),
+            StructuredTool.from_function(
+                coroutine=read_pdf_pages,
+                name="read_pdf_pages",
+                description=READ_DESCRIPTION,
+            ),
+        ]
+
+    from crewai.tools import tool
+
+    # CrewAI runs tools synchronously in the crew's worker thread: the reads run
+    # on the service loop, where the page tool is called
+    def outline_sync() -> str:
+        return tool_pipeline.bridge.run_blocking(get_pdf_outline())
+
+    def read_sync(start_page: int, end_page: int) -> str:
+        return tool_pipeline.bridge.run_blocking(read_pdf_pages(start_page, end_page))
+
+    outline_sync.__doc__ = OUTLINE_DESCRIPTION
+    read_sync.__doc__ = READ_DESCRIPTION
+    return [tool("get_pdf_outline")(outline_sync), tool("read_pdf_pages")(read_sync)]
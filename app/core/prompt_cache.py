@@ -0,0 +1,266 @@
+"""
+Prompt Prefix Caching
+
+Agents resend the same long instructions (system prompt / backstory, task
+prompt) on every turn of a tool loop. Providers with prompt caching bill a
+cached prefix at a fraction of the input price and start answering sooner:
+
+- OpenAI, DeepSeek, Gemini: prefixes are cached automatically, prompts only
+  need to keep their static part first
+- Anthropic (directly or via OpenRouter): needs explicit ``cache_control``
+  breakpoints, added here for models matching LLM_PROMPT_CACHE_MODELS
+
+PromptCacheMiddleware marks the system prompt and the latest message of the
+conversation (so each turn reuses everything sent before it) and records the
+prompt tokens served from the provider cache. Usage is accumulated per task:
+it is logged when the task finishes, returned in the task result under
+``metrics.llm_usage`` and aggregated per agent role at GET /llm-usage.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import copy
+import functools
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+from app.core.llm import (
+    CREWAI,
+    LLMCall,
+    LLMHandler,
+    call_usage,
+    message_list,
+    usage_field,
+)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+# Anthropic accepts at most 4 breakpoints per request
+MAX_BREAKPOINTS = 4
+
+
+@dataclass
+class LLMUsage:
+    """Prompt token usage of LLM requests."""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def add(self, other: "LLMUsage") -> None:
+        self.requests += other.requests
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = asdict(self)
+        data["cache_hit_ratio"] = (
+            round(self.cached_tokens / self.prompt_tokens, 3)
+            if self.prompt_tokens
+            else 0.0
+        )
+        return data
+
+
+_current_usage: contextvars.ContextVar[Optional[LLMUsage]] = contextvars.ContextVar(
+    "oma_llm_usage", default=None
+)
+# Totals per agent role since startup
+_usage_by_role: Dict[str, LLMUsage] = {}
+_usage_lock = threading.Lock()
+
+
+def current_usage() -> Optional[LLMUsage]:
+    return _current_usage.get()
+
+
+def _record(role: str, usage: LLMUsage) -> None:
+    task_usage = current_usage()
+    with _usage_lock:
+        if task_usage is not None:
+            task_usage.add(usage)
+        _usage_by_role.setdefault(role, LLMUsage()).add(usage)
+
+
+# ============================================================================
+# Usage extraction
+# ============================================================================
+
+
+def _langchain_usage(result: Any) -> Optional[LLMUsage]:
+    """Prompt and cached tokens of a LangChain ChatResult."""
+    for generation in getattr(result, "generations", None) or []:
+        metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if metadata:
+            details = metadata.get("input_token_details") or {}
+            return LLMUsage(
+                requests=1,
+                prompt_tokens=metadata.get("input_tokens") or 0,
+                cached_tokens=details.get("cache_read") or 0,
+                cache_write_tokens=details.get("cache_creation") or 0,
+            )
+    usage = (getattr(result, "llm_output", None) or {}).get("token_usage")
+    if usage:
+        details = usage.get("prompt_tokens_details") or {}
+        return LLMUsage(
+            requests=1,
+            prompt_tokens=usage.get("prompt_tokens") or 0,
+            cached_tokens=details.get("cached_tokens") or 0,
+        )
+    return None
+
+
+def _crewai_usage(usage: Any) -> LLMUsage:
+    """Usage of one provider response, as passed to CrewAI's usage tracking."""
+    details = (
+        usage.get("prompt_tokens_details")
+        if isinstance(usage, dict)
+        else getattr(usage, "prompt_tokens_details", None)
+    )
+    return LLMUsage(
+        prompt_tokens=usage_field(
+            usage, "prompt_tokens", "input_tokens", "prompt_token_count"
+        ),
+        cached_tokens=usage_field(
+            usage, "cached_tokens", "cached_prompt_tokens", "cache_read_input_tokens"
+        )
+        or usage_field(details or {}, "cached_tokens"),
+        cache_write_tokens=usage_field(usage, "cache_creation_input_tokens"),
+    )
+
+
+# ============================================================================
+# Cache breakpoints
+# ============================================================================
+
+
+def _content(message: Any) -> Any:
+    if isinstance(message, dict):
+        return message.get("content")
+    return getattr(message, "content", None)
+
+
+def _has_breakpoint(message: Any) -> bool:
+    content = _content(message)
+    return isinstance(content, list) and any(
+        isinstance(block, dict) and "cache_control" in block for block in content
+    )
+
+
+def _marked(message: Any) -> Any:
+    """Copy of a message whose content ends with a cache breakpoint."""
+    content = _content(message)
+    if isinstance(content, str):
+        if not content:
+            return None
+        blocks: List[Any] = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        blocks = copy.deepcopy(content)
+    else:
+        return None
+    blocks[-1]["cache_control"] = dict(CACHE_CONTROL)
+    if isinstance(message, dict):
+        return {**message, "content": blocks}
+    # LangChain BaseMessage (pydantic)
+    return message.model_copy(update={"content": blocks})
+
+
+def _role(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("role", "")
+    return getattr(message, "type", "")
+
+
+def add_breakpoints(messages: List[Any]) -> List[Any]:
+    """
+    Messages with breakpoints after the last system prompt and the latest
+    message (the caller's list and messages are not modified).
+    """
+    if any(_has_breakpoint(m) for m in messages):
+        # The agent manages its own breakpoints
+        return messages
+    positions = [i for i, m in enumerate(messages) if _role(m) == "system"][-1:]
+    if messages and len(messages) - 1 not in positions:
+        positions.append(len(messages) - 1)
+
+    marked = list(messages)
+    for index in positions[:MAX_BREAKPOINTS]:
+        message = _marked(marked[index])
+        if message is not None:
+            marked[index] = message
+    return marked
+
+
+class PromptCacheMiddleware:
+    """LLM pipeline middleware: cache breakpoints and cached-token accounting."""
+
+    def __init__(self, models: Iterable[str] = ("anthropic", "claude")):
+        self.models = [m.lower() for m in models if m]
+
+    def needs_breakpoints(self, model: str) -> bool:
+        model = model.lower()
+        return any(pattern in model for pattern in self.models)
+
+    async def __call__(self, call: LLMCall, call_next: LLMHandler) -> Any:
+        if self.needs_breakpoints(call.model) and not isinstance(call.messages, str):
+            call.messages = add_breakpoints(message_list(call.messages))
+
+        result = await call_next(call)
+
+        usage: Optional[LLMUsage] = None
+        if call.framework == CREWAI:
+            # Only this call's responses: the LLM may serve concurrent calls
+            records = call_usage(call)
+            if records:
+                usage = LLMUsage(requests=1)
+                for record in records:
+                    usage.add(_crewai_usage(record))
+        else:
+            usage = _langchain_usage(result)
+        if usage is not None:
+            call.metadata["cached_tokens"] = usage.cached_tokens
+            _record(call.agent_role, usage)
+        return result
+
+
+def with_llm_usage(executor_class: Type[Any]) -> Type[Any]:
+    """
+    Subclass an ITaskExecutor so the LLM usage of each task is accumulated,
+    logged and returned in its result (``metrics.llm_usage``).
+    """
+    role = executor_class.agent_role
+    original_execute = executor_class.execute
+
+    @functools.wraps(original_execute)
+    async def execute(self: Any) -> Any:
+        usage = LLMUsage()
+        token = _current_usage.set(usage)
+        try:
+            result = await original_execute(self)
+        finally:
+            _current_usage.reset(token)
+        if usage.requests:
+            logger.info(
+                f"{role} LLM usage: {usage.requests} requests, "
+                f"{usage.prompt_tokens} prompt tokens ({usage.cached_tokens} cached)"
+            )
+            if isinstance(result, dict):
+                result.setdefault("metrics", {})["llm_usage"] = usage.as_dict()
+        return result
+
+    return type(executor_class.__name__, (executor_class,), {"execute": execute})
+
+
+router = APIRouter()
+
+
+@router.get("/llm-usage")
+async def llm_usage_stats() -> Dict[str, Any]:
+    with _usage_lock:
+        return {role: usage.as_dict() for role, usage in _usage_by_role.items()}
@@ -0,0 +1,201 @@
+"""
+Article Pre-Ranking
+
+Analysis agents read ``search_articles`` results and pick 5-10 articles to
+compare, calling ``get_article`` for candidates that are later rejected. The
+search results are pre-ranked by similarity to the manuscript abstract and
+only the top ARTICLE_RANKING_TOP_K candidates are passed to the agent:
+
+    with ranking_reference(abstract):
+        result = await crew_instance.kickoff_async()
+
+Texts are embedded with a local CPU model: a sentence-transformers model when
+ARTICLE_EMBEDDING_MODEL is set (``poetry add sentence-transformers``),
+otherwise a feature-hashing stand-in (hashed word unigrams and bigrams). The
+candidates are ranked by cosine similarity, vectorized with NumPy when
+installed (``poetry add numpy``) and in plain Python otherwise.
+
+A candidate's text is its title and the abstract or snippet in the search
+result; abstracts of articles already in the local article index are used
+when the search result has none. Searches outside a ranking_reference block
+are passed through unchanged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import importlib.util
+import json
+import math
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from oxsci_shared_core.logging import logger
+
+from app.core import article_index as articles
+from app.core.article_index import (
+    SEARCH_ARTICLES,
+    article_text,
+    normalize_doi,
+    search_items,
+    tokenize,
+)
+from app.core.tool_pipeline import ToolCall, ToolHandler, result_payload
+
+HASHING_DIMENSIONS = 1024
+TEXT_FIELDS = ("abstract", "snippet", "summary", "description")
+
+_reference: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "oma_ranking_reference", default=None
+)
+
+
+def numpy_available() -> bool:
+    return importlib.util.find_spec("numpy") is not None
+
+
+@contextmanager
+def ranking_reference(text: Optional[str]) -> Iterator[None]:
+    """Rank article searches of the enclosed task code against ``text``."""
+    token = _reference.set(text or None)
+    try:
+        yield
+    finally:
+        _reference.reset(token)
+
+
+class HashingEmbedder:
+    """Stand-in embedding: signed feature hashing of word unigrams and bigrams."""
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> Dict[int, float]:
+        tokens = tokenize(text)
+        counts: Dict[int, float] = {}
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            index = value % self.dimensions
+            sign = 1.0 if value >> 63 else -1.0
+            counts[index] = counts.get(index, 0.0) + sign
+        # Sublinear term frequency
+        return {
+            i: math.copysign(1 + math.log(abs(c)), c) for i, c in counts.items() if c
+        }
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dimensions
+            for index, value in self._features(text).items():
+                vector[index] = value
+            vectors.append(vector)
+        return vectors
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (loaded on first use, CPU)."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+    def embed(self, texts: Sequence[str]) -> Any:
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self.model_name, device="cpu")
+                logger.info(f"Loaded embedding model {self.model_name}")
+        return self._model.encode(list(texts), normalize_embeddings=True)
+
+
+def create_embedder(model_name: str) -> Any:
+    if model_name:
+        if importlib.util.find_spec("sentence_transformers") is not None:
+            return SentenceTransformerEmbedder(model_name)
+        logger.warning(
+            f"sentence-transformers is not installed, ranking articles with "
+            f"feature hashing instead of {model_name}"
+        )
+    return HashingEmbedder()
+
+
+def cosine_top_k(
+    query: Sequence[float], candidates: Any, k: int
+) -> List[Tuple[int, float]]:
+    """(candidate index, cosine similarity) of the k most similar candidates."""
+    if len(candidates) == 0 or k <= 0:
+        return []
+    if numpy_available():
+        import numpy as np
+
+        matrix = np.asarray(candidates, dtype=np.float32)
+        vector = np.asarray(query, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+        scores = (matrix @ vector) / np.where(norms == 0, 1.0, norms)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def norm(vector: Sequence[float]) -> float:
+        return math.sqrt(sum(x * x for x in vector)) or 1.0
+
+    query_norm = norm(query)
+    scores = [
+        sum(a * b for a, b in zip(query, candidate)) / (query_norm * norm(candidate))
+        for candidate in candidates
+    ]
+    ranked = sorted(range(len(scores)), key=lambda i: -scores[i])[:k]
+    return [(i, scores[i]) for i in ranked]
+
+
+def _candidate_text(item: Dict[str, Any]) -> str:
+    text = next((str(item[f]) for f in TEXT_FIELDS if item.get(f)), "")
+    index = articles.article_index
+    if not text and index is not None and item.get("doi"):
+        cached = index.index.get(normalize_doi(item["doi"]))
+        if cached is not None and cached[0]:
+            text = article_text(cached[1]) or ""
+    return f"{item.get('title') or ''}\n{text}"
+
+
+class PreRankingMiddleware:
+    """Tool pipeline middleware: keeps the top-k search results by similarity."""
+
+    def __init__(self, embedder: Any, top_k: int = 10):
+        self.embedder = embedder
+        self.top_k = top_k
+
+    def rank(self, reference: str, items: List[Any]) -> List[Any]:
+        """The top_k items most similar to the reference, most similar first."""
+        candidates = [item for item in items if isinstance(item, dict)]
+        if len(candidates) <= self.top_k:
+            return items
+        texts = [reference] + [_candidate_text(item) for item in candidates]
+        vectors = self.embedder.embed(texts)
+        top = cosine_top_k(vectors[0], vectors[1:], self.top_k)
+        return [{**candidates[i], "similarity": round(score, 3)} for i, score in top]
+
+    async def __call__(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        result = await call_next(call)
+        reference = _reference.get()
+        if call.tool != SEARCH_ARTICLES or not reference or self.top_k <= 0:
+            return result
+
+        payload = result_payload(result)
+        key, items = search_items(payload)
+        if len(items) <= self.top_k:
+            return result
+        # Embedding may be CPU heavy (model inference), keep the loop responsive
+        ranked = await asyncio.to_thread(self.rank, reference, items)
+        call.metadata["pre_ranked"] = f"{len(ranked)}/{len(items)}"
+        logger.debug(f"Pre-ranked {len(items)} search results, kept {len(ranked)}")
+        ranked_payload = ranked if key is None else {**payload, key: ranked}
+        return json.dumps(ranked_payload, ensure_ascii=False, default=str)
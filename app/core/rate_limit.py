@@ -0,0 +1,299 @@
+"""
+LLM Provider Rate Limiting
+
+Process-wide token buckets per provider/model shared by all agents, so bursts
+queue locally instead of turning into provider 429s and retry storms:
+
+    LLM_RATE_LIMITS='{"openrouter": {"rpm": 500, "tpm": 400000},
+                      "openrouter/openai/gpt-4o": {"rpm": 100}}'
+
+The most specific key wins (full model name, then provider prefix), and all
+models matched by the same key share its buckets: above, gpt-4o has its own
+100 rpm while every other openrouter model draws from one 500 rpm bucket.
+Limits are per pod: with OMA_WORKERS > 1 each worker process gets its share.
+
+Each request takes one request token and its estimated prompt + completion
+tokens; the estimate is corrected with the reported usage afterwards (LangChain
+results, and the provider responses of CrewAI calls). Waiting requests are
+served round-robin across agent roles, so one busy agent cannot starve the
+others. Waiters do not poll: the request at the head of the queue sleeps until
+the buckets can serve it, the others until they are granted or become the
+head. Wait times per model and agent role are reported at GET /rate-limits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Mapping, Optional
+
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+from app.core.llm import LLMCall, LLMHandler, estimate_tokens, usage_tokens
+
+# Waits longer than this are logged
+SLOW_WAIT_SECONDS = 5.0
+
+
+class TokenBucket:
+    """Refills ``per_minute`` tokens per minute up to a one-minute burst."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 when they are)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier take (positive: more was used than taken)."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+@dataclass
+class _Waiter:
+    role: str
+    tokens: int
+    # Set on the waiter's own loop when it is granted or should re-check the queue
+    event: asyncio.Event
+    loop: asyncio.AbstractEventLoop
+    granted: bool = False
+
+    def wake(self) -> None:
+        self.loop.call_soon_threadsafe(self.event.set)
+
+
+@dataclass
+class WaitStats:
+    requests: int = 0
+    waited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.requests += 1
+        if seconds > 0:
+            self.waited += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "waited": self.waited,
+            "total_wait": round(self.total_wait, 3),
+            "avg_wait": round(self.total_wait / self.requests, 3) if self.requests else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+
+class RateLimiter:
+    """Request and token buckets of one provider/model with a fair queue."""
+
+    def __init__(self, key: str, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.key = key
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        # Agent roles with waiting requests, served round-robin
+        self._rotation: Deque[str] = deque()
+        self.stats: Dict[str, WaitStats] = {}
+        # Requests come from the main loop and from worker-thread loops
+        self._lock = threading.Lock()
+
+    def _wait_time(self, waiter: _Waiter) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(waiter.tokens))
+        return wait
+
+    def _head(self) -> Optional[_Waiter]:
+        return self._queues[self._rotation[0]][0] if self._rotation else None
+
+    def _dispatch(self, caller: Optional[_Waiter] = None) -> float:
+        """
+        Grant queued requests in fair order and wake them; returns the wait until
+        the head of the queue can be served. The new head is woken to time that
+        wait (not ``caller``, which does so itself).
+        """
+        while self._rotation:
+            role = self._rotation[0]
+            queue = self._queues[role]
+            waiter = queue[0]
+            wait = self._wait_time(waiter)
+            if wait > 0:
+                if waiter is not caller:
+                    waiter.wake()
+                return wait
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(waiter.tokens)
+            waiter.granted = True
+            if waiter is not caller:
+                waiter.wake()
+            queue.popleft()
+            self._rotation.popleft()
+            if queue:
+                self._rotation.append(role)
+        return 0.0
+
+    async def acquire(self, role: str, tokens: int) -> float:
+        """Wait for capacity for one request; returns the seconds waited."""
+        waiter = _Waiter(role, tokens, asyncio.Event(), asyncio.get_running_loop())
+        start = time.monotonic()
+        with self._lock:
+            queue = self._queues.setdefault(role, deque())
+            queue.append(waiter)
+            if len(queue) == 1:
+                self._rotation.append(role)
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._dispatch(waiter)
+                    head = self._head() is waiter
+                if waiter.granted:
+                    break
+                if head:
+                    # Nobody else grants the head: sleep until the buckets refill
+                    try:
+                        await asyncio.wait_for(waiter.event.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await waiter.event.wait()
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._queues[role].remove(waiter)
+                    if not self._queues[role]:
+                        self._rotation.remove(role)
+                    # It may have been the head timing the queue's next grant
+                    self._dispatch()
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self.stats.setdefault(role, WaitStats()).record(waited)
+        if waited > SLOW_WAIT_SECONDS:
+            logger.info(f"LLM rate limit {self.key}: {role} waited {waited:.1f}s")
+        return waited
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket with the reported usage."""
+        if self.tokens is not None:
+            with self._lock:
+                self.tokens.adjust(actual - estimated)
+                # Returned tokens may serve waiting requests now
+                self._dispatch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": {role: len(q) for role, q in self._queues.items() if q},
+                "agents": {role: s.as_dict() for role, s in self.stats.items()},
+            }
+
+
+class RateLimitRegistry:
+    """Rate limiters keyed by model, built from LLM_RATE_LIMITS."""
+
+    def __init__(self) -> None:
+        self._limits: Dict[str, Mapping[str, float]] = {}
+        self._divisor = 1
+        # Limiters by matched LLM_RATE_LIMITS key: models under a provider prefix
+        # share its buckets
+        self._limiters: Dict[str, RateLimiter] = {}
+        # Matched key by model (None when no limit applies)
+        self._keys: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, limits: Mapping[str, Mapping[str, float]], divisor: int = 1) -> None:
+        """Set the limits (divided by ``divisor`` worker processes)."""
+        with self._lock:
+            self._limits = dict(limits)
+            self._divisor = max(1, divisor)
+            self._limiters.clear()
+            self._keys.clear()
+
+    def _key_for(self, model: str) -> Optional[str]:
+        """Most specific LLM_RATE_LIMITS key covering the model."""
+        parts = model.split("/")
+        for i in range(len(parts), 0, -1):
+            key = "/".join(parts[:i])
+            if self._limits.get(key):
+                return key
+        return None
+
+    def limiter_for(self, model: str) -> Optional[RateLimiter]:
+        with self._lock:
+            if model not in self._keys:
+                self._keys[model] = self._key_for(model)
+            key = self._keys[model]
+            if key is None:
+                return None
+            if key not in self._limiters:
+                limits = self._limits[key]
+                self._limiters[key] = RateLimiter(
+                    key,
+                    rpm=(limits.get("rpm") or 0) / self._divisor or None,
+                    tpm=(limits.get("tpm") or 0) / self._divisor or None,
+                )
+            return self._limiters[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            limiters: List[RateLimiter] = list(self._limiters.values())
+        return {limiter.key: limiter.snapshot() for limiter in limiters}
+
+
+# Global registry instance
+rate_limits = RateLimitRegistry()
+
+
+class RateLimitMiddleware:
+    """LLM pipeline middleware: waits for provider capacity before each request."""
+
+    def __init__(self, registry: RateLimitRegistry = rate_limits):
+        self.registry = registry
+
+    async def __call__(self, call: LLMCall, call_next: LLMHandler) -> Any:
+        limiter = self.registry.limiter_for(call.model)
+        if limiter is None:
+            return await call_next(call)
+        estimated = estimate_tokens(call)
+        call.metadata["rate_limit_wait"] = await limiter.acquire(call.agent_role, estimated)
+        result = await call_next(call)
+        actual = usage_tokens(result, call)
+        if actual is not None:
+            limiter.settle(estimated, actual)
+        return result
+
+
+router = APIRouter()
+
+
+@router.get("/rate-limits")
+async def rate_limit_stats() -> Dict[str, Any]:
+    return rate_limits.snapshot()
@@ -0,0 +1,289 @@
+"""
+MCP Call Resilience
+
+Per-server circuit breakers and hedged requests for MCP tool calls.
+
+Circuit breaker (one per MCP server, tunable per server in app/config/mcp/*.json):
+
+    "mcp-article-analysis": {
+      "circuit_breaker": {
+        "window_size": 20,        # calls kept in the rolling window
+        "min_calls": 5,           # calls required before the breaker can trip
+        "failure_rate": 0.5,      # open when >= 50% of the window failed
+        "slow_call_seconds": 15,  # calls slower than this count as slow (default: timeout / 2)
+        "slow_call_rate": 0.8,    # open when >= 80% of the window was slow
+        "open_seconds": 30,       # fast-fail period before half-open probing
+        "half_open_calls": 1      # probe calls allowed while half-open
+      }
+    }
+
+While open, calls fail immediately with CircuitOpenError instead of waiting for
+the server timeout. After open_seconds the breaker lets probe calls through
+(half-open): success closes it, failure re-opens it. Only transport errors and
+timeouts count as failures: a tool error or rejected arguments means the
+server answered. A timeout shortened by the task budget (app.core.timeouts)
+says nothing about the server and is not counted. GET /mcp-breakers reports
+the state of every server's breaker.
+
+Hedged requests (MCP_HEDGE_ENABLED): for idempotent read tools listed in
+MCP_HEDGE_TOOLS a duplicate request is sent when the first one has not answered
+after the tool's observed p95 latency; the first successful answer wins. Only
+calls sent from the event loop (native calls, direct routing, async tools) are
+hedged: the losing request of a synchronous adapter tool could not be
+cancelled and would keep its thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Any, Deque, Dict, Mapping, Optional, Sequence, Tuple
+
+import httpx
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+from app.core import native_tools
+from app.core.latency import LatencyTracker, latency_tracker
+from app.core.mcp_config import MCPServerConfig
+from app.core.mcp_registry import ServerPool, registry
+from app.core.mcp_transport import MCPTransportError
+from app.core.timeouts import ToolTimeoutError
+from app.core.tool_pipeline import ToolCall, ToolHandler
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Errors that count as a server failure (timeouts are OSErrors)
+SERVER_ERRORS = (MCPTransportError, httpx.TransportError, OSError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a server whose circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class BreakerSettings:
+    """Circuit breaker thresholds (see module docstring for the JSON keys)."""
+
+    enabled: bool = True
+    window_size: int = 20
+    min_calls: int = 5
+    failure_rate: float = 0.5
+    slow_call_seconds: Optional[float] = None
+    slow_call_rate: float = 0.8
+    open_seconds: float = 30
+    half_open_calls: int = 1
+
+    @classmethod
+    def for_server(cls, server: MCPServerConfig) -> "BreakerSettings":
+        overrides: Dict[str, Any] = dict(server.circuit_breaker)
+        overrides.setdefault("slow_call_seconds", server.timeout / 2)
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in overrides.items() if k in known})
+
+
+class CircuitBreaker:
+    """Failure-rate / slow-call-rate circuit breaker with half-open probing."""
+
+    def __init__(self, name: str, settings: BreakerSettings = BreakerSettings()):
+        self.name = name
+        self.settings = settings
+        self.state = CLOSED
+        # (failed, slow) outcome of the most recent calls
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=settings.window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        # Calls may complete on worker-thread event loops
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit breaker {self.name}: {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._probes = 0
+        if state == CLOSED:
+            self._window.clear()
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; reserves a probe slot when half-open."""
+        if not self.settings.enabled:
+            return True
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.settings.open_seconds:
+                    return False
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes >= self.settings.half_open_calls:
+                    return False
+                self._probes += 1
+            return True
+
+    def release(self) -> None:
+        """Return the probe slot of an admitted call that ended without an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record(self, success: bool, seconds: float) -> None:
+        """Record the outcome of a call that allow() admitted."""
+        if not self.settings.enabled:
+            return
+        slow_limit = self.settings.slow_call_seconds
+        slow = slow_limit is not None and seconds >= slow_limit
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED if success and not slow else OPEN)
+                return
+            self._window.append((not success, slow))
+            if len(self._window) < self.settings.min_calls:
+                return
+            total = len(self._window)
+            failure_rate = sum(1 for failed, _ in self._window if failed) / total
+            slow_rate = sum(1 for _, was_slow in self._window if was_slow) / total
+            if (
+                failure_rate >= self.settings.failure_rate
+                or slow_rate >= self.settings.slow_call_rate
+            ):
+                self._transition(OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "window": len(self._window)}
+
+
+class ResilientServerPool(ServerPool):
+    """ServerPool with a circuit breaker built from the server's config."""
+
+    def __init__(self, server: MCPServerConfig):
+        super().__init__(server)
+        self.breaker = CircuitBreaker(server.name, BreakerSettings.for_server(server))
+
+
+class ResilienceMiddleware:
+    """Tool pipeline middleware: in-flight accounting, circuit breaking and hedging."""
+
+    def __init__(
+        self,
+        hedge_tools: Sequence[str] = (),
+        hedge_percentile: float = 95,
+        hedge_min_samples: int = 20,
+        tracker: LatencyTracker = latency_tracker,
+    ):
+        self.hedge_tools = frozenset(hedge_tools)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.tracker = tracker
+
+    async def __call__(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        pool = registry.pool(call.server) if call.server else None
+        if pool is None:
+            return await self._timed(call, call_next)
+
+        breaker: Optional[CircuitBreaker] = getattr(pool, "breaker", None)
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                f"MCP server '{pool.name}' is unavailable (circuit open), "
+                f"tool '{call.tool}' not called. Try again later."
+            )
+
+        start = time.monotonic()
+        # None: no verdict on the server (cancelled)
+        success: Optional[bool] = None
+        try:
+            async with pool.acquire():
+                result = await self._timed(call, call_next)
+            success = True
+            return result
+        except ToolTimeoutError as e:
+            # A deadline cut short by the task budget is no verdict on the server
+            success = None if e.budget_capped else False
+            raise
+        except SERVER_ERRORS:
+            success = False
+            raise
+        except Exception:
+            # The server answered (tool error, invalid arguments)
+            success = True
+            raise
+        finally:
+            if breaker is not None:
+                if success is None:
+                    breaker.release()
+                else:
+                    breaker.record(success, time.monotonic() - start)
+
+    async def _timed(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        start = time.monotonic()
+        if call.tool in self.hedge_tools and self._cancellable(call):
+            result = await self._hedged(call, call_next)
+        else:
+            result = await call_next(call)
+        self.tracker.record(call.tool, time.monotonic() - start)
+        return result
+
+    @staticmethod
+    def _cancellable(call: ToolCall) -> bool:
+        """Whether the call is sent from the loop (not by a tool blocking a thread)."""
+        if not call.metadata.get("blocking"):
+            return True
+        pool = registry.pool(call.server) if call.server else None
+        if getattr(pool, "direct", False):
+            return True
+        native = native_tools.native_calls
+        return native is not None and native.sends(call)
+
+    async def _hedged(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        delay = self.tracker.percentile(
+            call.tool, self.hedge_percentile, self.hedge_min_samples
+        )
+        primary = asyncio.ensure_future(call_next(call))
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        logger.info(f"Hedging {call.tool} after {delay:.2f}s (p{self.hedge_percentile:g})")
+        call.metadata["hedged"] = True
+        pending = {primary, asyncio.ensure_future(call_next(call))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def breaker_states() -> Mapping[str, Dict[str, Any]]:
+    """Current breaker state per MCP server (for health/debug output)."""
+    return {
+        name: pool.breaker.snapshot()
+        for name, pool in registry.snapshot.pools.items()
+        if isinstance(pool, ResilientServerPool)
+    }
+
+
+router = APIRouter()
+
+
+@router.get("/mcp-breakers")
+async def mcp_breaker_stats() -> Mapping[str, Dict[str, Any]]:
+    return breaker_states()
@@ -0,0 +1,291 @@
+"""
+Priority and Deadline-Aware Task Admission
+
+Each TaskScheduler polls and starts its tasks FIFO. With
+TASK_SCHEDULING_MODE="priority" every task of this worker passes an admission
+gate before execute() runs. At most TASK_SCHEDULING_SLOTS tasks execute at
+once and waiting tasks start in order of:
+
+1. priority class: "interactive" < "normal" < "batch" (< deferred)
+2. least slack: latest possible start = deadline - estimated_total_time
+
+Priority and deadline come from the task's shared data, falling back to the
+executor's ``task_priority`` class attribute and to ``now + AgentConfig.timeout``:
+
+    {"priority": "interactive", "deadline": 1767225600}        # epoch seconds
+    {"priority": "batch", "deadline": "2026-01-01T00:00:00Z"}  # or ISO-8601
+
+A task whose explicit deadline can no longer be met (its latest start has
+passed) is shed (TASK_SHED_POLICY="shed": returns a failed result without
+running) or deferred behind all other work ("defer"). Decisions are logged and
+reported at GET /scheduling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Type
+
+from fastapi import APIRouter
+from oxsci_shared_core.logging import logger
+
+FIFO = "fifo"
+PRIORITY = "priority"
+
+# TASK_SHED_POLICY values (and the matching decisions)
+SHED = "shed"
+DEFER = "defer"
+DEFERRED = "deferred"
+
+PRIORITY_CLASSES = {"interactive": 0, "normal": 1, "batch": 2}
+DEFAULT_PRIORITY = "normal"
+# Class of tasks deferred because they cannot meet their deadline
+DEFERRED_PRIORITY = len(PRIORITY_CLASSES)
+
+DECISION_HISTORY = 200
+
+
+def parse_priority(value: Any) -> int:
+    """Priority class from a name or an integer (lower runs first)."""
+    if isinstance(value, str):
+        if value.lstrip("-").isdigit():
+            return int(value)
+        return PRIORITY_CLASSES.get(value.lower(), PRIORITY_CLASSES[DEFAULT_PRIORITY])
+    if isinstance(value, (int, float)):
+        return int(value)
+    return PRIORITY_CLASSES[DEFAULT_PRIORITY]
+
+
+def parse_deadline(value: Any) -> Optional[float]:
+    """Deadline as epoch seconds from a number or an ISO-8601 string."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        logger.warning(f"Ignoring invalid task deadline: {value!r}")
+        return None
+
+
+@dataclass(order=True)
+class Ticket:
+    """A task waiting for (or holding) an execution slot."""
+
+    priority: int
+    latest_start: float
+    seq: int
+    role: str = field(compare=False)
+    task_id: Optional[str] = field(compare=False, default=None)
+    explicit_deadline: bool = field(compare=False, default=False)
+    enqueued_at: float = field(compare=False, default_factory=time.time)
+    future: Optional[asyncio.Future] = field(compare=False, default=None, repr=False)
+
+    @property
+    def slack(self) -> float:
+        return self.latest_start - time.time()
+
+    @property
+    def feasible(self) -> bool:
+        return not self.explicit_deadline or self.slack >= 0
+
+
+@dataclass
+class Decision:
+    """One admission decision, as reported by GET /scheduling."""
+
+    timestamp: float
+    role: str
+    task_id: Optional[str]
+    decision: str  # admitted | queued | started | shed | deferred
+    priority: int
+    slack: float
+    waited: float = 0.0
+
+
+class TaskAdmission:
+    """Slot-limited admission gate ordering waiting tasks by priority and slack."""
+
+    def __init__(self, slots: int = 4, shed_policy: str = SHED):
+        self.slots = slots
+        self.shed_policy = shed_policy
+        self.running = 0
+        self._waiting: List[Ticket] = []
+        self._seq = itertools.count()
+        self.decisions: Deque[Decision] = deque(maxlen=DECISION_HISTORY)
+        self.counts: Counter = Counter()
+
+    def configure(self, slots: int, shed_policy: str = SHED) -> None:
+        self.slots = slots
+        self.shed_policy = shed_policy
+
+    def ticket(
+        self,
+        role: str,
+        priority: int,
+        deadline: Optional[float],
+        estimated_seconds: float,
+        timeout: float,
+        task_id: Optional[str] = None,
+    ) -> Ticket:
+        explicit = deadline is not None
+        if deadline is None:
+            deadline = time.time() + timeout
+        return Ticket(
+            priority=priority,
+            latest_start=deadline - estimated_seconds,
+            seq=next(self._seq),
+            role=role,
+            task_id=task_id,
+            explicit_deadline=explicit,
+        )
+
+    def _record(self, ticket: Ticket, decision: str) -> None:
+        entry = Decision(
+            timestamp=time.time(),
+            role=ticket.role,
+            task_id=ticket.task_id,
+            decision=decision,
+            priority=ticket.priority,
+            slack=round(ticket.slack, 1),
+            waited=round(time.time() - ticket.enqueued_at, 3),
+        )
+        self.decisions.append(entry)
+        self.counts[decision] += 1
+        if decision in (SHED, DEFERRED):
+            logger.warning(
+                f"Task {ticket.task_id or '?'} of {ticket.role} {decision}: "
+                f"slack {entry.slack:.1f}s, waited {entry.waited:.1f}s"
+            )
+
+    def _infeasible(self, ticket: Ticket) -> bool:
+        """Handle a ticket that cannot meet its deadline; True when it was shed."""
+        if ticket.feasible or ticket.priority == DEFERRED_PRIORITY:
+            return False
+        if self.shed_policy == SHED:
+            self._record(ticket, SHED)
+            return True
+        ticket.priority = DEFERRED_PRIORITY
+        self._record(ticket, DEFERRED)
+        return False
+
+    async def admit(self, ticket: Ticket) -> bool:
+        """Wait for an execution slot; False when the task was shed."""
+        if self._infeasible(ticket):
+            return False
+        if self.slots <= 0 or (self.running < self.slots and not self._waiting):
+            self.running += 1
+            self._record(ticket, "admitted")
+            return True
+
+        ticket.future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, ticket)
+        self._record(ticket, "queued")
+        try:
+            return await ticket.future
+        except asyncio.CancelledError:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+            elif ticket.future.done() and not ticket.future.cancelled() and ticket.future.result():
+                # Slot was handed over just before cancellation
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot and start the most urgent waiting task."""
+        self.running -= 1
+        while self._waiting and (self.slots <= 0 or self.running < self.slots):
+            ticket = heapq.heappop(self._waiting)
+            deferrable = ticket.priority != DEFERRED_PRIORITY
+            if self._infeasible(ticket):
+                ticket.future.set_result(False)
+                continue
+            if deferrable and ticket.priority == DEFERRED_PRIORITY:
+                # Deferred just now: requeue behind all other work
+                heapq.heappush(self._waiting, ticket)
+                continue
+            self.running += 1
+            self._record(ticket, "started")
+            ticket.future.set_result(True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "shed_policy": self.shed_policy,
+            "running": self.running,
+            "waiting": [
+                {
+                    "role": t.role,
+                    "task_id": t.task_id,
+                    "priority": t.priority,
+                    "slack": round(t.slack, 1),
+                }
+                for t in sorted(self._waiting)
+            ],
+            "counts": dict(self.counts),
+            "recent": [asdict(d) for d in list(self.decisions)[-50:]],
+        }
+
+
+# Global admission gate (configured in the application lifespan)
+admission = TaskAdmission()
+
+
+def _shared_data(context: Any, key: str, default: Any = None) -> Any:
+    if context is None:
+        return default
+    return context.get_shared_data(key, default)
+
+
+def with_scheduling(executor_class: Type[Any], gate: TaskAdmission = admission) -> Type[Any]:
+    """
+    Subclass an ITaskExecutor so execute() first passes the admission gate,
+    using the task's priority/deadline and the agent's estimated_total_time.
+    """
+    agent_config = executor_class.get_agent_config()
+    role = executor_class.agent_role
+    default_priority = getattr(executor_class, "task_priority", DEFAULT_PRIORITY)
+    original_execute = executor_class.execute
+
+    @functools.wraps(original_execute)
+    async def execute(self: Any) -> Any:
+        context = getattr(self, "context", None)
+        ticket = gate.ticket(
+            role=role,
+            priority=parse_priority(_shared_data(context, "priority", default_priority)),
+            deadline=parse_deadline(_shared_data(context, "deadline")),
+            estimated_seconds=agent_config.estimated_total_time or 0,
+            timeout=agent_config.timeout,
+            task_id=getattr(context, "task_id", None),
+        )
+        if not await gate.admit(ticket):
+            return {
+                "status": "error",
+                "result": {
+                    "error": "Task shed: it cannot finish before its deadline",
+                    "agent_role": role,
+                },
+            }
+        try:
+            return await original_execute(self)
+        finally:
+            gate.release()
+
+    return type(executor_class.__name__, (executor_class,), {"execute": execute})
+
+
+router = APIRouter()
+
+
+@router.get("/scheduling")
+async def scheduling_stats() -> Dict[str, Any]:
+    return admission.stats()
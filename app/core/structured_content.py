@@ -0,0 +1,234 @@
+"""
+Hybrid Structured Content Pipeline
+
+The parser agents always make the same tool calls: create_content_overview,
+create_content_section for each section, then complete_content_overview. In
+an agent loop the LLM spends 5-20 turns deciding on that fixed sequence.
+In hybrid mode the sequence runs as plain async code and the LLM is called
+only to write the content of each section:
+
+    pipeline = StructuredContentPipeline(self.adapter, self.llm, self.context)
+    with open_pdf(self.adapter) as document:
+        result = await pipeline.run(document, [ABSTRACT])
+
+For each section, the pipeline:
+1. finds the section's pages from the document outline (heading heuristics)
+2. reads only those pages
+3. makes one LLM call that returns the section title and content
+4. creates the section through the MCP tools
+
+Tool arguments are built from the values below and filtered by the tool's
+argument schema, so servers that take IDs from the task context keep working:
+file_id, structured_content_overview_id / overview_id, section_type, title,
+content, order.
+
+Agents choose the mode with PARSER_EXECUTION_MODE ("agent" | "hybrid"),
+which a task can override with the ``execution_mode`` shared data field.
+
+Batches: in agent mode the content tools save the overview ID to the task
+context, which all documents of a batch share, so agent-mode documents run
+one at a time (``document_concurrency``). Hybrid documents take the overview
+ID from the tool result only and run concurrently.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from oxsci_shared_core.logging import logger
+
+from app.core.batch import batch_concurrency
+from app.core.config import config
+from app.core.llm import complete
+from app.core.pdf_pages import SECTION_NUMBER, PdfDocument
+from app.core.tool_pipeline import get_tools, invoke_tool, tool_arguments
+
+AGENT = "agent"
+HYBRID = "hybrid"
+
+CREATE_OVERVIEW = "create_content_overview"
+CREATE_SECTION = "create_content_section"
+COMPLETE_OVERVIEW = "complete_content_overview"
+CONTENT_TOOLS = (CREATE_OVERVIEW, CREATE_SECTION, COMPLETE_OVERVIEW)
+
+OVERVIEW_ID_KEYS = ("structured_content_overview_id", "overview_id", "id")
+# Upper bound of page text sent to the LLM for one section
+MAX_SECTION_CHARS = 24000
+
+SYSTEM_PROMPT = (
+    "You extract sections from academic papers. Answer with a JSON object "
+    'with the keys "title" and "content" and nothing else.'
+)
+
+
+@dataclass
+class SectionSpec:
+    """A section the pipeline creates and how to find and write it."""
+
+    section_type: str
+    headings: Tuple[str, ...]
+    instructions: str
+    # Pages to read when no heading matches
+    fallback_pages: Tuple[int, int] = (1, 2)
+    max_pages: int = 3
+
+
+ABSTRACT = SectionSpec(
+    section_type="abstract",
+    headings=("abstract", "summary"),
+    instructions=(
+        "Extract the abstract of the paper verbatim (without the heading). "
+        "Use the paper title as title."
+    ),
+)
+
+
+@dataclass
+class PipelineResult:
+    overview_id: Optional[str]
+    sections: List[Dict[str, Any]] = field(default_factory=list)
+    llm_calls: int = 0
+
+
+def execution_mode(context: Any, default: str) -> str:
+    """The task's execution mode (shared data ``execution_mode`` or the default)."""
+    mode = context.get_shared_data("execution_mode", None) if context else None
+    return (mode or default).lower()
+
+
+def document_concurrency(context: Any) -> int:
+    """
+    Batch documents processed at once: agent-mode documents share the task
+    context the content tools write the overview ID to, so they run one at a
+    time.
+    """
+    if execution_mode(context, config.PARSER_EXECUTION_MODE) == HYBRID:
+        return batch_concurrency(context)
+    return 1
+
+
+def _normalize(heading: str) -> str:
+    return SECTION_NUMBER.sub("", heading).rstrip(":").lower()
+
+
+def section_pages(outline: Dict[str, Any], spec: SectionSpec) -> Tuple[int, int]:
+    """First and last page of a section from the document outline."""
+    sections = outline.get("sections") or []
+    page_count = outline.get("page_count") or spec.fallback_pages[1]
+    for index, entry in enumerate(sections):
+        if _normalize(entry["heading"]) in spec.headings:
+            start = entry["page"]
+            following = [s["page"] for s in sections[index + 1 :]]
+            end = following[0] if following else start
+            return start, min(end, start + spec.max_pages - 1, page_count)
+    return spec.fallback_pages[0], min(spec.fallback_pages[1], page_count)
+
+
+def json_object(text: str) -> Optional[Dict[str, Any]]:
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        value = json.loads(match.group(0))
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _overview_id(result: Any, context: Any) -> Optional[str]:
+    payload = result
+    if isinstance(payload, str):
+        payload = json_object(payload) or {}
+    if isinstance(payload, dict):
+        for key in OVERVIEW_ID_KEYS:
+            if payload.get(key):
+                return str(payload[key])
+    if context is None:
+        return None
+    # Content tools save the ID to the task context
+    return context.get_shared_data("structured_content_overview_id", None)
+
+
+class StructuredContentPipeline:
+    """Fixed create-overview / create-sections / complete sequence in code."""
+
+    def __init__(self, adapter: Any, llm: Any, context: Any):
+        self.llm = llm
+        self.context = context
+        self.tools = dict(zip(CONTENT_TOOLS, get_tools(adapter, CONTENT_TOOLS)))
+
+    async def _call(self, tool_name: str, **values: Any) -> Any:
+        tool = self.tools[tool_name]
+        return await invoke_tool(tool, tool_arguments(tool, values))
+
+    async def write_section(
+        self, document: PdfDocument, outline: Dict[str, Any], spec: SectionSpec
+    ) -> Dict[str, Any]:
+        """Read a section's pages and let the LLM write its title and content."""
+        start, end = section_pages(outline, spec)
+        pages = await document.pages(start, end)
+        text = "\n\n".join(content for _, content in pages)[:MAX_SECTION_CHARS]
+        answer = await complete(
+            self.llm,
+            f"{spec.instructions}\n\nPages {start}-{end} of the paper:\n\n{text}",
+            system=SYSTEM_PROMPT,
+        )
+        data = json_object(answer) or {"title": spec.section_type, "content": answer}
+        return {
+            "section_type": spec.section_type,
+            "title": str(data.get("title") or spec.section_type),
+            "content": str(data.get("content") or ""),
+            "pages": [start, end],
+        }
+
+    async def run(
+        self,
+        document: PdfDocument,
+        sections: Sequence[SectionSpec],
+        file_id: Optional[str] = None,
+    ) -> PipelineResult:
+        """
+        Create the structured content of one document. ``file_id`` defaults to
+        the task's; batch documents pass their own, and their overview ID is
+        then only taken from the tool result (the task context is shared): a
+        result without one fails the document.
+        """
+        context = None if file_id else self.context
+        if context is not None:
+            file_id = context.get_shared_data("file_id", None)
+        outline = await document.outline()
+        # Sections are written first, so a failed LLM call leaves no open overview
+        written = [
+            await self.write_section(document, outline, spec) for spec in sections
+        ]
+
+        created = await self._call(CREATE_OVERVIEW, file_id=file_id)
+        overview_id = _overview_id(created, context)
+        if overview_id is None and context is None:
+            # Without an ID the section tools would fall back to the shared context
+            raise RuntimeError(
+                f"{CREATE_OVERVIEW} returned no overview ID for {file_id}"
+            )
+        ids = {
+            "structured_content_overview_id": overview_id,
+            "overview_id": overview_id,
+        }
+        for order, section in enumerate(written, start=1):
+            await self._call(
+                CREATE_SECTION,
+                **ids,
+                section_type=section["section_type"],
+                title=section["title"],
+                content=section["content"],
+                order=order,
+            )
+        await self._call(COMPLETE_OVERVIEW, **ids)
+
+        logger.info(
+            f"Structured content {overview_id}: {len(written)} sections, "
+            f"{len(written)} LLM calls"
+        )
+        return PipelineResult(overview_id, written, llm_calls=len(written))
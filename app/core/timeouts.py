@@ -0,0 +1,185 @@
+"""
+Adaptive Tool Timeouts
+
+Per-call deadlines for MCP tools derived from observed latency instead of the
+static per-server ``timeout``:
+
+    timeout = clamp(p99(tool) * TOOL_TIMEOUT_FACTOR, TOOL_TIMEOUT_MIN, server.timeout)
+
+Until a tool has TOOL_TIMEOUT_MIN_SAMPLES samples the server timeout is used.
+
+The deadline is also passed on in ``call.metadata["timeout"]``: native calls
+and direct routing send it as the HTTP timeout, so the request itself ends.
+A synchronous adapter tool runs in a pool thread that cannot be interrupted:
+on timeout the caller gets ToolTimeoutError, but the thread keeps running (and
+keeps its TOOL_THREAD_POOL_SIZE slot) until the adapter's MCP client returns,
+at the latest after the server timeout. ``GET /tool-calls`` reports these
+threads as ``abandoned_threads``.
+
+Each task additionally runs under a TaskBudget built from its AgentConfig: the
+agent ``timeout`` is the total budget and ``estimated_tools_cnt`` the expected
+number of steps. A single call never gets more than the remaining budget, nor
+more than TOOL_BUDGET_SLACK times its fair share of it (remaining time divided
+by the remaining steps). Batch tasks (app.core.batch) get the budget of all
+their documents.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Type
+
+from oxsci_shared_core.logging import logger
+
+from app.core.batch import batch_concurrency, budget_scale
+from app.core.latency import LatencyTracker, latency_tracker
+from app.core.mcp_registry import registry
+from app.core.tool_pipeline import ToolCall, ToolHandler
+
+
+class ToolTimeoutError(TimeoutError):
+    """Raised when a tool call exceeds its adaptive deadline."""
+
+    def __init__(self, message: str, budget_capped: bool = False):
+        super().__init__(message)
+        # The deadline was cut short by the task budget, not the tool's latency
+        self.budget_capped = budget_capped
+
+
+class TaskBudget:
+    """Time budget of one task, split across its remaining steps."""
+
+    def __init__(self, total_seconds: float, expected_steps: int = 1):
+        self.total_seconds = total_seconds
+        self.expected_steps = max(1, expected_steps)
+        self.started_at = time.monotonic()
+        self.steps_taken = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.total_seconds - (time.monotonic() - self.started_at))
+
+    @property
+    def remaining_steps(self) -> int:
+        # The agent may take more steps than estimated, always leave one
+        return max(1, self.expected_steps - self.steps_taken)
+
+    def fair_share(self) -> float:
+        return self.remaining / self.remaining_steps
+
+    def step(self) -> None:
+        with self._lock:
+            self.steps_taken += 1
+
+
+_current_budget: contextvars.ContextVar[Optional[TaskBudget]] = contextvars.ContextVar(
+    "oma_task_budget", default=None
+)
+
+
+def current_budget() -> Optional[TaskBudget]:
+    return _current_budget.get()
+
+
+def remaining_budget(default: float) -> float:
+    """Remaining seconds of the current task budget, or default outside a task."""
+    budget = current_budget()
+    return budget.remaining if budget is not None else default
+
+
+@contextmanager
+def task_budget(total_seconds: float, expected_steps: int = 1) -> Iterator[TaskBudget]:
+    """Run the enclosed task code under a TaskBudget."""
+    budget = TaskBudget(total_seconds, expected_steps)
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+def with_task_budget(executor_class: Type[Any]) -> Type[Any]:
+    """
+    Subclass an ITaskExecutor so execute() runs under a TaskBudget built from
+    its AgentConfig (timeout, estimated_tools_cnt).
+    """
+    agent_config = executor_class.get_agent_config()
+    original_execute = executor_class.execute
+    concurrency = getattr(executor_class, "document_concurrency", batch_concurrency)
+
+    @functools.wraps(original_execute)
+    async def execute(self: Any) -> Any:
+        rounds, documents = budget_scale(getattr(self, "context", None), concurrency)
+        with task_budget(
+            agent_config.timeout * rounds,
+            (agent_config.estimated_tools_cnt or 1) * documents,
+        ):
+            return await original_execute(self)
+
+    return type(executor_class.__name__, (executor_class,), {"execute": execute})
+
+
+class AdaptiveTimeoutMiddleware:
+    """Tool pipeline middleware enforcing latency-derived per-call deadlines."""
+
+    def __init__(
+        self,
+        factor: float = 3.0,
+        min_timeout: float = 1.0,
+        min_samples: int = 20,
+        budget_slack: float = 3.0,
+        default_timeout: float = 60.0,
+        tracker: LatencyTracker = latency_tracker,
+    ):
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.min_samples = min_samples
+        self.budget_slack = budget_slack
+        self.default_timeout = default_timeout
+        self.tracker = tracker
+
+    def latency_timeout(self, call: ToolCall) -> float:
+        """Deadline in seconds for one call of a tool, from its latency alone."""
+        pool = registry.pool(call.server) if call.server else None
+        cap = pool.server.timeout if pool is not None else self.default_timeout
+        p99 = self.tracker.percentile(call.tool, 99, self.min_samples)
+        if p99 is None:
+            return cap
+        return min(cap, max(self.min_timeout, p99 * self.factor))
+
+    def timeout_for(self, call: ToolCall) -> float:
+        """Deadline in seconds for one call of a tool."""
+        timeout = self.latency_timeout(call)
+        budget = current_budget()
+        if budget is not None:
+            timeout = min(timeout, budget.fair_share() * self.budget_slack, budget.remaining)
+        return max(timeout, 0.0)
+
+    async def __call__(self, call: ToolCall, call_next: ToolHandler) -> Any:
+        latency_timeout = self.latency_timeout(call)
+        timeout = self.timeout_for(call)
+        budget = current_budget()
+        # A hedged call passes here once per request copy: charge it one step
+        if budget is not None and not call.metadata.get("budget_step"):
+            budget.step()
+            call.metadata["budget_step"] = True
+        call.metadata["timeout"] = timeout
+        call.metadata["deadline"] = time.monotonic() + timeout
+        # A deadline cut short by the task budget says nothing about the server
+        call.metadata["budget_capped"] = timeout < latency_timeout
+        try:
+            return await asyncio.wait_for(call_next(call), timeout)
+        except asyncio.TimeoutError:
+            # Record the censored sample so the learned deadline can grow again
+            self.tracker.record(call.tool, timeout)
+            logger.warning(f"Tool {call.tool} timed out after {timeout:.1f}s")
+            raise ToolTimeoutError(
+                f"Tool '{call.tool}' did not answer within {timeout:.1f}s",
+                budget_capped=call.metadata["budget_capped"],
+            ) from None
@@ -0,0 +1,190 @@
+"""
+MCP Tool Call Pipeline
+
+Framework tools returned by an adapter (CrewAIToolAdapter, LangGraphAdapter)
+are wrapped so every invocation runs through a chain of middlewares before the
+original tool is called:
+
+    tools = get_tools(self.adapter, ["get_pdf_pages", "create_content_overview"])
+
+A middleware is an async callable ``(call, call_next) -> result``. It may
+inspect or modify the ToolCall, short-circuit with its own result, or await
+``call_next(call)`` to continue down the chain. Middlewares are registered
+once at startup with ``pipeline.use(...)``.
+
+CrewAI calls tools synchronously from its crew threads. Once the pipeline's
+bridge is bound to the service event loop (``pipeline.bridge.bind(...)``,
+app.core.loop_bridge), those calls run their middlewares on that loop instead
+of a new loop per call, and tools without an async implementation run on one
+bounded thread pool shared by all crews.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from oxsci_shared_core.logging import logger
+
+from app.core.loop_bridge import LoopBridge
+from app.core.mcp_registry import registry
+
+# Framework-injected keyword arguments that are not tool arguments
+_PASSTHROUGH_KWARGS = ("config", "run_manager", "callbacks")
+
+
+@dataclass
+class ToolCall:
+    """One MCP tool invocation flowing through the pipeline."""
+
+    tool: str
+    arguments: Dict[str, Any]
+    server: Optional[str] = None
+    # "blocking": the terminal runs the adapter's synchronous tool in a thread
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+ToolHandler = Callable[[ToolCall], Awaitable[Any]]
+ToolMiddleware = Callable[[ToolCall, ToolHandler], Awaitable[Any]]
+
+
+class ToolPipeline:
+    """Ordered middleware chain applied to wrapped tools."""
+
+    def __init__(self) -> None:
+        self._middlewares: List[ToolMiddleware] = []
+        # Service loop for synchronous tool calls, bounded pool for blocking tools
+        self.bridge = LoopBridge("oma-tool")
+
+    def use(self, middleware: ToolMiddleware) -> None:
+        """Append a middleware (first registered runs outermost)."""
+        self._middlewares.append(middleware)
+
+    def clear(self) -> None:
+        self._middlewares.clear()
+
+    async def run(self, call: ToolCall, terminal: ToolHandler) -> Any:
+        """Run a call through all middlewares and finally the terminal handler."""
+        handler = terminal
+        for middleware in reversed(self._middlewares):
+            handler = functools.partial(middleware, call_next=handler)
+        return await handler(call)
+
+    def wrap(self, tool: Any) -> Any:
+        """Route a framework tool's _run/_arun through the pipeline (in place)."""
+        if getattr(tool, "_oma_pipeline", False):
+            return tool
+        name = getattr(tool, "name", type(tool).__name__)
+        orig_run = getattr(tool, "_run", None)
+        orig_arun = getattr(tool, "_arun", None)
+
+        def _split(kwargs: Dict[str, Any]):
+            passthrough = {k: v for k, v in kwargs.items() if k in _PASSTHROUGH_KWARGS}
+            arguments = {k: v for k, v in kwargs.items() if k not in _PASSTHROUGH_KWARGS}
+            return passthrough, arguments
+
+        def _new_call(arguments: Dict[str, Any], blocking: bool) -> ToolCall:
+            return ToolCall(
+                tool=name,
+                arguments=arguments,
+                server=registry.server_for_tool(name),
+                metadata={"blocking": blocking},
+            )
+
+        async def _arun(*args: Any, **kwargs: Any) -> Any:
+            passthrough, arguments = _split(kwargs)
+
+            async def terminal(call: ToolCall) -> Any:
+                if orig_arun is not None:
+                    return await orig_arun(*args, **passthrough, **call.arguments)
+                return await self.bridge.run_sync(
+                    functools.partial(orig_run, *args, **passthrough, **call.arguments)
+                )
+
+            return await self.run(
+                _new_call(arguments, blocking=orig_arun is None), terminal
+            )
+
+        def _run(*args: Any, **kwargs: Any) -> Any:
+            passthrough, arguments = _split(kwargs)
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                # Called synchronously from inside an event loop: cannot block on the
+                # pipeline here, call the tool directly
+                logger.debug(f"Tool {name} called synchronously on a running loop")
+                return orig_run(*args, **kwargs)
+
+            async def terminal(call: ToolCall) -> Any:
+                return await self.bridge.run_sync(
+                    functools.partial(orig_run, *args, **passthrough, **call.arguments)
+                )
+
+            return self.bridge.run_blocking(
+                self.run(_new_call(arguments, blocking=True), terminal)
+            )
+
+        # Tools are pydantic models, bypass their __setattr__ validation
+        if orig_run is not None:
+            object.__setattr__(tool, "_run", _run)
+        if orig_arun is not None or orig_run is not None:
+            object.__setattr__(tool, "_arun", _arun)
+        object.__setattr__(tool, "_oma_pipeline", True)
+        return tool
+
+
+# Global pipeline instance
+pipeline = ToolPipeline()
+
+
+def get_tools(adapter: Any, names: Sequence[str]) -> List[Any]:
+    """Get framework tools from an adapter, wrapped with the tool pipeline."""
+    return [pipeline.wrap(tool) for tool in adapter.get_tools(list(names))]
+
+
+def tool_parameters(tool: Any) -> Optional[List[str]]:
+    """Argument names of a framework tool (None when its schema is unknown)."""
+    schema = getattr(tool, "args_schema", None)
+    fields = getattr(schema, "model_fields", None)
+    if fields is None and isinstance(schema, dict):
+        fields = schema.get("properties")
+    return list(fields) if fields is not None else None
+
+
+def tool_arguments(tool: Any, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Values the tool accepts (all non-None values when its schema is unknown)."""
+    parameters = tool_parameters(tool)
+    values = {k: v for k, v in values.items() if v is not None}
+    if parameters is None:
+        return values
+    return {k: v for k, v in values.items() if k in parameters}
+
+
+def result_payload(result: Any) -> Any:
+    """Unwrap MCP content blocks and JSON text of a tool result."""
+    if isinstance(result, list) and result and all(
+        isinstance(block, dict) and "text" in block for block in result
+    ):
+        result = "".join(block["text"] for block in result)
+    if isinstance(result, str):
+        try:
+            return json.loads(result)
+        except ValueError:
+            return result
+    return result
+
+
+async def invoke_tool(tool: Any, arguments: Dict[str, Any]) -> Any:
+    """Call a framework tool from agent code (outside the LLM loop)."""
+    if hasattr(tool, "ainvoke"):
+        return await tool.ainvoke(arguments)
+    if getattr(tool, "_oma_pipeline", False):
+        # Wrapped CrewAI tools: run the pipeline on this loop
+        return await tool._arun(**arguments)
+    # Other CrewAI tools are synchronous: run outside the loop
+    return await pipeline.bridge.run_sync(functools.partial(tool.run, **arguments))
@@ -0,0 +1,92 @@
+"""
+Streaming Tool Result Decoding
+
+Large tool results (``get_pdf_pages`` text, ``get_article`` bodies) arrive from
+the adapters as one string. Decoding them with ``json.loads`` builds a second
+full copy as Python objects before agent code can store or slice anything, so
+concurrent large-document parses hold every document twice.
+
+JsonArrayStream decodes the elements of one array field of a JSON object one
+at a time, straight from the result string:
+
+    stream = JsonArrayStream(text, ("pages",))
+    for page in stream:
+        store.put(page["page_number"], page["text"])   # one page decoded at a time
+    total = stream.metadata.get("total_pages")
+
+Only one element is materialized at a time; the other (small) fields of the
+object are collected in ``stream.metadata``. ``result_text`` returns the text
+of a result without joining when it is a single MCP content block.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_decoder = json.JSONDecoder()
+
+
+def result_text(result: Any) -> Optional[str]:
+    """Text of a tool result (a string or MCP text blocks), None otherwise."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, list) and result and all(
+        isinstance(block, dict) and "text" in block for block in result
+    ):
+        if len(result) == 1:
+            return result[0]["text"]
+        return "".join(block["text"] for block in result)
+    return None
+
+
+class JsonArrayStream:
+    """Elements of one array field of a JSON object, decoded one at a time."""
+
+    def __init__(self, text: str, keys: Sequence[str]):
+        self.text = text
+        self.keys = keys
+        # Key of the streamed array (None when the object has none of the keys)
+        self.key: Optional[str] = None
+        # The object's other fields
+        self.metadata: Dict[str, Any] = {}
+
+    def _skip(self, index: int) -> int:
+        return WHITESPACE.match(self.text, index).end()  # type: ignore[union-attr]
+
+    def _expect(self, index: int, characters: str) -> int:
+        index = self._skip(index)
+        if index >= len(self.text) or self.text[index] not in characters:
+            raise ValueError(f"Expected {characters!r} at position {index}")
+        return index
+
+    def __iter__(self) -> Iterator[Any]:
+        text = self.text
+        index = self._expect(0, "{") + 1
+        if text[self._skip(index)] == "}":
+            return
+        while True:
+            key, index = _decoder.raw_decode(text, self._expect(index, '"'))
+            index = self._skip(self._expect(index, ":") + 1)
+            if self.key is None and key in self.keys and text[index] == "[":
+                self.key = key
+                index = self._skip(index + 1)
+                if text[index] == "]":
+                    index += 1
+                else:
+                    while True:
+                        item, index = _decoder.raw_decode(text, index)
+                        yield item
+                        index = self._expect(index, ",]")
+                        index += 1
+                        if text[index - 1] == "]":
+                            break
+                        index = self._skip(index)
+            else:
+                self.metadata[key], index = _decoder.raw_decode(text, index)
+            index = self._expect(index, ",}") + 1
+            if text[index - 1] == "}":
+                return
@@ -0,0 +1,360 @@
+"""
+Multi-Worker Deployment
+
+Runs OMA_WORKERS uvicorn worker processes on one shared listening socket so
+agent orchestration (CrewAI / LangGraph) can use more than one core per pod:
+
+    python -m app.core.workers          # Dockerfile CMD
+
+OMA_WORKER_MODE decides how the TaskSchedulers are spread over the workers:
+- "shard" (default): the discovered agents are split round-robin by agent role,
+  each scheduler runs in exactly one worker
+- "replicate": every worker runs every scheduler; OMA_MAX_CONCURRENT_TASKS caps
+  the tasks executing at once across all workers (PodSlots, counted per worker)
+
+The launcher forwards SIGTERM/SIGINT/SIGHUP to the workers, waits up to
+OMA_WORKER_SHUTDOWN_TIMEOUT seconds for their lifespan shutdown (schedulers
+stop gracefully) and restarts workers that exit unexpectedly. The task slots a
+dead worker held are reclaimed before it is restarted.
+
+Each worker writes a heartbeat file to {OMA_CACHE_DIR}/workers/; any worker
+answers GET /health/workers with the aggregated state of all of them.
+
+With OMA_WORKERS=1 the launcher simply runs uvicorn in-process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from oxsci_shared_core.logging import logger
+
+from app.core.config import config
+
+APP_PATH = "app.core.main:app"
+HEARTBEAT_DIR = Path(config.OMA_CACHE_DIR) / "workers"
+HEARTBEAT_INTERVAL = 5.0
+# Missed heartbeats before a worker is reported unhealthy
+HEARTBEAT_STALE_AFTER = 3
+RESTART_BACKOFF = 1.0
+SLOT_POLL_INTERVAL = 0.05
+
+SHARD = "shard"
+REPLICATE = "replicate"
+
+T = TypeVar("T")
+
+# Pod-wide task slots, set in workers started by the launcher in replicate mode
+_shared_slots: Optional["PodSlots"] = None
+# Tasks currently executing in this worker, by agent role
+_in_flight: Dict[str, int] = {}
+_in_flight_lock = threading.Lock()
+
+
+def worker_index() -> int:
+    return int(os.environ.get("OMA_WORKER_INDEX", "0"))
+
+
+def worker_count() -> int:
+    return max(1, int(os.environ.get("OMA_WORKER_COUNT", "1")))
+
+
+def shard_for_worker(items: Sequence[T], mode: str = SHARD) -> List[T]:
+    """The share of the (role-sorted) agents this worker schedules."""
+    if mode == REPLICATE or worker_count() == 1:
+        return list(items)
+    return list(items[worker_index() :: worker_count()])
+
+
+class PodSlots:
+    """
+    Task slots shared by the worker processes of a pod, counted per worker so
+    the launcher can reclaim the slots of a worker that crashed or was killed
+    (a plain semaphore would lose them for good).
+    """
+
+    def __init__(self, context: Any, capacity: int, workers: int):
+        self.capacity = capacity
+        self._held = context.Array("i", workers)
+
+    def try_acquire(self, index: int) -> bool:
+        with self._held.get_lock():
+            held = self._held.get_obj()
+            if sum(held) >= self.capacity:
+                return False
+            held[index] += 1
+            return True
+
+    def release(self, index: int) -> None:
+        with self._held.get_lock():
+            held = self._held.get_obj()
+            held[index] = max(0, held[index] - 1)
+
+    def reclaim(self, index: int) -> int:
+        """Free all slots held by a worker (it is no longer running)."""
+        with self._held.get_lock():
+            held = self._held.get_obj()
+            freed, held[index] = held[index], 0
+            return freed
+
+    def held(self) -> List[int]:
+        with self._held.get_lock():
+            return list(self._held.get_obj())
+
+
+def with_worker_accounting(executor_class: Type[Any]) -> Type[Any]:
+    """
+    Subclass an ITaskExecutor so execute() is counted for the worker heartbeat
+    and, in replicate mode, holds one of the pod-wide task slots.
+    """
+    role = executor_class.agent_role
+    original_execute = executor_class.execute
+
+    @functools.wraps(original_execute)
+    async def execute(self: Any) -> Any:
+        slots = _shared_slots
+        index = worker_index()
+        if slots is not None:
+            # Non-blocking polling keeps the event loop free and cancellation safe
+            while not slots.try_acquire(index):
+                await asyncio.sleep(SLOT_POLL_INTERVAL)
+        with _in_flight_lock:
+            _in_flight[role] = _in_flight.get(role, 0) + 1
+        try:
+            return await original_execute(self)
+        finally:
+            with _in_flight_lock:
+                _in_flight[role] -= 1
+            if slots is not None:
+                slots.release(index)
+
+    return type(executor_class.__name__, (executor_class,), {"execute": execute})
+
+
+# ============================================================================
+# Heartbeats and health aggregation
+# ============================================================================
+
+
+def _heartbeat_path(index: int) -> Path:
+    return HEARTBEAT_DIR / f"{index}.json"
+
+
+def write_heartbeat(agent_ids: List[str]) -> None:
+    with _in_flight_lock:
+        in_flight = dict(_in_flight)
+    data = {
+        "index": worker_index(),
+        "pid": os.getpid(),
+        "timestamp": time.time(),
+        "agents": agent_ids,
+        "in_flight": in_flight,
+    }
+    path = _heartbeat_path(worker_index())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+async def run_heartbeat(agent_ids: List[str]) -> None:
+    """Write this worker's heartbeat every HEARTBEAT_INTERVAL seconds."""
+    while True:
+        try:
+            write_heartbeat(agent_ids)
+        except OSError as e:
+            logger.warning(f"Failed to write worker heartbeat: {e}")
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+def clear_heartbeat() -> None:
+    _heartbeat_path(worker_index()).unlink(missing_ok=True)
+
+
+def worker_health() -> Dict[str, Any]:
+    """Aggregated heartbeat state of all workers of this pod."""
+    now = time.time()
+    workers = []
+    for index in range(worker_count()):
+        path = _heartbeat_path(index)
+        try:
+            beat = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            workers.append({"index": index, "healthy": False, "error": "no heartbeat"})
+            continue
+        age = now - beat.get("timestamp", 0)
+        beat["age"] = round(age, 1)
+        beat["healthy"] = age < HEARTBEAT_INTERVAL * HEARTBEAT_STALE_AFTER
+        workers.append(beat)
+
+    in_flight: Dict[str, int] = {}
+    for beat in workers:
+        for role, count in beat.get("in_flight", {}).items():
+            in_flight[role] = in_flight.get(role, 0) + count
+    return {
+        "healthy": all(w["healthy"] for w in workers),
+        "mode": config.OMA_WORKER_MODE,
+        "workers": workers,
+        "in_flight": in_flight,
+    }
+
+
+router = APIRouter()
+
+
+@router.get("/health/workers")
+async def health_workers() -> JSONResponse:
+    health = worker_health()
+    return JSONResponse(health, status_code=200 if health["healthy"] else 503)
+
+
+# ============================================================================
+# Launcher
+# ============================================================================
+
+
+def _run_worker(
+    index: int, count: int, sock: socket.socket, slots: Optional[PodSlots]
+) -> None:
+    """Worker process entry point: serve the app on the inherited socket."""
+    global _shared_slots
+    import uvicorn
+
+    os.environ["OMA_WORKER_INDEX"] = str(index)
+    os.environ["OMA_WORKER_COUNT"] = str(count)
+    _shared_slots = slots
+    server = uvicorn.Server(uvicorn.Config(APP_PATH, lifespan="on"))
+    server.run(sockets=[sock])
+
+
+class WorkerLauncher:
+    """Starts, supervises and stops the worker processes."""
+
+    def __init__(
+        self,
+        workers: int,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        mode: str = SHARD,
+        max_concurrent_tasks: int = 0,
+        shutdown_timeout: float = 30.0,
+    ):
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.mode = mode
+        self.shutdown_timeout = shutdown_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = (
+            PodSlots(self._context, max_concurrent_tasks, workers)
+            if mode == REPLICATE and max_concurrent_tasks > 0
+            else None
+        )
+        self._processes: Dict[int, Any] = {}
+        self._stopping = threading.Event()
+        self._socket: Optional[socket.socket] = None
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=_run_worker,
+            args=(index, self.workers, self._socket, self._slots),
+            name=f"oma-worker-{index}",
+        )
+        process.start()
+        self._processes[index] = process
+        logger.info(f"Started worker {index} (pid {process.pid})")
+
+    def _signal_workers(self, signum: int) -> None:
+        for process in self._processes.values():
+            if process.is_alive() and process.pid:
+                os.kill(process.pid, signum)
+
+    def _on_signal(self, signum: int, _frame: Any) -> None:
+        if signum == signal.SIGHUP:
+            # MCP config reload in every worker
+            self._signal_workers(signum)
+            return
+        self._stopping.set()
+
+    def run(self) -> int:
+        self._socket = self._bind()
+        for path in HEARTBEAT_DIR.glob("*.json"):
+            path.unlink(missing_ok=True)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._on_signal)
+
+        logger.info(
+            f"Starting {self.workers} workers on {self.host}:{self.port} ({self.mode} mode)"
+        )
+        for index in range(self.workers):
+            self._spawn(index)
+
+        while not self._stopping.wait(RESTART_BACKOFF):
+            for index, process in list(self._processes.items()):
+                if not process.is_alive() and not self._stopping.is_set():
+                    logger.error(
+                        f"Worker {index} exited with code {process.exitcode}, restarting"
+                    )
+                    if self._slots is not None:
+                        # Its tasks are gone, their slots would never be released
+                        freed = self._slots.reclaim(index)
+                        if freed:
+                            logger.warning(f"Reclaimed {freed} slots of worker {index}")
+                    self._spawn(index)
+
+        return self.stop()
+
+    def stop(self) -> int:
+        """Ask all workers to shut down gracefully, killing stragglers."""
+        logger.info("Stopping workers...")
+        self._signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.shutdown_timeout
+        for index, process in self._processes.items():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker {index} did not stop in time, killing")
+                process.kill()
+                process.join()
+        if self._socket is not None:
+            self._socket.close()
+        return 0
+
+
+def main() -> int:
+    if config.OMA_WORKERS <= 1:
+        import uvicorn
+
+        uvicorn.run(APP_PATH, host="0.0.0.0", port=config.SERVICE_PORT)
+        return 0
+    launcher = WorkerLauncher(
+        workers=config.OMA_WORKERS,
+        port=config.SERVICE_PORT,
+        mode=config.OMA_WORKER_MODE,
+        max_concurrent_tasks=config.OMA_MAX_CONCURRENT_TASKS,
+        shutdown_timeout=config.OMA_WORKER_SHUTDOWN_TIMEOUT,
+    )
+    return launcher.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,18 +19,21 @@ Dependencies:
 """
 
 import argparse
+import fnmatch
+import functools
+import json
 import os
 import platform
 import re
 import shutil
 import socket
+import string
 import subprocess
 import sys
-import tempfile
 import urllib.request
 import zipfile
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 
 GITHUB_REPO = "OxSci-AI/oma-scaffold"
@@ -39,6 +42,15 @@ GITHUB_ZIP_URL = (
     f"https://github.com/{GITHUB_REPO}/archive/refs/heads/{GITHUB_BRANCH}.zip"
 )
 
+# Download settings
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 30
+DEFAULT_CACHE_DIR = "~/.cache/oma-scaffold"
+
+# Scaffold paths not copied into a new service
+SCAFFOLD_EXCLUDE_TOP_LEVEL = {"setup.py", "install.py", ".git"}
+SCAFFOLD_EXCLUDE_ANYWHERE = {"__pycache__", ".DS_Store"}
+
 
 def detect_platform() -> str:
     """Detect the operating system platform."""
@@ -131,7 +143,7 @@ def check_aws_cli() -> Tuple[bool, Optional[str]]:
         return False, None
 
 
-def check_environment() -> bool:
+def check_environment(require_network: bool = True) -> bool:
     """Check all required environment prerequisites."""
     print("=" * 70)
     print("Environment Check")
@@ -187,14 +199,18 @@ def check_environment() -> bool:
         return False
     print()
 
-    # Check network connectivity
-    network_ok = check_network_connectivity()
-    if network_ok:
-        print("  ✅ Network: Connected")
+    # Check network connectivity (not needed with a local scaffold source)
+    if require_network:
+        network_ok = check_network_connectivity()
+        if network_ok:
+            print("  ✅ Network: Connected")
+        else:
+            print("  ❌ Network: No connection to GitHub")
+            print("     Please check your internet connection")
+            print("     Or install from a local archive/checkout with --source")
+            return False
     else:
-        print("  ❌ Network: No connection to GitHub")
-        print("     Please check your internet connection")
-        return False
+        print("  ✅ Network: Not required (local scaffold source)")
     print()
 
     # Check write permissions for current directory
@@ -332,44 +348,413 @@ def to_pascal_case(name: str) -> str:
     return "".join(word.capitalize() for word in parts)
 
 
-def download_and_extract_scaffold(temp_dir: Path) -> Path:
-    """Download and extract scaffold from GitHub."""
-    print("Downloading scaffold from GitHub...")
+def _progress(done: int, total: Optional[int]) -> None:
+    """Render a single-line download progress indicator."""
+    if total:
+        pct = done * 100 // total
+        bar = "#" * (pct // 4)
+        sys.stdout.write(f"\r  [{bar:<25}] {pct:3d}% {done / 1e6:.1f}/{total / 1e6:.1f} MB")
+    else:
+        sys.stdout.write(f"\r  {done / 1e6:.1f} MB")
+    sys.stdout.flush()
+
+
+def download_scaffold(archive_path: Path, url: str = GITHUB_ZIP_URL) -> Path:
+    """Stream the scaffold zip to archive_path, resuming a partial download."""
+    part_path = archive_path.with_name(archive_path.name + ".part")
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    offset = part_path.stat().st_size if part_path.exists() else 0
+
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+
+    with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+        if offset and response.status == 206:
+            print(f"Resuming download at {offset / 1e6:.1f} MB...")
+            mode = "ab"
+        else:
+            # Server ignored the range request, start over
+            offset, mode = 0, "wb"
+        length = response.headers.get("Content-Length")
+        total = offset + int(length) if length else None
+
+        done = offset
+        with open(part_path, mode) as out_file:
+            while True:
+                chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                out_file.write(chunk)
+                done += len(chunk)
+                _progress(done, total)
+        print()
+
+    os.replace(part_path, archive_path)
+    return archive_path
+
+
+def _is_excluded(relative: Path) -> bool:
+    """Whether a scaffold path is skipped when creating a service."""
+    parts = relative.parts
+    if not parts:
+        return False
+    if parts[0] in SCAFFOLD_EXCLUDE_TOP_LEVEL:
+        return True
+    return any(part in SCAFFOLD_EXCLUDE_ANYWHERE for part in parts)
+
+
+def extract_scaffold(archive_path: Path, target_dir: Path) -> int:
+    """Extract only the scaffold files a service needs, directly into target_dir."""
+    extracted = 0
+    with zipfile.ZipFile(archive_path, "r") as zip_ref:
+        for member in zip_ref.infolist():
+            # Archive entries are prefixed with the root folder (oma-scaffold-main/)
+            relative = Path(*Path(member.filename).parts[1:])
+            if member.is_dir() or not relative.parts or _is_excluded(relative):
+                continue
+            dest = target_dir / relative
+            # Never write outside the target directory
+            if not dest.resolve().is_relative_to(target_dir.resolve()):
+                raise Exception(f"Unsafe path in archive: {member.filename}")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with zip_ref.open(member) as src, open(dest, "wb") as out_file:
+                shutil.copyfileobj(src, out_file, DOWNLOAD_CHUNK_SIZE)
+            mode = (member.external_attr >> 16) & 0o777
+            if mode:
+                os.chmod(dest, mode)
+            extracted += 1
+    return extracted
+
+
+def _git_tracked_files(source_dir: Path) -> Optional[List[Path]]:
+    """Files tracked by git in a checkout (None when it is not a git checkout)."""
+    try:
+        result = subprocess.run(
+            ["git", "ls-files", "-z"],
+            cwd=source_dir,
+            capture_output=True,
+            timeout=30,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    names = result.stdout.decode("utf-8").split("\0")
+    return [Path(name) for name in names if name]
 
-    zip_path = temp_dir / "scaffold.zip"
 
+def _gitignore_patterns(source_dir: Path) -> List[str]:
+    """Patterns of the checkout's top-level .gitignore (negations are ignored)."""
     try:
-        # Download zip file
-        with urllib.request.urlopen(GITHUB_ZIP_URL) as response:
-            with open(zip_path, "wb") as out_file:
-                out_file.write(response.read())
-
-        print("Extracting files...")
-
-        # Extract zip file
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(temp_dir)
-
-        # Find extracted directory (should be oma-scaffold-main or similar)
-        extracted_dirs = [
-            d
-            for d in temp_dir.iterdir()
-            if d.is_dir() and d.name.startswith("oma-scaffold")
+        lines = (source_dir / ".gitignore").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.startswith(("#", "!"))
+    ]
+
+
+def _is_ignored(relative: Path, patterns: List[str]) -> bool:
+    """Whether a path matches a .gitignore pattern (itself or a parent directory)."""
+    path = relative.as_posix()
+    parents = [p.as_posix() for p in reversed(relative.parents) if p.parts]
+    for pattern in patterns:
+        anchored = pattern.startswith("/") or "/" in pattern.rstrip("/")
+        pattern = pattern.strip("/")
+        for candidate in parents + [path]:
+            name = candidate if anchored else candidate.rsplit("/", 1)[-1]
+            if fnmatch.fnmatch(name, pattern):
+                return True
+    return False
+
+
+def copy_scaffold(source_dir: Path, target_dir: Path) -> int:
+    """
+    Copy the scaffold files a service needs from a local checkout: the files
+    tracked by git, as in the GitHub archive (outside git, the files not
+    ignored by the checkout's .gitignore).
+    """
+    tracked = _git_tracked_files(source_dir)
+    if tracked is None:
+        patterns = _gitignore_patterns(source_dir)
+        tracked = [
+            path.relative_to(source_dir)
+            for path in source_dir.rglob("*")
+            if path.is_file()
+            and not _is_ignored(path.relative_to(source_dir), patterns)
         ]
+    copied = 0
+    for relative in sorted(tracked):
+        path = source_dir / relative
+        # Tracked files deleted in the working tree are skipped
+        if not path.is_file() or _is_excluded(relative):
+            continue
+        dest = target_dir / relative
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, dest)
+        copied += 1
+    return copied
+
 
-        if not extracted_dirs:
-            raise Exception("Could not find extracted scaffold directory")
+def cached_archive_path(cache_dir: Optional[str] = None) -> Path:
+    """Location of the downloaded scaffold archive."""
+    archive_dir = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser()
+    return archive_dir / f"oma-scaffold-{GITHUB_BRANCH}.zip"
 
-        return extracted_dirs[0]
+
+def needs_network(source: Optional[str], cache_dir: Optional[str]) -> bool:
+    """Whether creating the service requires downloading the scaffold."""
+    if source:
+        return False
+    return not (cache_dir and cached_archive_path(cache_dir).exists())
+
+
+def materialize_scaffold(
+    target_dir: Path, source: Optional[str] = None, cache_dir: Optional[str] = None
+) -> None:
+    """
+    Populate target_dir with the scaffold.
+
+    Args:
+        target_dir: Service directory to create the files in
+        source: Local scaffold zip or checkout directory (no network needed)
+        cache_dir: Directory keeping the downloaded archive between installs
+    """
+    try:
+        if source:
+            source_path = Path(source).expanduser().resolve()
+            if source_path.is_dir():
+                print(f"Copying scaffold from local checkout: {source_path}")
+                count = copy_scaffold(source_path, target_dir)
+            elif zipfile.is_zipfile(source_path):
+                print(f"Extracting scaffold from local archive: {source_path}")
+                count = extract_scaffold(source_path, target_dir)
+            else:
+                raise Exception(f"--source must be a scaffold zip or directory: {source}")
+        else:
+            archive_path = cached_archive_path(cache_dir)
+            if cache_dir and archive_path.exists():
+                print(f"Using cached scaffold archive: {archive_path}")
+            else:
+                print("Downloading scaffold from GitHub...")
+                download_scaffold(archive_path)
+            print("Extracting files...")
+            count = extract_scaffold(archive_path, target_dir)
+        print(f"  → {count} files")
 
     except Exception as e:
-        print(f"❌ Failed to download scaffold: {e}")
+        print(f"❌ Failed to prepare scaffold: {e}")
         print("\nAlternative installation method:")
         print("1. Clone the repository:")
         print(f"   git clone https://github.com/{GITHUB_REPO}.git")
         print("2. Run setup.py:")
         print("   cd oma-scaffold && python setup.py")
-        sys.exit(1)
+        raise
+
+
+# ============================================================================
+# Service Rendering
+# ============================================================================
+
+# Literal markers in app/agents/agent_template.py and their template fields
+AGENT_TEMPLATE_MARKERS = (
+    ("AgentTemplate", "${agent_class}"),
+    ('agent_role: str = "agent_template"', 'agent_role: str = "${agent_name}"'),
+    ('name="Agent Template"', 'name="${agent_class}"'),
+    (
+        'description="Template agent for demonstration purposes"',
+        'description="${agent_class} agent"',
+    ),
+)
+
+# Registration anchors in the scaffold's tests/test_agents.py
+TESTS_INSERT_ANCHOR = (
+    "# ============================================================================\n"
+    "# CLI Entry Point\n"
+)
+TEST_MAP_ANCHOR = "test_map = {\n"
+
+TEST_FUNCTION_TEMPLATE = string.Template(
+    '''@agent_test(
+    verbose="stdout",
+    framework="crew_ai",
+    task_input={
+        "file_id": FILE_ID,
+        "model": "openrouter/openai/gpt-4o-mini",
+    },
+)
+def test_${agent_name}():
+    """Test ${agent_class}"""
+    from app.agents.${agent_name} import ${agent_class}
+
+    return ${agent_class}
+
+
+'''
+)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(text: str, markers: Tuple[Tuple[str, str], ...]) -> string.Template:
+    """
+    Turn a scaffold file into a string.Template by swapping its literal markers
+    for ${fields}. Cached, so a batch reads and compiles each template once.
+    """
+    text = text.replace("$", "$$")
+    for literal, field in markers:
+        text = text.replace(literal, field)
+    return string.Template(text)
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Write a file via a temporary sibling and rename, never leaving it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def _replace_anchor(content: str, anchor: str, replacement: str, file_name: str) -> str:
+    if anchor not in content:
+        raise Exception(f"Registration anchor not found in {file_name}: {anchor!r}")
+    return content.replace(anchor, replacement, 1)
+
+
+def render_service(
+    target_dir: Path, folder_name: str, description: str, agent_names: List[str]
+) -> None:
+    """
+    Customize a materialized scaffold for one service and its agents.
+
+    Renders every agent file and its test entry in one pass (main.py needs no
+    changes, agents under app/agents/ are discovered at startup).
+    """
+    agents = [(name, to_pascal_case(name)) for name in agent_names]
+    agents_dir = target_dir / "app" / "agents"
+
+    # Update pyproject.toml
+    print("Configuring pyproject.toml...")
+    pyproject_path = target_dir / "pyproject.toml"
+    content = pyproject_path.read_text(encoding="utf-8")
+    content = content.replace(
+        'name = "oma-service-template"', f'name = "{folder_name}"'
+    )
+    content = content.replace(
+        'description = "OMA Agent Service Template"',
+        f'description = "{description}"',
+    )
+    write_atomic(pyproject_path, content)
+
+    # Create agent files from template
+    agent_template_path = agents_dir / "agent_template.py"
+    agent_template = compile_template(
+        agent_template_path.read_text(encoding="utf-8"), AGENT_TEMPLATE_MARKERS
+    )
+    for agent_name, agent_class in agents:
+        print(f"Creating agent file: app/agents/{agent_name}.py")
+        write_atomic(
+            agents_dir / f"{agent_name}.py",
+            agent_template.substitute(agent_name=agent_name, agent_class=agent_class),
+        )
+
+    # Remove template file
+    agent_template_path.unlink()
+
+    # Create __init__.py for agents (no imports: agents are discovered and only
+    # the ones selected by OMA_AGENTS get imported)
+    (agents_dir / "__init__.py").touch()
+
+    # Create __init__.py for app
+    (target_dir / "app" / "__init__.py").touch()
+
+    # Update test_agents.py
+    print("Updating test_agents.py...")
+    test_path = target_dir / "tests" / "test_agents.py"
+    test_content = test_path.read_text(encoding="utf-8")
+    test_functions = "".join(
+        TEST_FUNCTION_TEMPLATE.substitute(agent_name=name, agent_class=cls)
+        for name, cls in agents
+    )
+    test_content = _replace_anchor(
+        test_content,
+        TESTS_INSERT_ANCHOR,
+        test_functions + TESTS_INSERT_ANCHOR,
+        "test_agents.py",
+    )
+    test_map_lines = "".join(f'        "{name}": test_{name},\n' for name, _ in agents)
+    test_content = _replace_anchor(
+        test_content, TEST_MAP_ANCHOR, TEST_MAP_ANCHOR + test_map_lines, "test_agents.py"
+    )
+    write_atomic(test_path, test_content)
+
+    # Create sample directory (in tests directory, relative to test file)
+    print("Creating sample directory...")
+    sample_dir = target_dir / "tests" / "sample"
+    sample_dir.mkdir(parents=True, exist_ok=True)
+    (sample_dir / ".gitkeep").touch()
+
+    # Create README.md
+    agent_list = "\n".join(f"- `{name}` (`app/agents/{name}.py`)" for name, _ in agents)
+    readme_content = f"""# {folder_name}
+
+{description}
+
+## Agents
+
+{agent_list}
+
+## Quick Start
+
+### 1. Configure AWS CodeArtifact
+
+```bash
+./entrypoint-dev.sh
+```
+
+### 2. Install Dependencies
+
+```bash
+poetry install
+```
+
+### 3. Run Tests
+
+```bash
+python tests/test_agents.py --test {agents[0][0]}
+```
+
+### 4. Run Service
+
+```bash
+poetry run uvicorn app.core.main:app --reload --port 8080
+```
+
+Access the API documentation at: http://localhost:8080/docs
+
+## Development Documentation
+
+For comprehensive development documentation including:
+- MCP Tool Configuration
+- Agent Development Guide
+- Testing Instructions
+- Deployment Guide
+
+See [docs/DEVELOPMENT_GUIDE.md](docs/DEVELOPMENT_GUIDE.md)
+
+## Scaffold Template
+
+For scaffold usage and installation options, see: https://github.com/{GITHUB_REPO}
+"""
+    write_atomic(target_dir / "README.md", readme_content)
+
+
+def init_git_repository(target_dir: Path) -> None:
+    """Initialize the service's git repository."""
+    print("Initializing git repository...")
+    subprocess.run(["git", "init", "-q"], cwd=target_dir, check=False)
 
 
 def setup_service(
@@ -377,6 +762,8 @@ def setup_service(
     agent_name: Optional[str] = None,
     skip_confirm: bool = False,
     skip_env_check: bool = False,
+    source: Optional[str] = None,
+    cache_dir: Optional[str] = None,
 ):
     """Main setup function.
 
@@ -398,7 +785,7 @@ def setup_service(
 
     # Perform environment checks (unless skipped)
     if not skip_env_check:
-        if not check_environment():
+        if not check_environment(require_network=needs_network(source, cache_dir)):
             print(
                 "\n❌ Environment check failed. Please fix the issues above and try again."
             )
@@ -495,229 +882,182 @@ def setup_service(
         print(f"\n❌ Error: Directory '{folder_name}' already exists!")
         return
 
-    # Create temporary directory for download
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-
-        try:
-            # Download scaffold
-            scaffold_dir = download_and_extract_scaffold(temp_path)
-
-            # Create target directory
-            print(f"Creating directory: {folder_name}")
-            target_dir.mkdir(parents=True, exist_ok=True)
-
-            # Copy all files and directories except setup.py and install.py
-            print("Copying template files...")
-            for item in scaffold_dir.iterdir():
-                if item.name in [
-                    "setup.py",
-                    "install.py",
-                    ".git",
-                    "__pycache__",
-                    ".DS_Store",
-                ]:
-                    continue
-
-                dest = target_dir / item.name
-                if item.is_file():
-                    shutil.copy2(item, dest)
-                elif item.is_dir():
-                    shutil.copytree(item, dest)
-
-            # Update pyproject.toml
-            print("Configuring pyproject.toml...")
-            pyproject_path = target_dir / "pyproject.toml"
-            content = pyproject_path.read_text(encoding='utf-8')
-            content = content.replace(
-                'name = "oma-service-template"', f'name = "{folder_name}"'
-            )
-            content = content.replace(
-                'description = "OMA Agent Service Template"',
-                f'description = "{description}"',
-            )
-            pyproject_path.write_text(content, encoding='utf-8')
-
-            # Create agent file from template
-            print(f"Creating agent file: app/agents/{agent_file}")
-            agent_template_path = target_dir / "app" / "agents" / "agent_template.py"
-            agent_path = target_dir / "app" / "agents" / agent_file
-
-            agent_content = agent_template_path.read_text(encoding='utf-8')
-            agent_content = agent_content.replace("AgentTemplate", agent_class)
-            agent_content = agent_content.replace(
-                'agent_role: str = "agent_template"',
-                f'agent_role: str = "{agent_name}"',
-            )
-            agent_content = agent_content.replace(
-                'name="Agent Template"', f'name="{agent_class}"'
-            )
-            agent_content = agent_content.replace(
-                'description="Template agent for demonstration purposes"',
-                f'description="{agent_class} agent"',
-            )
-
-            agent_path.write_text(agent_content, encoding='utf-8')
+    try:
+        # Create target directory
+        print(f"Creating directory: {folder_name}")
+        target_dir.mkdir(parents=True, exist_ok=True)
 
-            # Remove template file
-            agent_template_path.unlink()
+        # Stream/extract only the template files the service needs, straight
+        # into the target directory (no temporary full-archive copy)
+        materialize_scaffold(target_dir, source=source, cache_dir=cache_dir)
 
-            # Create __init__.py for agents
-            agents_init = target_dir / "app" / "agents" / "__init__.py"
-            agents_init.write_text(
-                f'from .{agent_name} import {agent_class}\n\n__all__ = ["{agent_class}"]\n',
-                encoding='utf-8'
-            )
+        render_service(target_dir, folder_name, description, [agent_name])
 
-            # Create __init__.py for app
-            app_init = target_dir / "app" / "__init__.py"
-            app_init.touch()
+        # Note: .gitignore is copied from template, no need to create it here
+        init_git_repository(target_dir)
 
-            # Update main.py
-            print("Updating main.py...")
-            main_path = target_dir / "app" / "core" / "main.py"
-            main_content = main_path.read_text(encoding='utf-8')
+        print()
+        print("=" * 70)
+        print("✅ Setup Complete!")
+        print("=" * 70)
+        print()
+        print(f"Your OMA agent service has been created in: {folder_name}")
+        print()
+        print("Next steps:")
+        print()
+        print(f"  1. cd {folder_name}")
+        print(f"  2. ./entrypoint-dev.sh          # Configure AWS CodeArtifact")
+        print(f"  3. poetry install                # Install dependencies")
+        print(f"  4. Edit app/agents/{agent_file}  # Implement your agent logic")
+        print(
+            f"  5. python tests/test_agents.py --test {agent_name}  # Test your agent"
+        )
+        print()
+        print(f"For more information, see: https://github.com/{GITHUB_REPO}")
+        print()
 
-            # Add import after the TODO comment
-            import_line = f"from app.agents.{agent_name} import {agent_class}"
-            main_content = main_content.replace(
-                "# TODO: Add your agent imports here\n# Example: from app.agents.my_agent import MyAgent",
-                f"# Agent imports\n{import_line}",
-            )
+    except Exception as e:
+        print(f"\n❌ Error during setup: {e}")
+        import traceback
 
-            # Add to agent_executors
-            main_content = main_content.replace(
-                "agent_executors = [\n        # Example: MyAgent,\n    ]",
-                f"agent_executors = [\n        {agent_class},\n    ]",
-            )
+        traceback.print_exc()
+        if target_dir.exists():
+            print(f"\nCleaning up {folder_name}...")
+            shutil.rmtree(target_dir)
+        return
 
-            main_path.write_text(main_content, encoding='utf-8')
 
-            # Update test_agents.py
-            print("Updating test_agents.py...")
-            test_path = target_dir / "tests" / "test_agents.py"
-            test_content = test_path.read_text(encoding='utf-8')
+# ============================================================================
+# Manifest Batch Mode
+# ============================================================================
 
-            # Add import
-            import_line = f"from app.agents.{agent_name} import {agent_class}"
-            test_content = test_content.replace(
-                "# Import your agent classes here\n# Example:\n# from app.agents.my_agent import MyAgent",
-                f"# Import agent classes\n{import_line}",
-            )
 
-            # Add test function
-            test_function = f'''
+def load_manifest(manifest_path: str) -> List[Tuple[str, str, List[str]]]:
+    """
+    Load a batch manifest (JSON, or YAML when PyYAML is installed).
 
-@agent_test(sample_pdf="sample/sample.pdf")
-def test_{agent_name}():
-    """Test {agent_class} - processes PDF documents"""
-    return {agent_class}
-'''
-            test_content = test_content.replace(
-                "# ============================================================================\n# Single Agent Tests\n# ============================================================================\n\n",
-                f"# ============================================================================\n# Single Agent Tests\n# ============================================================================\n{test_function}\n",
-            )
+    Format:
+        {"services": [
+            {"name": "document-processor",
+             "description": "optional",
+             "agents": ["pdf_parser", "summarizer"]}
+        ]}
 
-            # Add to test_map
-            test_content = test_content.replace(
-                'test_map = {\n        # Add your test functions here\n        # Example:\n        # "my_agent": test_my_agent,\n        # "my_agent_with_input": test_my_agent_with_input,\n    }',
-                f'test_map = {{\n        "{agent_name}": test_{agent_name},\n    }}',
+    Returns:
+        (service_name, description, agent_names) per service, normalized and validated
+    """
+    path = Path(manifest_path).expanduser()
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise Exception(
+                "YAML manifests require PyYAML (pip install pyyaml), or use a .json manifest"
             )
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    entries = data.get("services") if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise Exception(f"{path}: expected a non-empty 'services' list")
+
+    services: List[Tuple[str, str, List[str]]] = []
+    seen_services = set()
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("name"):
+            raise Exception(f"{path}: every service needs a 'name': {entry!r}")
+        service_name = normalize_service_name(str(entry["name"]))
+        if not validate_service_name(service_name) or service_name in seen_services:
+            raise Exception(f"{path}: invalid or duplicate service name: {entry['name']!r}")
+        seen_services.add(service_name)
+
+        raw_agents = entry.get("agents")
+        if not isinstance(raw_agents, list) or not raw_agents:
+            raise Exception(f"{path}: service '{service_name}' needs a non-empty 'agents' list")
+        agent_names: List[str] = []
+        for raw_agent in raw_agents:
+            agent_name = normalize_agent_name(str(raw_agent))
+            if not validate_agent_name(agent_name) or agent_name in agent_names:
+                raise Exception(
+                    f"{path}: invalid or duplicate agent name in '{service_name}': {raw_agent!r}"
+                )
+            agent_names.append(agent_name)
+
+        description = entry.get("description") or (
+            f"OMA {service_name.replace('-', ' ').title()} Service"
+        )
+        services.append((service_name, description, agent_names))
+    return services
 
-            test_path.write_text(test_content, encoding='utf-8')
-
-            # Create sample directory (in tests directory, relative to test file)
-            print("Creating sample directory...")
-            sample_dir = target_dir / "tests" / "sample"
-            sample_dir.mkdir(parents=True, exist_ok=True)
-            (sample_dir / ".gitkeep").touch()
-
-            # Create README.md
-            readme_content = f"""# {folder_name}
-
-{description}
-
-## Quick Start
-
-### 1. Configure AWS CodeArtifact
-
-```bash
-./entrypoint-dev.sh
-```
-
-### 2. Install Dependencies
-
-```bash
-poetry install
-```
-
-### 3. Run Tests
-
-```bash
-python tests/test_agents.py --test {agent_name}
-```
-
-### 4. Run Service
-
-```bash
-poetry run uvicorn app.core.main:app --reload --port 8080
-```
-
-Access the API documentation at: http://localhost:8080/docs
-
-## Development Documentation
-
-For comprehensive development documentation including:
-- MCP Tool Configuration
-- Agent Development Guide
-- Testing Instructions
-- Deployment Guide
-
-See [docs/DEVELOPMENT_GUIDE.md](docs/DEVELOPMENT_GUIDE.md)
 
-## Scaffold Template
-
-For scaffold usage and installation options, see: https://github.com/{GITHUB_REPO}
-"""
-            readme_path = target_dir / "README.md"
-            readme_path.write_text(readme_content, encoding='utf-8')
+def run_manifest(
+    manifest_path: str,
+    skip_env_check: bool = False,
+    source: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> int:
+    """
+    Create every service of a manifest in the current directory, non-interactively.
 
-            # Initialize git repository
-            print("Initializing git repository...")
-            os.chdir(target_dir)
-            os.system("git init")
+    The scaffold is downloaded (or read from --source) once for the whole batch.
 
-            # Note: .gitignore is copied from template, no need to create it here
+    Returns:
+        Process exit code: 0 when all services were created
+    """
+    print("=" * 70)
+    print("OMA Agent Service Installer - Batch Mode")
+    print("=" * 70)
+    print()
 
-            print()
-            print("=" * 70)
-            print("✅ Setup Complete!")
-            print("=" * 70)
-            print()
-            print(f"Your OMA agent service has been created in: {folder_name}")
-            print()
-            print("Next steps:")
-            print()
-            print(f"  1. cd {folder_name}")
-            print(f"  2. ./entrypoint-dev.sh          # Configure AWS CodeArtifact")
-            print(f"  3. poetry install                # Install dependencies")
-            print(f"  4. Edit app/agents/{agent_file}  # Implement your agent logic")
-            print(
-                f"  5. python tests/test_agents.py --test {agent_name}  # Test your agent"
-            )
-            print()
-            print(f"For more information, see: https://github.com/{GITHUB_REPO}")
-            print()
+    services = load_manifest(manifest_path)
+    agent_count = sum(len(agents) for _, _, agents in services)
+    print(f"Manifest: {len(services)} services, {agent_count} agents")
+    print()
 
+    if not skip_env_check:
+        if not check_environment(require_network=needs_network(source, cache_dir)):
+            print("\n❌ Environment check failed. Please fix the issues above and try again.")
+            return 1
+
+    if not source:
+        # Fetch once, then extract every service from the same archive
+        archive_path = cached_archive_path(cache_dir)
+        if not (cache_dir and archive_path.exists()):
+            print("Downloading scaffold from GitHub...")
+            download_scaffold(archive_path)
+        source = str(archive_path)
+
+    failed: List[str] = []
+    for service_name, description, agent_names in services:
+        folder_name = f"oma-{service_name}"
+        target_dir = Path.cwd() / folder_name
+        print()
+        print(f"Creating {folder_name} ({', '.join(agent_names)})")
+        print("-" * 70)
+        if target_dir.exists():
+            print(f"❌ Error: Directory '{folder_name}' already exists, skipped")
+            failed.append(folder_name)
+            continue
+        try:
+            target_dir.mkdir(parents=True)
+            materialize_scaffold(target_dir, source=source)
+            render_service(target_dir, folder_name, description, agent_names)
+            init_git_repository(target_dir)
         except Exception as e:
-            print(f"\n❌ Error during setup: {e}")
-            import traceback
+            print(f"❌ Error creating {folder_name}: {e}")
+            shutil.rmtree(target_dir, ignore_errors=True)
+            failed.append(folder_name)
 
-            traceback.print_exc()
-            if target_dir.exists():
-                print(f"\nCleaning up {folder_name}...")
-                shutil.rmtree(target_dir)
-            return
+    print()
+    print("=" * 70)
+    created = len(services) - len(failed)
+    print(f"{'✅' if not failed else '⚠️ '} Created {created}/{len(services)} services")
+    for folder_name in failed:
+        print(f"  ❌ {folder_name}")
+    print("=" * 70)
+    return 1 if failed else 0
 
 
 def main():
@@ -740,6 +1080,13 @@ Examples:
   cd /git
   python3 install.py --service-name my-service --agent-name my_agent --yes
 
+  # Offline / CI: reuse a cached archive or a local checkout
+  python3 install.py --service-name my-service --agent-name my_agent --yes --cache-dir ~/.cache/oma-scaffold
+  python3 install.py --service-name my-service --agent-name my_agent --yes --source ./oma-scaffold
+
+  # Batch mode: create every service and agent listed in a manifest
+  python3 install.py --manifest services.json
+
 Note: 
   - Run this script from the parent directory where you want to create the service
   - Example: To create /git/oma-my-service/, run the script from /git/ directory
@@ -767,9 +1114,41 @@ Note:
         action="store_true",
         help="Skip environment prerequisites check (not recommended)",
     )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="JSON/YAML manifest listing services and their agents; creates all of them non-interactively",
+    )
+    parser.add_argument(
+        "--source",
+        type=str,
+        help="Local scaffold zip archive or checkout directory to use instead of downloading from GitHub",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help=f"Keep the downloaded scaffold archive here and reuse it on later runs (downloads resume from {DEFAULT_CACHE_DIR} by default)",
+    )
 
     args = parser.parse_args()
 
+    if args.manifest:
+        try:
+            sys.exit(
+                run_manifest(
+                    args.manifest,
+                    skip_env_check=args.skip_env_check,
+                    source=args.source,
+                    cache_dir=args.cache_dir,
+                )
+            )
+        except KeyboardInterrupt:
+            print("\n\nSetup cancelled by user.")
+            sys.exit(1)
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            sys.exit(1)
+
     # If stdin is not a TTY and no arguments provided, show error
     if not is_interactive() and (args.service_name is None or args.agent_name is None):
         parser.error(
@@ -786,6 +1165,8 @@ Note:
             agent_name=args.agent_name,
             skip_confirm=args.yes,
             skip_env_check=args.skip_env_check,
+            source=args.source,
+            cache_dir=args.cache_dir,
         )
     except KeyboardInterrupt:
         print("\n\nSetup cancelled by user.")
@@ -7,9 +7,13 @@ This script sets up a new OMA agent service by:
 2. Creating the project directory structure
 3. Configuring pyproject.toml with the service name
 4. Creating agent file from template
-5. Updating main.py to register the agent
-6. Updating test_agents.py with the agent test
-7. Initializing git repository
+5. Updating test_agents.py with the agent test
+6. Initializing git repository
+
+Agents need no registration in main.py, they are discovered from app/agents/.
+
+Batch mode (many services/agents from a JSON or YAML manifest, no prompts):
+    python setup.py --manifest services.json
 """
 
 import os
@@ -165,34 +169,14 @@ def setup_service():
         # Remove template file
         agent_template_path.unlink()
 
-        # Create __init__.py for agents
+        # Create __init__.py for agents (no imports, agents are discovered)
         agents_init = target_dir / "app" / "agents" / "__init__.py"
-        agents_init.write_text(f'from .{agent_name} import {agent_class}\n\n__all__ = ["{agent_class}"]\n', encoding='utf-8')
+        agents_init.touch()
 
         # Create __init__.py for app
         app_init = target_dir / "app" / "__init__.py"
         app_init.touch()
 
-        # Update main.py
-        print("Updating main.py...")
-        main_path = target_dir / "app" / "core" / "main.py"
-        main_content = main_path.read_text(encoding='utf-8')
-
-        # Add import after the TODO comment
-        import_line = f"from app.agents.{agent_name} import {agent_class}"
-        main_content = main_content.replace(
-            "# TODO: Add your agent imports here\n# Example: from app.agents.my_agent import MyAgent",
-            f"# Agent imports\n{import_line}",
-        )
-
-        # Add to agent_executors
-        main_content = main_content.replace(
-            "agent_executors = [\n        # Example: MyAgent,\n    ]",
-            f"agent_executors = [\n        {agent_class},\n    ]",
-        )
-
-        main_path.write_text(main_content, encoding='utf-8')
-
         # Update test_agents.py
         print("Updating test_agents.py...")
         test_path = target_dir / "tests" / "test_agents.py"
@@ -321,6 +305,11 @@ Thumbs.db
 
 
 if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--manifest":
+        # Batch generation is shared with install.py, using this checkout as the scaffold
+        from install import run_manifest
+
+        sys.exit(run_manifest(sys.argv[2], source=str(Path(__file__).parent)))
     try:
         setup_service()
     except KeyboardInterrupt:
@@ -0,0 +1,139 @@
+"""
+Replica Balancer Tests
+
+Outlier ejection of app.core.balancer.ReplicaBalancer: replicas failing in a
+row leave rotation for a cooldown, and cancelled calls do not count unless
+they reached their own (not budget-capped) deadline.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator
+
+import pytest
+
+from app.core import balancer as balancer_module
+from app.core.balancer import (
+    EJECT_AFTER_FAILURES,
+    BalancedServerPool,
+    DirectRoutingMiddleware,
+    ReplicaBalancer,
+)
+from app.core.latency import LatencyTracker
+from app.core.mcp_config import MCPConfig, MCPServerConfig
+from app.core.mcp_registry import ServerPool, registry
+from app.core.timeouts import AdaptiveTimeoutMiddleware, ToolTimeoutError, task_budget
+from app.core.tool_pipeline import ToolCall
+
+pytestmark = pytest.mark.unit
+
+SERVER = "mcp-article-processing"
+URLS = ["http://10.0.1.12:8060", "http://10.0.2.40:8060"]
+
+
+class HangingTransport:
+    """Transport whose replicas never answer."""
+
+    async def call_tool(self, *args: Any, **kwargs: Any) -> Any:
+        await asyncio.sleep(60)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OfflinePool(BalancedServerPool):
+    """Balanced pool over the listed replicas that never opens a session."""
+
+    async def open(self) -> None:
+        self.tools = ["get_pdf_pages"]
+        self.transport = HangingTransport()
+        await self.resolve()
+
+
+async def open_pool(timeout: float) -> BalancedServerPool:
+    registry.set_pool_factory(OfflinePool)
+    server = MCPServerConfig(
+        name=SERVER,
+        enabled=True,
+        service_name=SERVER,
+        timeout=timeout,
+        direct_routing=True,
+        replicas=URLS[:1],
+    )
+    await registry.apply(MCPConfig(env="test", servers=(server,)))
+    return registry.pool(SERVER)
+
+
+@pytest.fixture
+async def close_registry() -> AsyncIterator[None]:
+    yield
+    await registry.close()
+    registry.set_pool_factory(ServerPool)
+
+
+async def call_until_timeout(times: int) -> None:
+    timeout = AdaptiveTimeoutMiddleware(min_timeout=0, tracker=LatencyTracker())
+    routing = DirectRoutingMiddleware()
+
+    async def unrouted(call: ToolCall) -> Any:
+        raise AssertionError("call was not routed to a replica")
+
+    async def routed(call: ToolCall) -> Any:
+        return await routing(call, unrouted)
+
+    for _ in range(times):
+        with pytest.raises(ToolTimeoutError):
+            await timeout(ToolCall("get_pdf_pages", {}, server=SERVER), routed)
+
+
+def fail(balancer: ReplicaBalancer, url: str, times: int) -> None:
+    replica = next(r for r in balancer.replicas if r.url == url)
+    for _ in range(times):
+        replica.outstanding += 1
+        balancer.release(replica, 0.1, False)
+
+
+def test_failing_replica_ejected_until_cooldown(monkeypatch: pytest.MonkeyPatch):
+    now = [1000.0]
+    monkeypatch.setattr(balancer_module.time, "monotonic", lambda: now[0])
+    balancer = ReplicaBalancer()
+    balancer.update(URLS)
+
+    fail(balancer, URLS[0], EJECT_AFTER_FAILURES)
+    picked = {balancer.pick().url for _ in range(20)}
+    assert picked == {URLS[1]}
+
+    now[0] += balancer_module.EJECT_SECONDS
+    picked = {balancer.pick().url for _ in range(20)}
+    assert URLS[0] in picked
+
+
+def test_all_ejected_keeps_serving_and_cancel_not_counted():
+    balancer = ReplicaBalancer()
+    balancer.update(URLS[:1])
+    replica = balancer.pick()
+    balancer.release(replica, 5.0, None)
+    assert (replica.outstanding, replica.failures, replica.ewma) == (0, 0, 0.0)
+
+    fail(balancer, URLS[0], EJECT_AFTER_FAILURES)
+
+    assert balancer.pick() is replica
+
+
+async def test_replica_timing_out_is_ejected(close_registry: None):
+    pool = await open_pool(timeout=0.02)
+
+    await call_until_timeout(EJECT_AFTER_FAILURES)
+
+    replica = pool.balancer.replicas[0]
+    assert replica.failures == EJECT_AFTER_FAILURES
+    assert replica.ejected_until > 0
+
+
+async def test_budget_capped_timeouts_not_counted(close_registry: None):
+    pool = await open_pool(timeout=60)
+
+    with task_budget(0.02):
+        await call_until_timeout(1)
+
+    assert pool.balancer.replicas[0].failures == 0
+    assert pool.balancer.replicas[0].outstanding == 0
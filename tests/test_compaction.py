@@ -0,0 +1,65 @@
+"""
+History Compaction Tests
+
+Append-only compaction of app.core.compaction: the request prefix already sent
+stays byte-identical until a whole batch of tool results can be compacted.
+"""
+
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from app.core.compaction import HistoryCompactionMiddleware
+
+pytestmark = pytest.mark.unit
+
+
+def tool_turn(number: int) -> List[Dict[str, Any]]:
+    call_id = f"call_{number}"
+    return [
+        {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [
+                {
+                    "id": call_id,
+                    "function": {"name": "get_pdf_pages", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": call_id, "content": str(number) * 5000},
+    ]
+
+
+def test_sent_prefix_only_changes_at_batch_boundaries():
+    middleware = HistoryCompactionMiddleware(
+        min_chars=4000, keep_chars=100, keep_recent=2, batch=3
+    )
+    history: List[Dict[str, Any]] = [{"role": "user", "content": "parse"}]
+    sent: List[List[Dict[str, Any]]] = []
+    for number in range(1, 9):
+        history += tool_turn(number)
+        sent.append(middleware.compact(history)[0])
+
+    rewrites = []
+    for turn, (before, after) in enumerate(zip(sent, sent[1:]), start=2):
+        if json.dumps(after[: len(before)]) != json.dumps(before):
+            rewrites.append(turn)
+    # 3 results compacted with 5 tool results, 6 with 8
+    assert rewrites == [5, 8]
+    tool_results = [m["content"] for m in sent[-1] if m["role"] == "tool"]
+    assert sum(len(content) < 5000 for content in tool_results) == 6
+
+
+def test_recent_results_stay_complete():
+    middleware = HistoryCompactionMiddleware(keep_recent=2, batch=4)
+    history: List[Dict[str, Any]] = []
+    for number in range(1, 7):
+        history += tool_turn(number)
+
+    messages, removed = middleware.compact(history)
+
+    assert removed > 0
+    complete = [len(m["content"]) == 5000 for m in messages if m["role"] == "tool"]
+    assert complete == [False] * 4 + [True] * 2
@@ -0,0 +1,57 @@
+"""
+Compact Task Context Tests
+
+Reads, writes and restore of app.core.context_store.CompactSharedData.
+"""
+
+from typing import Any, Dict
+
+import pytest
+
+from app.core.context_store import BlobStore, CompactSharedData
+
+pytestmark = pytest.mark.unit
+
+
+def shared_data(store: BlobStore) -> CompactSharedData:
+    data: Dict[str, Any] = {
+        "file_id": "file-1",
+        "sections": [{"title": "Abstract", "content": "x" * 8192}],
+    }
+    return CompactSharedData(data, store=store, min_bytes=1024)
+
+
+def test_large_values_stored_as_shared_blobs():
+    store = BlobStore()
+    first, second = shared_data(store), shared_data(store)
+
+    assert len(first.refs()) == 1
+    assert store.stats()["blobs"] == 1
+    assert store.stats()["refs"] == 2
+
+    first.release()
+    second.release()
+    assert store.stats()["blobs"] == 0
+
+
+def test_reads_return_one_object_for_the_task():
+    data = shared_data(BlobStore())
+
+    sections = data["sections"]
+    sections.append({"title": "Methods", "content": "y"})
+
+    assert data["sections"] is sections
+    assert [s["title"] for s in data.release()["sections"]] == ["Abstract", "Methods"]
+
+
+def test_write_replaces_blob_and_keeps_value():
+    store = BlobStore()
+    data = shared_data(store)
+    data["sections"]
+    replacement = [{"title": "Results", "content": "z" * 8192}]
+
+    data["sections"] = replacement
+
+    assert data["sections"] is replacement
+    assert store.stats()["blobs"] == 0
+    assert data.release()["sections"] == replacement
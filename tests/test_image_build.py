@@ -0,0 +1,46 @@
+"""
+Optimized Image Build Tests
+
+Framework usage detection of app.core.image_build: imports a startup never
+runs (inside functions) still keep a framework.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from app.core.image_build import lazily_imported
+
+pytestmark = pytest.mark.unit
+
+FRAMEWORKS = {"claude_agent_sdk", "crewai", "langgraph"}
+
+
+def test_imports_inside_functions_are_found(tmp_path: Path):
+    agent = tmp_path / "agent.py"
+    agent.write_text(
+        "import json\n"
+        "\n"
+        "async def execute(task):\n"
+        "    from claude_agent_sdk import query\n"
+        "    return query(task)\n"
+        "\n"
+        "class Runner:\n"
+        "    def run(self):\n"
+        "        import langgraph.prebuilt\n"
+    )
+
+    found = lazily_imported([str(agent)], FRAMEWORKS)
+
+    assert found == {"claude_agent_sdk", "langgraph"}
+
+
+def test_relative_imports_and_mentions_are_ignored(tmp_path: Path):
+    module = tmp_path / "module.py"
+    module.write_text(
+        "from .crewai import helper\n"
+        "# crewai is not required here\n"
+        "NAME = 'crewai'\n"
+    )
+
+    assert lazily_imported([str(module), str(tmp_path / "ext.so")], FRAMEWORKS) == set()
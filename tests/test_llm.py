@@ -0,0 +1,97 @@
+"""
+LLM Pipeline Tests
+
+Synchronous (CrewAI) LLM calls run the pipeline on the service loop through
+the pipeline's LoopBridge instead of a new event loop per call, also when the
+calling thread runs a loop of its own.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from app.core.llm import LLMCall, LLMPipeline
+
+pytestmark = pytest.mark.unit
+
+
+class FakeCrewAILLM:
+    temperature = 0.0
+
+    def __init__(self) -> None:
+        self.threads: List[str] = []
+
+    def call(self, messages: Any, **kwargs: Any) -> str:
+        self.threads.append(threading.current_thread().name)
+        return "answer"
+
+
+async def test_sync_call_runs_pipeline_on_service_loop():
+    pipeline = LLMPipeline()
+    loops: List[Dict[str, Any]] = []
+
+    async def record(call: LLMCall, call_next: Any) -> Any:
+        loops.append(
+            {
+                "loop": asyncio.get_running_loop(),
+                "thread": threading.current_thread().name,
+            }
+        )
+        return await call_next(call)
+
+    pipeline.use(record)
+    service_loop = asyncio.get_running_loop()
+    pipeline.bridge.bind(service_loop, max_threads=2)
+    llm = pipeline.wrap(FakeCrewAILLM(), "openrouter/openai/gpt-4o-mini", "agent")
+
+    try:
+        # CrewAI calls the LLM synchronously from crew threads
+        results = await asyncio.gather(
+            *[asyncio.to_thread(llm.call, [{"role": "user", "content": "hi"}])] * 4
+        )
+    finally:
+        pipeline.bridge.shutdown()
+
+    assert results == ["answer"] * 4
+    assert all(entry["loop"] is service_loop for entry in loops)
+    assert all(name.startswith("oma-llm") for name in llm.threads)
+
+
+def test_sync_call_without_bound_loop_still_works():
+    pipeline = LLMPipeline()
+
+    async def passthrough(call: LLMCall, call_next: Any) -> Any:
+        return await call_next(call)
+
+    pipeline.use(passthrough)
+    llm = pipeline.wrap(FakeCrewAILLM(), "model", "agent")
+
+    assert llm.call([{"role": "user", "content": "hi"}]) == "answer"
+
+
+async def test_sync_call_from_other_loop_runs_on_service_loop():
+    pipeline = LLMPipeline()
+    loops: List[Any] = []
+
+    async def record(call: LLMCall, call_next: Any) -> Any:
+        loops.append(asyncio.get_running_loop())
+        return await call_next(call)
+
+    pipeline.use(record)
+    service_loop = asyncio.get_running_loop()
+    pipeline.bridge.bind(service_loop, max_threads=2)
+    llm = pipeline.wrap(FakeCrewAILLM(), "model", "agent")
+
+    async def framework_code() -> Any:
+        # Synchronous LLM call from code running on another thread's loop
+        return llm.call([{"role": "user", "content": "hi"}])
+
+    try:
+        result = await asyncio.to_thread(asyncio.run, framework_code())
+    finally:
+        pipeline.bridge.shutdown()
+
+    assert result == "answer"
+    assert loops == [service_loop]
@@ -0,0 +1,45 @@
+"""
+LLM Response Cache Tests
+
+Disk entries of app.core.llm_cache.ResponseCache are JSON: they are replayed
+across instances and anything else in the directory is dropped, never loaded.
+"""
+
+import pickle
+from pathlib import Path
+
+import pytest
+
+from app.core.llm_cache import ResponseCache
+
+pytestmark = pytest.mark.unit
+
+
+def test_text_response_replayed_from_disk(tmp_path: Path):
+    ResponseCache(tmp_path).put("ab" * 32, "completion")
+
+    # Another worker only shares the directory
+    hit, response = ResponseCache(tmp_path).get("ab" * 32)
+
+    assert (hit, response) == (True, "completion")
+    assert list(tmp_path.rglob("*.json"))
+
+
+def test_unsupported_response_not_cached(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+
+    cache.put("cd" * 32, object())
+
+    assert cache.get("cd" * 32) == (False, None)
+    assert not list(tmp_path.rglob("*"))
+
+
+def test_pickled_entry_is_dropped(tmp_path: Path):
+    cache = ResponseCache(tmp_path)
+    key = "ef" * 32
+    path = cache._path(tmp_path, key)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(pickle.dumps("completion"))
+
+    assert cache.get(key) == (False, None)
+    assert not path.exists()
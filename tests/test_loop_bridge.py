@@ -0,0 +1,47 @@
+"""
+Loop Bridge Tests
+
+Thread accounting of app.core.loop_bridge.LoopBridge when a caller stops
+waiting for a blocking function.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.loop_bridge import LoopBridge
+
+pytestmark = pytest.mark.unit
+
+
+async def test_timed_out_call_reported_as_abandoned_until_it_returns():
+    bridge = LoopBridge("test-bridge")
+    bridge.bind(asyncio.get_running_loop(), max_threads=2)
+    release = threading.Event()
+
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(bridge.run_sync(release.wait), 0.05)
+
+        assert bridge.stats()["busy_threads"] == 1
+        assert bridge.stats()["abandoned_threads"] == 1
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert bridge.stats()["busy_threads"] == 0
+        assert bridge.stats()["abandoned_threads"] == 0
+    finally:
+        release.set()
+        bridge.shutdown()
+
+
+async def test_completed_call_not_abandoned():
+    bridge = LoopBridge("test-bridge")
+    bridge.bind(asyncio.get_running_loop(), max_threads=1)
+
+    try:
+        assert await bridge.run_sync(lambda: "done") == "done"
+        assert bridge.stats()["abandoned_threads"] == 0
+    finally:
+        bridge.shutdown()
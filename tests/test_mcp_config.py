@@ -0,0 +1,63 @@
+"""
+MCP Configuration Tests
+
+Snapshots of app.core.mcp_config: placeholders needed at runtime, the error
+when one is empty at load, and loads that trust the snapshot.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.core.config import config
+from app.core.mcp_config import MCPConfigError, load_mcp_config, write_snapshot
+
+pytestmark = pytest.mark.unit
+
+BASE = {
+    "servers": {
+        "mcp-article-processing": {
+            "service_name": "mcp-article-processing-test",
+            "proxy_url": "${MCP_PROXY_URL}",
+        }
+    }
+}
+DEV = {"servers": {"mcp-article-processing": {"enabled": True, "proxy": True}}}
+
+
+@pytest.fixture
+def config_dir(tmp_path: Path) -> Path:
+    (tmp_path / "base.json").write_text(json.dumps(BASE), encoding="utf-8")
+    (tmp_path / "dev.json").write_text(json.dumps(DEV), encoding="utf-8")
+    return tmp_path
+
+
+def test_snapshot_lists_runtime_placeholders(config_dir: Path):
+    snapshot = json.loads(write_snapshot("dev", config_dir).read_text())
+
+    assert snapshot["placeholders"] == ["MCP_PROXY_URL"]
+
+
+def test_empty_placeholder_fails_load_naming_it(
+    config_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    write_snapshot("dev", config_dir)
+    monkeypatch.setattr(config, "MCP_PROXY_URL", "")
+    monkeypatch.delenv("MCP_PROXY_URL", raising=False)
+
+    with pytest.raises(MCPConfigError, match=r"\$\{MCP_PROXY_URL\} is not set"):
+        load_mcp_config("dev", config_dir)
+
+
+def test_snapshot_trusted_without_reading_sources(
+    config_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    write_snapshot("dev", config_dir)
+    monkeypatch.setattr(config, "MCP_PROXY_URL", "https://proxy")
+    (config_dir / "dev.json").write_text("not json", encoding="utf-8")
+
+    loaded = load_mcp_config("dev", config_dir)
+
+    assert loaded.source == "snapshot"
+    assert loaded.get("mcp-article-processing").url.startswith("https://proxy/")
@@ -0,0 +1,85 @@
+"""
+MCP Server Registry Tests
+
+Tool routes of app.core.mcp_registry.MCPServerRegistry built from the tools
+each server lists when its pool is opened.
+"""
+
+from typing import Dict, List
+
+import pytest
+
+from app.core.mcp_config import MCPConfig, MCPServerConfig
+from app.core.mcp_registry import MCPServerRegistry, ServerPool
+
+pytestmark = pytest.mark.unit
+
+SERVER_TOOLS: Dict[str, List[str]] = {
+    "mcp-article-processing": ["get_pdf_pages", "create_content_section"],
+    "mcp-journal-insight": [],
+}
+
+
+class ListedToolsPool(ServerPool):
+    """ServerPool whose server lists SERVER_TOOLS instead of answering tools/list."""
+
+    async def open(self) -> None:
+        self.tools = list(SERVER_TOOLS[self.name])
+
+
+def mcp_config(*names: str, timeout: float = 30) -> MCPConfig:
+    servers = tuple(
+        MCPServerConfig(name=name, enabled=True, service_name=name, timeout=timeout)
+        for name in names
+    )
+    return MCPConfig(env="test", servers=servers)
+
+
+def registry() -> MCPServerRegistry:
+    target = MCPServerRegistry()
+    target.set_pool_factory(ListedToolsPool)
+    return target
+
+
+async def test_routes_from_listed_tools():
+    target = registry()
+
+    await target.apply(mcp_config("mcp-article-processing", "mcp-journal-insight"))
+
+    assert target.server_for_tool("get_pdf_pages") == "mcp-article-processing"
+    assert target.pool_for_tool("create_content_section") is target.pool(
+        "mcp-article-processing"
+    )
+    assert target.server_for_tool("search_articles") is None
+    await target.close()
+
+
+async def test_changed_server_gets_new_pool_and_routes():
+    target = registry()
+    await target.apply(mcp_config("mcp-article-processing"))
+    before = target.pool("mcp-article-processing")
+
+    diff = await target.apply(mcp_config("mcp-article-processing", timeout=60))
+
+    assert diff.changed == ["mcp-article-processing"]
+    assert target.pool_for_tool("get_pdf_pages") is not before
+    assert target.pool_for_tool("get_pdf_pages").server.timeout == 60
+    await target.close()
+    assert before.closed
+
+
+async def test_unreachable_server_opens_without_tools():
+    target = MCPServerRegistry()
+    server = MCPServerConfig(
+        name="mcp-article-processing",
+        enabled=True,
+        url_override="http://127.0.0.1:9",
+        timeout=1,
+    )
+
+    await target.apply(MCPConfig(env="test", servers=(server,)))
+
+    pool = target.pool("mcp-article-processing")
+    assert pool is not None and pool.tools == []
+    assert target.server_for_tool("get_pdf_pages") is None
+    await target.close()
@@ -0,0 +1,81 @@
+"""
+MCP Config Reload Tests
+
+Reloads of app.core.mcp_reload.MCPConfigReloader: changes the agents' adapters
+cannot follow are rejected, pool settings reload normally.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from app.core.config import config
+from app.core.mcp_config import load_mcp_config
+from app.core.mcp_registry import MCPServerRegistry, ServerPool
+from app.core.mcp_reload import MCPConfigReloader
+
+pytestmark = pytest.mark.unit
+
+BASE = {
+    "servers": {
+        "mcp-article-processing": {
+            "enabled": True,
+            "service_name": "mcp-article-processing",
+            "timeout": 30,
+        }
+    }
+}
+
+
+class OfflinePool(ServerPool):
+    """ServerPool that lists no tools instead of connecting."""
+
+    async def open(self) -> None:
+        self.tools = []
+
+
+def write_env(config_dir: Path, overrides: Dict[str, Any]) -> None:
+    servers = {"mcp-article-processing": overrides}
+    (config_dir / "test.json").write_text(json.dumps({"servers": servers}))
+
+
+@pytest.fixture
+async def reloader(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "MCP_ENV", "test")
+    (tmp_path / "base.json").write_text(json.dumps(BASE))
+    write_env(tmp_path, {})
+    target = MCPServerRegistry()
+    target.set_pool_factory(OfflinePool)
+    await target.apply(load_mcp_config(config_dir=tmp_path, use_snapshot=False))
+    reloader = MCPConfigReloader(target=target, config_dir=tmp_path)
+    reloader.start()
+    yield reloader
+    await reloader.stop()
+    await target.close()
+
+
+@pytest.mark.parametrize(
+    "overrides", [{"enabled": False}, {"service_name": "mcp-article-processing-v2"}]
+)
+async def test_reload_moving_adapter_server_rejected(
+    reloader: MCPConfigReloader, tmp_path: Path, overrides: Dict[str, Any]
+):
+    write_env(tmp_path, overrides)
+
+    assert await reloader.reload() is None
+    pool = reloader.target.pool("mcp-article-processing")
+    assert pool is not None
+    assert pool.server.url == "http://mcp-article-processing.oxsci.internal:8060"
+
+
+async def test_reload_pool_settings_applied(
+    reloader: MCPConfigReloader, tmp_path: Path
+):
+    write_env(tmp_path, {"timeout": 60})
+
+    diff = await reloader.reload()
+
+    assert diff is not None and diff.changed == ["mcp-article-processing"]
+    assert reloader.target.pool("mcp-article-processing").server.timeout == 60
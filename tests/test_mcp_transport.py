@@ -0,0 +1,192 @@
+"""
+MCP HTTP Transport Tests
+
+Session handshake, session expiry, error classification and tool listing of
+app.core.mcp_transport against an in-process httpx mock server.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import pytest
+
+from app.core.mcp_transport import (
+    MCPConnectError,
+    MCPHttpTransport,
+    MCPToolError,
+    MCPTransportError,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeMCPServer:
+    """Streamable HTTP MCP server issuing one session per initialize."""
+
+    def __init__(self, session: str = "session-1"):
+        self.session = session
+        self.requests: List[Tuple[str, Optional[str], Dict[str, str]]] = []
+        self.expire_next_call = False
+        self.tool_status = 200
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        method = body["method"]
+        self.requests.append(
+            (method, request.headers.get("mcp-session-id"), dict(request.headers))
+        )
+        if method == "initialize":
+            return httpx.Response(
+                200,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": body["id"],
+                    "result": {"protocolVersion": "2025-03-26"},
+                },
+                headers={"Mcp-Session-Id": self.session},
+            )
+        if method == "notifications/initialized":
+            return httpx.Response(202)
+        if self.expire_next_call:
+            self.expire_next_call = False
+            return httpx.Response(404)
+        if self.tool_status != 200:
+            return httpx.Response(self.tool_status)
+        if method == "tools/list":
+            # Two pages of tools
+            cursor = body["params"].get("cursor")
+            result: Dict[str, Any] = {
+                "tools": [{"name": "search_articles" if cursor else "get_article"}]
+            }
+            if not cursor:
+                result["nextCursor"] = "page-2"
+            return httpx.Response(
+                200, json={"jsonrpc": "2.0", "id": body["id"], "result": result}
+            )
+        arguments = body["params"]["arguments"]
+        if arguments.get("invalid"):
+            return httpx.Response(
+                200,
+                json={
+                    "jsonrpc": "2.0",
+                    "id": body["id"],
+                    "error": {"code": -32602, "message": "invalid arguments"},
+                },
+            )
+        return httpx.Response(
+            200,
+            json={
+                "jsonrpc": "2.0",
+                "id": body["id"],
+                "result": {"content": [{"type": "text", "text": "ok"}]},
+            },
+        )
+
+    def methods(self) -> List[str]:
+        return [method for method, _, _ in self.requests]
+
+
+def transport_for(server: Any) -> MCPHttpTransport:
+    transport = MCPHttpTransport()
+    transport._client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    transport._client_loop = asyncio.get_running_loop()
+    return transport
+
+
+async def test_handshake_once_and_session_header():
+    server = FakeMCPServer()
+    transport = transport_for(server)
+
+    assert await transport.call_tool("http://mcp", "get_article", {}) == "ok"
+    assert await transport.call_tool("http://mcp", "get_article", {}) == "ok"
+
+    assert server.methods() == [
+        "initialize",
+        "notifications/initialized",
+        "tools/call",
+        "tools/call",
+    ]
+    assert all(session == "session-1" for _, session, _ in server.requests[1:])
+    await transport.aclose()
+
+
+async def test_auth_headers_sent_on_every_request():
+    server = FakeMCPServer()
+    transport = transport_for(server)
+
+    await transport.call_tool(
+        "http://mcp", "get_article", {}, headers={"X-API-Key": "secret"}
+    )
+
+    assert all(headers["x-api-key"] == "secret" for _, _, headers in server.requests)
+    await transport.aclose()
+
+
+async def test_expired_session_reinitialized():
+    server = FakeMCPServer()
+    transport = transport_for(server)
+    await transport.call_tool("http://mcp", "get_article", {})
+
+    server.expire_next_call = True
+    assert await transport.call_tool("http://mcp", "get_article", {}) == "ok"
+    assert server.methods()[-3:] == [
+        "initialize",
+        "notifications/initialized",
+        "tools/call",
+    ]
+    await transport.aclose()
+
+
+async def test_json_rpc_error_is_tool_error():
+    transport = transport_for(FakeMCPServer())
+
+    with pytest.raises(MCPToolError):
+        await transport.call_tool("http://mcp", "get_article", {"invalid": True})
+    await transport.aclose()
+
+
+async def test_error_after_sending_is_not_connect_error():
+    server = FakeMCPServer()
+    server.tool_status = 502
+    transport = transport_for(server)
+
+    with pytest.raises(MCPTransportError) as error:
+        await transport.call_tool("http://mcp", "create_content_section", {})
+    assert not isinstance(error.value, MCPConnectError)
+    await transport.aclose()
+
+
+async def test_connection_refused_is_connect_error():
+    def refuse(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    transport = transport_for(refuse)
+
+    with pytest.raises(MCPConnectError):
+        await transport.call_tool("http://mcp", "create_content_section", {})
+    await transport.aclose()
+
+
+async def test_list_tools_follows_cursor():
+    server = FakeMCPServer()
+    transport = transport_for(server)
+
+    tools = await transport.list_tools("http://mcp")
+
+    assert tools == ["get_article", "search_articles"]
+    assert server.methods()[:2] == ["initialize", "notifications/initialized"]
+    await transport.aclose()
+
+
+async def test_one_client_until_closed():
+    transport = MCPHttpTransport()
+
+    first = transport._shared_client()
+    assert transport._shared_client() is first
+
+    await transport.aclose()
+    assert first.is_closed
+    assert transport._shared_client() is not first
+    await transport.aclose()
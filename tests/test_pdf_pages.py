@@ -0,0 +1,77 @@
+"""
+Lazy PDF Page Tests
+
+app.core.pdf_pages.PdfDocument fetches only the pages it needs when the page
+tool reads page ranges, starting with the outline.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.core.pdf_pages import OUTLINE_SCAN_PAGES, PdfDocument
+
+pytestmark = pytest.mark.unit
+
+# 20 pages, with headings on pages 1, 2 and 4
+PAGES = ["Abstract\nText", "1. Introduction\nText", "Text", "2. Methods\nText"]
+PAGES += ["Text"] * 16
+
+
+class FakePageTool:
+    """get_pdf_pages returning JSON pages, optionally for a page range."""
+
+    def __init__(self, ranges: bool):
+        properties = {"file_id": {}}
+        if ranges:
+            properties.update({"start_page": {}, "end_page": {}})
+        self.args_schema = {"properties": properties}
+        self.calls: List[Dict[str, Any]] = []
+
+    async def ainvoke(self, arguments: Dict[str, Any]) -> str:
+        self.calls.append(arguments)
+        first: Optional[int] = arguments.get("start_page")
+        last = arguments.get("end_page", len(PAGES))
+        numbers = range(first or 1, min(last, len(PAGES)) + 1)
+        pages = [{"page_number": n, "text": PAGES[n - 1]} for n in numbers]
+        return json.dumps({"total_pages": len(PAGES), "pages": pages})
+
+
+async def test_outline_reads_first_pages_only():
+    tool = FakePageTool(ranges=True)
+
+    with PdfDocument(tool, {"file_id": "f"}) as document:
+        outline = await document.outline()
+
+    assert tool.calls == [{"file_id": "f", "start_page": 1, "end_page": 3}]
+    assert outline["page_count"] == len(PAGES)
+    assert outline["scanned_pages"] == list(range(1, OUTLINE_SCAN_PAGES + 1))
+    assert [s["heading"] for s in outline["sections"]] == [
+        "Abstract",
+        "1. Introduction",
+    ]
+
+
+async def test_outline_grows_with_pages_read():
+    tool = FakePageTool(ranges=True)
+
+    with PdfDocument(tool, {"file_id": "f"}) as document:
+        await document.outline()
+        await document.pages(4)
+        outline = await document.outline()
+
+    assert len(tool.calls) == 2
+    assert {"page": 4, "heading": "2. Methods"} in outline["sections"]
+
+
+async def test_outline_without_ranges_fetches_document_once():
+    tool = FakePageTool(ranges=False)
+
+    with PdfDocument(tool, {"file_id": "f"}) as document:
+        outline = await document.outline()
+        await document.pages(4)
+
+    assert tool.calls == [{"file_id": "f"}]
+    assert "scanned_pages" not in outline
+    assert len(outline["sections"]) == 3
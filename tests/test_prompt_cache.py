@@ -0,0 +1,65 @@
+"""
+Prompt Cache Usage Tests
+
+LLM usage accounting of app.core.prompt_cache: concurrent calls on one shared
+CrewAI LLM are each charged for their own provider responses only.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict
+
+import pytest
+
+from app.core.llm import LLMPipeline
+from app.core.prompt_cache import LLMUsage, PromptCacheMiddleware, _current_usage
+
+pytestmark = pytest.mark.unit
+
+
+class FakeCrewAILLM:
+    """Sums usage like CrewAI's BaseLLM; calls overlap on a barrier."""
+
+    temperature = 0.0
+
+    def __init__(self, parties: int) -> None:
+        self._token_usage = {"prompt_tokens": 0, "cached_prompt_tokens": 0}
+        self.barrier = threading.Barrier(parties)
+
+    def _track_token_usage_internal(self, usage_data: Dict[str, Any]) -> None:
+        self._token_usage["prompt_tokens"] += usage_data["prompt_tokens"]
+        self._token_usage["cached_prompt_tokens"] += usage_data["cached_tokens"]
+
+    def call(self, messages: Any, **kwargs: Any) -> str:
+        tokens = len(messages[0]["content"])
+        self._track_token_usage_internal(
+            {"prompt_tokens": tokens, "cached_tokens": tokens // 2}
+        )
+        # Every call has its response before any returns
+        self.barrier.wait(timeout=5)
+        return "answer"
+
+
+async def test_concurrent_calls_on_shared_llm_counted_once():
+    pipeline = LLMPipeline()
+    pipeline.use(PromptCacheMiddleware(models=[]))
+    pipeline.bridge.bind(asyncio.get_running_loop(), max_threads=4)
+    llm = pipeline.wrap(FakeCrewAILLM(parties=2), "openai/gpt-4o-mini", "agent")
+
+    def document(prompt: str) -> LLMUsage:
+        usage = LLMUsage()
+        _current_usage.set(usage)
+        llm.call([{"role": "user", "content": prompt}])
+        return usage
+
+    try:
+        short, long = await asyncio.gather(
+            asyncio.to_thread(document, "x" * 10),
+            asyncio.to_thread(document, "x" * 1000),
+        )
+    finally:
+        pipeline.bridge.shutdown()
+
+    assert (short.requests, short.prompt_tokens, short.cached_tokens) == (1, 10, 5)
+    assert (long.requests, long.prompt_tokens, long.cached_tokens) == (1, 1000, 500)
+    assert llm._token_usage["prompt_tokens"] == 1010
@@ -0,0 +1,110 @@
+"""
+LLM Rate Limit Tests
+
+Bucket selection of app.core.rate_limit.RateLimitRegistry: models matched by a
+provider prefix share that prefix's buckets. Waiting requests are woken as soon
+as capacity returns, and CrewAI calls are settled with their reported usage.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.llm import CREWAI, LLMCall, usage_tokens
+from app.core.rate_limit import RateLimitRegistry
+
+pytestmark = pytest.mark.unit
+
+LIMITS = {
+    "openrouter": {"rpm": 60, "tpm": 100000},
+    "openrouter/openai/gpt-4o": {"rpm": 10},
+}
+
+
+def registry(divisor: int = 1) -> RateLimitRegistry:
+    limits = RateLimitRegistry()
+    limits.configure(LIMITS, divisor=divisor)
+    return limits
+
+
+def test_provider_prefix_models_share_one_limiter():
+    limits = registry()
+
+    mini = limits.limiter_for("openrouter/openai/gpt-4o-mini")
+    claude = limits.limiter_for("openrouter/anthropic/claude-3.5-sonnet")
+
+    assert mini is not None
+    assert mini is claude
+    assert mini.key == "openrouter"
+    assert list(limits.snapshot()) == ["openrouter"]
+
+
+def test_specific_model_key_gets_its_own_limiter():
+    limits = registry()
+
+    specific = limits.limiter_for("openrouter/openai/gpt-4o")
+    provider = limits.limiter_for("openrouter/openai/gpt-4o-mini")
+
+    assert specific is not provider
+    assert specific.key == "openrouter/openai/gpt-4o"
+    assert specific.requests.capacity == 10
+
+
+def test_unlimited_model_has_no_limiter():
+    assert registry().limiter_for("anthropic/claude-3-haiku") is None
+
+
+def test_limits_divided_across_workers():
+    limiter = registry(divisor=4).limiter_for("openrouter/openai/gpt-4o-mini")
+
+    assert limiter.requests.capacity == 15
+    assert limiter.tokens.capacity == 25000
+
+
+async def test_shared_bucket_enforces_provider_limit():
+    limits = RateLimitRegistry()
+    limits.configure({"openrouter": {"rpm": 2}})
+
+    for model in ("openrouter/openai/gpt-4o-mini", "openrouter/anthropic/claude"):
+        await limits.limiter_for(model).acquire("agent", tokens=10)
+
+    # Both requests drew from the same 2 rpm bucket: a third must wait
+    limiter = limits.limiter_for("openrouter/google/gemini")
+    assert limiter.requests.wait_time(1) > 0
+
+
+def test_configure_resets_limiters():
+    limits = registry()
+    before = limits.limiter_for("openrouter/openai/gpt-4o-mini")
+
+    limits.configure({"openrouter": {"rpm": 30}})
+    after = limits.limiter_for("openrouter/openai/gpt-4o-mini")
+
+    assert after is not before
+    assert after.requests.capacity == 30
+
+
+async def test_waiter_woken_when_settle_returns_tokens():
+    limits = RateLimitRegistry()
+    limits.configure({"openrouter": {"tpm": 600}})
+    limiter = limits.limiter_for("openrouter/openai/gpt-4o-mini")
+    await limiter.acquire("agent", tokens=600)
+
+    waiting = asyncio.create_task(limiter.acquire("other", tokens=300))
+    await asyncio.sleep(0.05)
+    # The first request used nothing of its estimate: the bucket refills
+    limiter.settle(estimated=600, actual=0)
+
+    # Granted on the refund, not after the ~30s refill or a poll interval
+    assert await asyncio.wait_for(waiting, 0.2) < 0.2
+
+
+def test_crewai_call_usage_counted():
+    call = LLMCall("openrouter/openai/gpt-4o-mini", "agent", CREWAI, [], {})
+    call.metadata["usage_records"] = [
+        {"prompt_tokens": 100, "completion_tokens": 20},
+        {"total_tokens": 50},
+    ]
+
+    assert usage_tokens("answer", call) == 170
+    assert usage_tokens("answer") is None
@@ -0,0 +1,150 @@
+"""
+MCP Call Resilience Tests
+
+Which errors trip the circuit breaker of app.core.resilience, and which calls
+are hedged (charging the task budget once).
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, List
+
+import pytest
+
+from app.core.latency import LatencyTracker
+from app.core.mcp_config import MCPConfig, MCPServerConfig
+from app.core.mcp_registry import ServerPool, registry
+from app.core.mcp_transport import MCPToolError, MCPTransportError
+from app.core.resilience import (
+    OPEN,
+    CircuitOpenError,
+    ResilienceMiddleware,
+    ResilientServerPool,
+)
+from app.core.timeouts import (
+    AdaptiveTimeoutMiddleware,
+    ToolTimeoutError,
+    current_budget,
+    task_budget,
+)
+from app.core.tool_pipeline import ToolCall
+
+pytestmark = pytest.mark.unit
+
+SERVER = "mcp-article-analysis"
+
+
+class OfflinePool(ResilientServerPool):
+    """Pool that does not contact its server when opened."""
+
+    async def open(self) -> None:
+        self.tools = ["get_article"]
+
+
+@pytest.fixture
+async def pool() -> AsyncIterator[ResilientServerPool]:
+    registry.set_pool_factory(OfflinePool)
+    server = MCPServerConfig(
+        name=SERVER,
+        enabled=True,
+        service_name=SERVER,
+        circuit_breaker={"min_calls": 2, "window_size": 4},
+    )
+    await registry.apply(MCPConfig(env="test", servers=(server,)))
+    yield registry.pool(SERVER)
+    await registry.close()
+    registry.set_pool_factory(ServerPool)
+
+
+def tool_call(blocking: bool = False) -> ToolCall:
+    return ToolCall("get_article", {}, server=SERVER, metadata={"blocking": blocking})
+
+
+def failing(error: Exception) -> Any:
+    async def call_next(call: ToolCall) -> Any:
+        raise error
+
+    return call_next
+
+
+async def test_tool_errors_do_not_open_breaker(pool: ResilientServerPool):
+    middleware = ResilienceMiddleware()
+
+    for _ in range(4):
+        with pytest.raises(MCPToolError):
+            await middleware(tool_call(), failing(MCPToolError("no such article")))
+
+    assert pool.breaker.state != OPEN
+
+
+async def test_transport_errors_open_breaker(pool: ResilientServerPool):
+    middleware = ResilienceMiddleware()
+
+    for _ in range(2):
+        with pytest.raises(MCPTransportError):
+            await middleware(tool_call(), failing(MCPTransportError("502")))
+
+    assert pool.breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await middleware(tool_call(), failing(MCPTransportError("502")))
+
+
+async def test_budget_capped_timeouts_do_not_open_breaker(pool: ResilientServerPool):
+    middleware = ResilienceMiddleware()
+    capped = ToolTimeoutError("out of budget", budget_capped=True)
+
+    for _ in range(4):
+        with pytest.raises(ToolTimeoutError):
+            await middleware(tool_call(), failing(capped))
+    assert pool.breaker.state != OPEN
+
+    for _ in range(2):
+        with pytest.raises(ToolTimeoutError):
+            await middleware(tool_call(), failing(ToolTimeoutError("slow server")))
+    assert pool.breaker.state == OPEN
+
+
+async def hedge_count(blocking: bool) -> int:
+    tracker = LatencyTracker()
+    for _ in range(20):
+        tracker.record("get_article", 0.01)
+    middleware = ResilienceMiddleware(
+        hedge_tools=["get_article"], hedge_min_samples=20, tracker=tracker
+    )
+    calls: List[ToolCall] = []
+
+    async def slow(call: ToolCall) -> str:
+        calls.append(call)
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    assert await middleware(tool_call(blocking), slow) == "ok"
+    return len(calls)
+
+
+async def test_async_call_hedged(pool: ResilientServerPool):
+    assert await hedge_count(blocking=False) == 2
+
+
+async def test_blocking_adapter_call_not_hedged(pool: ResilientServerPool):
+    assert await hedge_count(blocking=True) == 1
+
+
+async def test_hedged_call_charges_budget_once(pool: ResilientServerPool):
+    tracker = LatencyTracker()
+    for _ in range(20):
+        tracker.record("get_article", 0.01)
+    resilience = ResilienceMiddleware(
+        hedge_tools=["get_article"], hedge_min_samples=20, tracker=tracker
+    )
+    timeout = AdaptiveTimeoutMiddleware(tracker=tracker)
+
+    async def slow(call: ToolCall) -> str:
+        await asyncio.sleep(0.1)
+        return "ok"
+
+    async def timed(call: ToolCall) -> Any:
+        return await timeout(call, slow)
+
+    with task_budget(60, expected_steps=4):
+        await resilience(tool_call(), timed)
+        assert current_budget().steps_taken == 1
@@ -0,0 +1,214 @@
+"""
+Task Admission Tests
+
+Ordering, deferral and shedding of app.core.scheduling.TaskAdmission.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+from app.core.scheduling import (
+    DEFER,
+    PRIORITY_CLASSES,
+    SHED,
+    TaskAdmission,
+    Ticket,
+    with_scheduling,
+)
+from app.core.timeouts import current_budget, with_task_budget
+
+pytestmark = pytest.mark.unit
+
+
+def make_ticket(
+    gate: TaskAdmission,
+    role: str,
+    priority: str = "normal",
+    deadline: Optional[float] = None,
+    estimated_seconds: float = 0,
+) -> Ticket:
+    return gate.ticket(
+        role=role,
+        priority=PRIORITY_CLASSES[priority],
+        deadline=deadline,
+        estimated_seconds=estimated_seconds,
+        timeout=600,
+        task_id=role,
+    )
+
+
+async def run_task(
+    gate: TaskAdmission, ticket: Ticket, order: List[Tuple[str, bool]]
+) -> None:
+    admitted = await gate.admit(ticket)
+    order.append((ticket.role, admitted))
+    if admitted:
+        gate.release()
+
+
+def decisions(gate: TaskAdmission) -> List[Tuple[str, str]]:
+    return [(d.role, d.decision) for d in gate.decisions]
+
+
+async def test_waiting_tasks_start_by_priority_then_slack():
+    gate = TaskAdmission(slots=1)
+    assert await gate.admit(make_ticket(gate, "running"))
+
+    now = time.time()
+    order: List[Tuple[str, bool]] = []
+    tickets = [
+        make_ticket(gate, "batch", "batch"),
+        make_ticket(gate, "normal-late", "normal", deadline=now + 500),
+        make_ticket(gate, "normal-urgent", "normal", deadline=now + 100),
+        make_ticket(gate, "interactive", "interactive"),
+    ]
+    tasks = [asyncio.create_task(run_task(gate, t, order)) for t in tickets]
+    await asyncio.sleep(0)
+
+    gate.release()
+    await asyncio.gather(*tasks)
+
+    assert order == [
+        ("interactive", True),
+        ("normal-urgent", True),
+        ("normal-late", True),
+        ("batch", True),
+    ]
+    assert gate.running == 0
+
+
+async def test_deferred_ticket_requeued_behind_feasible_work():
+    gate = TaskAdmission(slots=1, shed_policy=DEFER)
+    assert await gate.admit(make_ticket(gate, "running"))
+
+    order: List[Tuple[str, bool]] = []
+    late = make_ticket(gate, "will_be_late", deadline=time.time() + 0.05)
+    feasible = make_ticket(gate, "feasible", "batch")
+    tasks = [
+        asyncio.create_task(run_task(gate, late, order)),
+        asyncio.create_task(run_task(gate, feasible, order)),
+    ]
+    await asyncio.sleep(0.1)
+
+    gate.release()
+    await asyncio.gather(*tasks)
+
+    assert order == [("feasible", True), ("will_be_late", True)]
+    late_decisions = [d for role, d in decisions(gate) if role == "will_be_late"]
+    assert late_decisions == ["queued", "deferred", "started"]
+    assert decisions(gate).index(("feasible", "started")) < decisions(gate).index(
+        ("will_be_late", "started")
+    )
+
+
+async def test_deferred_on_arrival_runs_when_nothing_else_waits():
+    gate = TaskAdmission(slots=1, shed_policy=DEFER)
+
+    late = make_ticket(gate, "late", deadline=time.time() - 1)
+
+    assert await gate.admit(late)
+    assert [d for _, d in decisions(gate)] == ["deferred", "admitted"]
+    gate.release()
+
+
+async def test_shed_while_waiting():
+    gate = TaskAdmission(slots=1, shed_policy=SHED)
+    assert await gate.admit(make_ticket(gate, "running"))
+
+    order: List[Tuple[str, bool]] = []
+    late = make_ticket(gate, "will_be_late", deadline=time.time() + 0.05)
+    feasible = make_ticket(gate, "feasible", "batch")
+    tasks = [
+        asyncio.create_task(run_task(gate, late, order)),
+        asyncio.create_task(run_task(gate, feasible, order)),
+    ]
+    await asyncio.sleep(0.1)
+
+    gate.release()
+    await asyncio.gather(*tasks)
+
+    assert sorted(order) == [("feasible", True), ("will_be_late", False)]
+    assert ("will_be_late", "shed") in decisions(gate)
+    assert gate.running == 0
+
+
+async def test_shed_on_arrival():
+    gate = TaskAdmission(slots=1, shed_policy=SHED)
+
+    assert not await gate.admit(make_ticket(gate, "late", deadline=time.time() - 1))
+    assert gate.running == 0
+    assert gate.counts[SHED] == 1
+
+
+class FakeExecutor:
+    agent_role = "fake_agent"
+
+    def __init__(self, context: Any):
+        self.context = context
+
+    @classmethod
+    def get_agent_config(cls) -> Any:
+        return SimpleNamespace(estimated_total_time=30, timeout=600)
+
+    async def execute(self) -> Any:
+        return {"status": "success", "result": {}}
+
+
+class FakeContext:
+    task_id = "task-1"
+
+    def __init__(self, **shared_data: Any):
+        self.shared_data = shared_data
+
+    def get_shared_data(self, key: str, default: Any = None) -> Any:
+        return self.shared_data.get(key, default)
+
+
+async def test_shed_task_returns_agent_error_result():
+    gate = TaskAdmission(slots=1, shed_policy=SHED)
+    executor_class = with_scheduling(FakeExecutor, gate)
+
+    result = await executor_class(FakeContext(deadline=time.time() + 1)).execute()
+
+    assert result["status"] == "error"
+    assert result["result"]["agent_role"] == "fake_agent"
+    assert "deadline" in result["result"]["error"]
+
+
+async def test_admitted_task_executes_and_releases_slot():
+    gate = TaskAdmission(slots=1, shed_policy=SHED)
+    executor_class = with_scheduling(FakeExecutor, gate)
+
+    result = await executor_class(FakeContext(priority="interactive")).execute()
+
+    assert result["status"] == "success"
+    assert gate.running == 0
+
+
+class BudgetExecutor(FakeExecutor):
+    @classmethod
+    def get_agent_config(cls) -> Any:
+        return SimpleNamespace(
+            estimated_total_time=0, timeout=10, estimated_tools_cnt=1
+        )
+
+    async def execute(self) -> Any:
+        return {"status": "success", "result": {"budget": current_budget().remaining}}
+
+
+async def test_budget_starts_after_admission():
+    gate = TaskAdmission(slots=1)
+    executor_class = with_scheduling(with_task_budget(BudgetExecutor), gate)
+    assert await gate.admit(make_ticket(gate, "running"))
+
+    task = asyncio.create_task(executor_class(FakeContext()).execute())
+    await asyncio.sleep(0.3)
+    gate.release()
+    result = await task
+
+    # The time spent queued is not charged to the task budget
+    assert result["result"]["budget"] > 9.9
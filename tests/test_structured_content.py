@@ -0,0 +1,109 @@
+"""
+Structured Content Pipeline Tests
+
+Overview IDs of batch documents in app.core.structured_content and the batch
+concurrency of agent and hybrid mode.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from app.core.batch import budget_scale
+from app.core.structured_content import (
+    ABSTRACT,
+    CREATE_OVERVIEW,
+    CREATE_SECTION,
+    StructuredContentPipeline,
+    document_concurrency,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class FakeTool:
+    def __init__(self, name: str, result: Any, calls: List[Tuple[str, Dict]]):
+        self.name = name
+        self.result = result
+        self.calls = calls
+
+    async def _arun(self, **arguments: Any) -> Any:
+        self.calls.append((self.name, arguments))
+        return self.result
+
+
+class FakeAdapter:
+    def __init__(self, overview: Any):
+        self.calls: List[Tuple[str, Dict]] = []
+        self.overview = overview
+
+    def get_tools(self, names: List[str]) -> List[FakeTool]:
+        results = {CREATE_OVERVIEW: self.overview}
+        return [FakeTool(name, results.get(name, "ok"), self.calls) for name in names]
+
+
+class FakeLLM:
+    def call(self, messages: Any, **kwargs: Any) -> str:
+        return json.dumps({"title": "Paper", "content": "Abstract text"})
+
+
+class FakeDocument:
+    async def outline(self) -> Dict[str, Any]:
+        return {"page_count": 1, "sections": [{"heading": "Abstract", "page": 1}]}
+
+    async def pages(self, first: int, last: int) -> List[Tuple[int, str]]:
+        return [(first, "Abstract\nAbstract text")]
+
+
+class FakeContext:
+    def __init__(self, **shared_data: Any):
+        self.shared_data = shared_data
+
+    def get_shared_data(self, key: str, default: Any = None) -> Any:
+        return self.shared_data.get(key, default)
+
+
+def pipeline_for(overview: Any, context: Optional[FakeContext] = None) -> Any:
+    adapter = FakeAdapter(overview)
+    context = context or FakeContext(structured_content_overview_id="other-doc")
+    return adapter, StructuredContentPipeline(adapter, FakeLLM(), context)
+
+
+async def test_batch_document_uses_overview_id_from_result():
+    adapter, pipeline = pipeline_for(json.dumps({"id": "overview-1"}))
+
+    result = await pipeline.run(FakeDocument(), [ABSTRACT], file_id="file-1")
+
+    assert result.overview_id == "overview-1"
+    section = dict(adapter.calls)[CREATE_SECTION]
+    assert section["overview_id"] == "overview-1"
+
+
+async def test_batch_document_without_overview_id_fails():
+    adapter, pipeline = pipeline_for("created")
+
+    # The shared context holds another document's ID: never fall back to it
+    with pytest.raises(RuntimeError):
+        await pipeline.run(FakeDocument(), [ABSTRACT], file_id="file-1")
+    assert CREATE_SECTION not in dict(adapter.calls)
+
+
+async def test_single_document_falls_back_to_context():
+    context = FakeContext(file_id="file-1", structured_content_overview_id="ctx-1")
+    _, pipeline = pipeline_for("created", context)
+
+    result = await pipeline.run(FakeDocument(), [ABSTRACT])
+
+    assert result.overview_id == "ctx-1"
+
+
+def test_agent_mode_batches_run_one_document_at_a_time():
+    files = ["a", "b", "c", "d"]
+    agent = FakeContext(file_ids=files, execution_mode="agent", batch_concurrency=4)
+    hybrid = FakeContext(file_ids=files, execution_mode="hybrid", batch_concurrency=4)
+
+    assert document_concurrency(agent) == 1
+    assert document_concurrency(hybrid) == 4
+    assert budget_scale(agent, document_concurrency) == (4, 4)
+    assert budget_scale(hybrid, document_concurrency) == (1, 4)
@@ -0,0 +1,42 @@
+"""
+Worker Slot Tests
+
+Pod-wide task slots of app.core.workers.PodSlots: the slots of a worker that
+died are reclaimed instead of leaking.
+"""
+
+import multiprocessing
+
+import pytest
+
+from app.core.workers import PodSlots
+
+pytestmark = pytest.mark.unit
+
+
+def pod_slots(capacity: int = 2, workers: int = 2) -> PodSlots:
+    return PodSlots(multiprocessing.get_context("spawn"), capacity, workers)
+
+
+def test_capacity_shared_by_all_workers():
+    slots = pod_slots()
+
+    assert slots.try_acquire(0)
+    assert slots.try_acquire(1)
+    assert not slots.try_acquire(0)
+
+    slots.release(1)
+    assert slots.try_acquire(0)
+    assert slots.held() == [2, 0]
+
+
+def test_dead_worker_slots_reclaimed():
+    slots = pod_slots()
+    slots.try_acquire(0)
+    slots.try_acquire(0)
+    assert not slots.try_acquire(1)
+
+    # Worker 0 was killed while running two tasks
+    assert slots.reclaim(0) == 2
+    assert slots.try_acquire(1)
+    assert slots.held() == [0, 1]